@@ -0,0 +1,84 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""An Ansible callback plugin recording how long each task took on each host.
+
+This runs inside `ansible-playbook`, rather than as part of the Pants plugin, and writes its
+timings as JSON to the path in `PANTS_ANSIBLE_TIMINGS` once the playbook finishes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+DOCUMENTATION = """
+    name: pants_timing
+    type: aggregate
+    short_description: Records the duration of each task on each host, as JSON
+    description:
+      - Writes the duration of each task on each host to the path in PANTS_ANSIBLE_TIMINGS.
+"""
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "pants_timing"
+    # Loaded whenever it's on the callback plugin path, so it doesn't replace the callbacks
+    # enabled in `ansible.cfg`
+    CALLBACK_NEEDS_ENABLED = False
+
+    def __init__(self):
+        super().__init__()
+        self._playbook_start = time.monotonic()
+        self._starts = {}
+        self._timings = []
+
+    def v2_runner_on_start(self, host, task):
+        self._starts[(host.get_name(), task._uuid)] = time.monotonic()
+
+    def _record(self, result, status):
+        host = result._host.get_name()
+        task = result._task
+        start = self._starts.pop((host, task._uuid), None)
+        if start is None:
+            return
+        self._timings.append(
+            {
+                "task": task.get_name(),
+                "role": task._role.get_name() if task._role else None,
+                "host": host,
+                "status": status,
+                "duration_ms": round((time.monotonic() - start) * 1000, 3),
+            }
+        )
+
+    def v2_runner_on_ok(self, result):
+        self._record(result, "ok")
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result, "failed")
+
+    def v2_runner_on_skipped(self, result):
+        self._record(result, "skipped")
+
+    def v2_runner_on_unreachable(self, result):
+        self._record(result, "unreachable")
+
+    def v2_playbook_on_stats(self, stats):
+        path = os.environ.get("PANTS_ANSIBLE_TIMINGS")
+        if not path:
+            return
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "total_ms": round((time.monotonic() - self._playbook_start) * 1000, 3),
+                    "tasks": self._timings,
+                },
+                f,
+                indent=2,
+            )
@@ -1,31 +1,70 @@
 from __future__ import annotations
 
+import dataclasses
 import logging
+import os
 from abc import ABCMeta
-from collections.abc import Iterable
+from collections.abc import Collection, Hashable, Iterable, Mapping, Sequence
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, TypeVar
 
 from pants.core.goals.publish import (
     NoApplicableTargetsBehavior,
     TargetRootsToFieldSets,
     TargetRootsToFieldSetsRequest,
 )
+from pants.core.util_rules.distdir import DistDir
+from pants.core.util_rules.system_binaries import BashBinary
+from pants.engine.addresses import Address
 from pants.engine.console import Console
 from pants.engine.engine_aware import EngineAwareReturnType
-from pants.engine.fs import EMPTY_DIGEST, Digest
+from pants.engine.fs import EMPTY_DIGEST, Digest, Workspace
 from pants.engine.goal import Goal, GoalSubsystem
-from pants.engine.process import FallibleProcessResult
-from pants.engine.rules import Get, collect_rules, goal_rule
-from pants.engine.target import FieldSet
+from pants.engine.process import FallibleProcessResult, Process
+from pants.engine.rules import Get, MultiGet, collect_rules, goal_rule
+from pants.engine.target import FieldSet, TransitiveTargets, TransitiveTargetsRequest
 from pants.engine.unions import union
+from pants.option.option_types import IntOption
 from pants.util.logging import LogLevel
 from pants.util.memo import memoized_property
 from pants.util.meta import frozen_after_init
-from pants.util.strutil import strip_v2_chroot_path
+from pants.util.strutil import pluralize, strip_v2_chroot_path
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T", bound=Hashable)
+
+_DEPLOY_SLOTS_CACHE_NAME = "deploy_slots"
+_DEPLOY_SLOTS_PATH = ".cache/deploy_slots"
+
+# A semaphore shared by the deployments' processes: each takes one of `parallelism` slots (a
+# directory, created atomically) before it runs, and waits until one is free. A slot whose process
+# died without releasing it is reclaimed.
+_DEPLOY_SLOT_SCRIPT = r"""
+set -eu
+slots="$1"
+parallelism="$2"
+shift 2
+mkdir -p "$slots"
+while :; do
+    for i in $(seq 1 "$parallelism"); do
+        slot="$slots/slot-$i"
+        if mkdir "$slot" 2> /dev/null; then
+            echo $$ > "$slot/pid"
+            trap 'rm -rf "$slot"' EXIT
+            status=0
+            "$@" || status=$?
+            exit "$status"
+        fi
+        pid="$(cat "$slot/pid" 2> /dev/null || true)"
+        if [ -n "$pid" ] && ! kill -0 "$pid" 2> /dev/null; then
+            rm -rf "$slot"
+        fi
+    done
+    sleep 0.5
+done
+"""
+
 
 # TODO: Copied from LintResult/CheckResult - can this be inherited or composed?
 @dataclass(frozen=True)
@@ -128,35 +167,182 @@ class DeploymentFieldSet(FieldSet, metaclass=ABCMeta):
 
 class DeploySubsystem(GoalSubsystem):
     name = "deploy"
-    help = "Deploy packages to a remote."
+    help = (
+        "Deploy packages to a remote.\n\n"
+        "Deployments run concurrently, in waves: a deployment only starts once every deployment "
+        "it depends on (transitively) has succeeded. If a deployment fails, those that depend on "
+        "it are skipped, but the others still run."
+    )
 
     required_union_implementations = (DeploymentFieldSet,)
 
+    parallelism = IntOption(
+        default=4,
+        help=(
+            "The maximum number of deployments to run at the same time. Each deployment starts as "
+            "soon as a slot is free, and the slots are shared by every `deploy` running on the "
+            "machine."
+        ),
+    )
+
+
+class DeploymentCycleError(Exception):
+    pass
+
+
+def deployment_waves(roots: Sequence[T], depends_on: Mapping[T, Iterable[T]]) -> list[list[T]]:
+    """Group the roots into waves, where each only depends on roots in earlier waves.
+
+    The roots keep their order within each wave.
+    """
+    remaining = {root: set(depends_on.get(root, ())) & set(roots) for root in roots}
+    waves: list[list[T]] = []
+    while remaining:
+        wave = [root for root in roots if root in remaining and not remaining[root]]
+        if not wave:
+            raise DeploymentCycleError(
+                f"These deployments depend on each other: {sorted(map(str, remaining))}"
+            )
+        for root in wave:
+            del remaining[root]
+        for deps in remaining.values():
+            deps.difference_update(wave)
+        waves.append(wave)
+    return waves
+
+
+def failed_dependencies(
+    root: T, depends_on: Mapping[T, Iterable[T]], failed: Collection[T]
+) -> list[T]:
+    """The failed deployments that a root depends on, which mean it can't be deployed.
+
+    `depends_on` must be transitive, so that the dependents of a skipped deployment are skipped too.
+    """
+    return [dependency for dependency in depends_on.get(root, ()) if dependency in failed]
+
 
 class Deploy(Goal):
     subsystem_cls = DeploySubsystem
 
 
+def with_deploy_slot(process: Process, deploy: DeploySubsystem, bash: BashBinary) -> Process:
+    """Wrap a deployment's process, so it waits for one of the `[deploy].parallelism` slots.
+
+    Every deployment in a wave is started at once, and this caps how many run at the same time,
+    without a slow deployment holding up the next ones (as fixed-size batches would).
+    """
+    return dataclasses.replace(
+        process,
+        argv=(
+            bash.path,
+            "-c",
+            _DEPLOY_SLOT_SCRIPT,
+            "deploy_slot",
+            _DEPLOY_SLOTS_PATH,
+            str(max(deploy.parallelism, 1)),
+            *process.argv,
+        ),
+        append_only_caches={
+            **process.append_only_caches,
+            _DEPLOY_SLOTS_CACHE_NAME: _DEPLOY_SLOTS_PATH,
+        },
+    )
+
+
+def _write_result(
+    console: Console,
+    workspace: Workspace,
+    dist_dir: DistDir,
+    address: Address,
+    result: DeployResults,
+) -> None:
+    message = result.message()
+    if message:
+        sigil = console.sigil_succeeded() if result.exit_code == 0 else console.sigil_failed()
+        console.print_stderr(f"{sigil} {address}: {message}")
+
+    reports = [r.report for r in result.results if r.report != EMPTY_DIGEST]
+    if reports:
+        path = os.path.join(dist_dir.relpath, "deploy", address.path_safe_spec)
+        for report in reports:
+            workspace.write_digest(report, path_prefix=path)
+        console.print_stderr(f"Wrote the report for {address} to {path}")
+
+
 @goal_rule
 async def deploy(
     console: Console,
     deploy: DeploySubsystem,
+    workspace: Workspace,
+    dist_dir: DistDir,
 ) -> Deploy:
     target_roots_to_deployment_field_sets = await Get(
         TargetRootsToFieldSets,
         TargetRootsToFieldSetsRequest(
             DeploymentFieldSet,
-            goal_description="",
+            goal_description=f"the `{deploy.name}` goal",
             no_applicable_targets_behavior=NoApplicableTargetsBehavior.error,
-            expect_single_field_set=True,
         ),
     )
+    field_sets = target_roots_to_deployment_field_sets.field_sets
 
-    field_set = target_roots_to_deployment_field_sets.field_sets[0]
-    _ = await Get(DeployResults, DeploymentFieldSet, field_set)  # TODO: Make Flake happy
-    # request = await Get(DeployResults, DeploymentFieldSet, field_set)
-    # TODO: Do something with the result
-    return Deploy(exit_code=0)
+    # Order the deployments by their dependencies on each other
+    transitive_targets = await MultiGet(
+        Get(TransitiveTargets, TransitiveTargetsRequest([field_set.address]))
+        for field_set in field_sets
+    )
+    depends_on = {
+        field_set.address: [tgt.address for tgt in targets.dependencies]
+        for field_set, targets in zip(field_sets, transitive_targets)
+    }
+    waves = deployment_waves([field_set.address for field_set in field_sets], depends_on)
+    field_sets_by_address = {field_set.address: field_set for field_set in field_sets}
+
+    # Every deployment in a wave is started at once, and they're capped at `[deploy].parallelism`
+    # at a time by `with_deploy_slot`
+    results: dict[Address, DeployResults] = {}
+    failed: set[Address] = set()
+    # The failed deployments each skipped deployment depends on
+    skipped: dict[Address, list[Address]] = {}
+    for wave in waves:
+        for address in wave:
+            if failed_deps := failed_dependencies(address, depends_on, failed):
+                skipped[address] = failed_deps
+        to_deploy = [address for address in wave if address not in skipped]
+        wave_results = await MultiGet(
+            Get(DeployResults, DeploymentFieldSet, field_sets_by_address[address])
+            for address in to_deploy
+        )
+        results.update(zip(to_deploy, wave_results))
+        for address, result in zip(to_deploy, wave_results):
+            _write_result(console, workspace, dist_dir, address, result)
+            if result.exit_code != 0:
+                failed.add(address)
+
+    exit_code = 0
+    for field_set in field_sets:
+        result = results.get(field_set.address)
+        if result is None:
+            failed_deps = ", ".join(str(address) for address in skipped[field_set.address])
+            console.print_stderr(
+                f"{console.sigil_skipped()} {field_set.address} skipped, as it depends on "
+                f"{failed_deps}, which failed."
+            )
+        elif result.exit_code == 0:
+            console.print_stderr(f"{console.sigil_succeeded()} {field_set.address} succeeded.")
+        else:
+            console.print_stderr(
+                f"{console.sigil_failed()} {field_set.address} failed "
+                f"(exit code {result.exit_code})."
+            )
+            exit_code = result.exit_code
+
+    succeeded = sum(1 for result in results.values() if result.exit_code == 0)
+    console.print_stderr(
+        f"\n{succeeded} of {pluralize(len(field_sets), 'deployment')} succeeded, in "
+        f"{pluralize(len(waves), 'wave')}."
+    )
+    return Deploy(exit_code=exit_code)
 
 
 def rules():
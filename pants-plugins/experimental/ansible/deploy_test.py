@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+from experimental.ansible.deploy import (
+    _DEPLOY_SLOT_SCRIPT,
+    DeploymentCycleError,
+    deployment_waves,
+    failed_dependencies,
+)
+
+
+def test_independent_deployments_share_a_wave() -> None:
+    assert deployment_waves(["a", "b", "c"], {}) == [["a", "b", "c"]]
+
+
+def test_deployments_wait_for_their_dependencies() -> None:
+    waves = deployment_waves(
+        ["app", "db", "network", "monitoring"],
+        # Dependencies on anything other than the roots (e.g. sources) are ignored
+        {"app": ["db", "network", "app.yml"], "db": ["network"], "monitoring": ["app"]},
+    )
+    assert waves == [["network"], ["db"], ["app"], ["monitoring"]]
+
+
+def test_failures_only_skip_their_dependents() -> None:
+    # c depends on a through b, and d depends on nothing
+    depends_on = {"b": ["a"], "c": ["b", "a"]}
+    assert failed_dependencies("b", depends_on, {"a"}) == ["a"]
+    assert failed_dependencies("c", depends_on, {"a"}) == ["a"]
+    assert failed_dependencies("c", depends_on, {"b"}) == ["b"]
+    assert failed_dependencies("d", depends_on, {"a", "b"}) == []
+
+
+def test_cycles_are_an_error() -> None:
+    with pytest.raises(DeploymentCycleError):
+        deployment_waves(["a", "b", "c"], {"a": ["b"], "b": ["a"]})
+
+
+def run_in_slot(tmp_path: Path, parallelism: int, command: str) -> subprocess.Popen[bytes]:
+    return subprocess.Popen(
+        ["bash", "-c", _DEPLOY_SLOT_SCRIPT, "deploy_slot", ".slots", str(parallelism)]
+        + ["bash", "-c", command],
+        cwd=tmp_path,
+    )
+
+
+def test_deploy_slots_cap_concurrency(tmp_path: Path) -> None:
+    # Each deployment records how many were running when it started
+    command = "echo $(ls .slots | wc -l) >> running; sleep 0.5"
+    processes = [run_in_slot(tmp_path, 2, command) for _ in range(5)]
+    assert [process.wait() for process in processes] == [0] * 5
+    assert max(int(line) for line in (tmp_path / "running").read_text().split()) == 2
+    assert list((tmp_path / ".slots").iterdir()) == []
+
+
+def test_deploy_slots(tmp_path: Path) -> None:
+    assert run_in_slot(tmp_path, 1, "exit 3").wait() == 3
+
+    # A slot whose process died without releasing it is reclaimed
+    stale_slot = tmp_path / ".slots" / "slot-1"
+    stale_slot.mkdir(parents=True)
+    # The PID of a process that has exited (and been reaped)
+    dead = subprocess.Popen(["true"])
+    dead.wait()
+    (stale_slot / "pid").write_text(str(dead.pid))
+    assert run_in_slot(tmp_path, 1, "true").wait() == 0
+    assert not stale_slot.exists()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Any
+
+# PyYAML is a dependency of Pants itself
+import yaml  # pants: no-infer-dep
+
+_PINNED_COLLECTION = re.compile(r"^[\w.]+:(==)?\d[\w.+-]*$")
+
+# The collection types installed from a local path, rather than from a Galaxy server
+_LOCAL_TYPES = frozenset(("dir", "file", "subdirs"))
+_REMOTE_TYPES = frozenset(("galaxy", "git", "url"))
+
+
+class InvalidGalaxyRequirementsError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class GalaxyRequirements:
+    # The local collections (directories or tarballs) installed from the repo, relative to the
+    # directory `ansible-galaxy` runs in
+    local_paths: tuple[str, ...]
+    # Whether every collection is installed from a pinned version, or from the repo itself
+    pinned: bool
+
+
+def is_pinned(collection: str) -> bool:
+    """Whether a collection, given as `namespace.name:version`, is pinned to an exact version."""
+    return _PINNED_COLLECTION.match(collection) is not None
+
+
+def _is_path(name: str) -> bool:
+    return name.startswith(("/", "./", "../", "~")) or name.endswith(".tar.gz")
+
+
+def _local_path(path: str, origin: str) -> str:
+    normalized = os.path.normpath(path)
+    if os.path.isabs(os.path.expanduser(path)) or normalized.split(os.sep)[0] == "..":
+        raise InvalidGalaxyRequirementsError(
+            f"The collection `{path}` in {origin} is installed from outside of the repo, which "
+            "isn't available when installing collections. Use a path relative to the source root "
+            "instead, or install it from a Galaxy server."
+        )
+    return normalized
+
+
+def _parse_collection(collection: Any, origin: str) -> tuple[str | None, bool]:
+    """The local path a collection is installed from (if any), and whether it's pinned."""
+    if isinstance(collection, str):
+        if _is_path(collection):
+            return _local_path(collection, origin), True
+        return None, is_pinned(collection)
+    if not isinstance(collection, dict) or not ("name" in collection or "source" in collection):
+        raise InvalidGalaxyRequirementsError(
+            f"Expected each collection in {origin} to be a name, or a mapping with a `name` or "
+            f"`source`, but got `{collection}`."
+        )
+
+    name = str(collection.get("name", ""))
+    source = str(collection.get("source", ""))
+    type_ = collection.get("type")
+    if type_ in _LOCAL_TYPES or (type_ is None and _is_path(source or name)):
+        return _local_path(source or name, origin), True
+    if type_ is not None and type_ not in _REMOTE_TYPES:
+        raise InvalidGalaxyRequirementsError(
+            f"The collection `{name or source}` in {origin} has an unknown type `{type_}`."
+        )
+    # Git refs and URLs may change upstream, whatever their version
+    if type_ in ("git", "url") or "version" not in collection:
+        return None, False
+    return None, is_pinned(f"{name}:{collection['version']}")
+
+
+def parse_galaxy_requirements(content: bytes, origin: str) -> GalaxyRequirements:
+    """Find the local collections in a Galaxy requirements file, and whether it's fully pinned.
+
+    Only `collections` are considered, as `ansible-galaxy collection install` ignores `roles`.
+    """
+    try:
+        requirements = yaml.safe_load(content)
+    except yaml.YAMLError as e:
+        raise InvalidGalaxyRequirementsError(f"Failed to parse {origin}: {e}") from e
+
+    # The legacy format is a list of roles
+    if not isinstance(requirements, dict):
+        return GalaxyRequirements(local_paths=(), pinned=True)
+    collections = requirements.get("collections") or []
+    if not isinstance(collections, list):
+        raise InvalidGalaxyRequirementsError(f"Expected `collections` in {origin} to be a list.")
+
+    parsed = [_parse_collection(collection, origin) for collection in collections]
+    return GalaxyRequirements(
+        local_paths=tuple(sorted({path for path, _ in parsed if path is not None})),
+        pinned=all(pinned for _, pinned in parsed),
+    )
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from textwrap import dedent
+
+import pytest
+from experimental.ansible.galaxy import (
+    GalaxyRequirements,
+    InvalidGalaxyRequirementsError,
+    is_pinned,
+    parse_galaxy_requirements,
+)
+
+
+@pytest.mark.parametrize(
+    "collection, pinned",
+    [
+        ("community.docker:3.4.0", True),
+        ("community.docker:==3.4.0", True),
+        ("community.docker", False),
+        ("community.docker:>=3.4.0", False),
+        ("community.docker:*", False),
+    ],
+)
+def test_is_pinned(collection: str, pinned: bool) -> None:
+    assert is_pinned(collection) is pinned
+
+
+def parse(content: str) -> GalaxyRequirements:
+    return parse_galaxy_requirements(dedent(content).encode(), "requirements.yml")
+
+
+def test_pinned_requirements() -> None:
+    assert parse(
+        """\
+        collections:
+          - community.general:8.0.0
+          - name: community.docker
+            version: "==3.4.0"
+          - name: ansible.posix
+            version: 1.5.4
+            source: https://galaxy.ansible.com
+        roles:
+          - name: geerlingguy.java
+        """
+    ) == GalaxyRequirements(local_paths=(), pinned=True)
+
+
+@pytest.mark.parametrize(
+    "collection",
+    [
+        "community.general",
+        "{name: community.docker}",
+        "{name: community.docker, version: '>=3.4.0'}",
+        "{name: 'https://github.com/org/repo.git', type: git, version: v1.0.0}",
+        "{name: 'https://example.com/ns-coll-1.0.0.tar.gz', type: url}",
+    ],
+)
+def test_unpinned_requirements(collection: str) -> None:
+    assert not parse(f"collections:\n  - {collection}\n").pinned
+
+
+def test_local_requirements() -> None:
+    assert parse(
+        """\
+        collections:
+          - source: ./collections/my_namespace/my_collection/
+            type: dir
+          - name: vendor/my_namespace-other-1.0.0.tar.gz
+            type: file
+          - ./collections/my_namespace/my_collection
+          - name: community.docker
+            version: 3.4.0
+        """
+    ) == GalaxyRequirements(
+        local_paths=(
+            "collections/my_namespace/my_collection",
+            "vendor/my_namespace-other-1.0.0.tar.gz",
+        ),
+        pinned=True,
+    )
+
+
+@pytest.mark.parametrize(
+    "collection",
+    [
+        "{source: /opt/collections/my_collection, type: dir}",
+        "{source: ../elsewhere/my_collection, type: dir}",
+        "~/my_namespace-my_collection-1.0.0.tar.gz",
+    ],
+)
+def test_requirements_outside_of_repo(collection: str) -> None:
+    with pytest.raises(InvalidGalaxyRequirementsError, match="outside of the repo"):
+        parse(f"collections:\n  - {collection}\n")
+
+
+@pytest.mark.parametrize(
+    "content",
+    ["", "- src: geerlingguy.java\n", "collections:\n", "roles:\n  - geerlingguy.java\n"],
+)
+def test_requirements_without_collections(content: str) -> None:
+    assert parse(content) == GalaxyRequirements(local_paths=(), pinned=True)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "collections: [",
+        "collections: community.general\n",
+        "collections:\n  - {version: 1.0.0}\n",
+        "collections:\n  - {name: community.general, type: svn}\n",
+    ],
+)
+def test_invalid_requirements(content: str) -> None:
+    with pytest.raises(InvalidGalaxyRequirementsError):
+        parse(content)
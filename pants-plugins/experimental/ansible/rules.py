@@ -1,35 +1,64 @@
 from __future__ import annotations
 
+import dataclasses
 import logging
-from collections.abc import Iterable
+import os
+from collections.abc import Iterable, Mapping, Sequence
 from dataclasses import dataclass
 
-from experimental.ansible.deploy import DeploymentFieldSet, DeployResult, DeployResults
+from experimental.ansible.deploy import (
+    DeploymentFieldSet,
+    DeployResult,
+    DeployResults,
+    DeploySubsystem,
+    with_deploy_slot,
+)
+from experimental.ansible.galaxy import is_pinned, parse_galaxy_requirements
 from experimental.ansible.subsystems.ansible import Ansible
 from experimental.ansible.subsystems.ansible_galaxy import AnsibleGalaxy
 from experimental.ansible.target_types import AnsibleDependenciesField, AnsiblePlaybook
+from experimental.ansible.timings import (
+    TIMINGS_FILE,
+    TIMINGS_SUMMARY_FILE,
+    InvalidTimingsError,
+    summarize_timings_file,
+)
+from pants.backend.python.target_types import PexLayout
 from pants.backend.python.util_rules.pex import Pex, PexProcess, PexRequest
 from pants.core.goals.check import CheckRequest, CheckResult, CheckResults
 from pants.core.util_rules.source_files import SourceFilesRequest
 from pants.core.util_rules.stripped_source_files import StrippedSourceFiles
-from pants.engine.fs import EMPTY_DIGEST, Digest, MergeDigests, RemovePrefix
-from pants.engine.process import FallibleProcessResult, ProcessCacheScope
-from pants.engine.rules import Get, Rule, collect_rules, rule
+from pants.core.util_rules.system_binaries import BashBinary
+from pants.engine.fs import (
+    EMPTY_DIGEST,
+    CreateDigest,
+    Digest,
+    DigestContents,
+    DigestSubset,
+    FileContent,
+    GlobExpansionConjunction,
+    MergeDigests,
+    PathGlobs,
+)
+from pants.engine.process import FallibleProcessResult, Process, ProcessCacheScope, ProcessResult
+from pants.engine.rules import Get, MultiGet, Rule, collect_rules, rule
 from pants.engine.target import (
-    Address,
     DependenciesRequest,
-    HydratedSources,
-    HydrateSourcesRequest,
-    SingleSourceField,
     SourcesField,
     Targets,
-    WrappedTarget,
 )
 from pants.engine.unions import UnionRule
+from pants.option.global_options import GlobMatchErrorBehavior
 from pants.util.logging import LogLevel
+from pants.util.resources import read_resource
+from pants.util.strutil import pluralize
 
 logger = logging.getLogger(__name__)
 
+# Ansible loads the callback plugins in a `callback_plugins` directory next to the playbook, on top
+# of any configured in `ansible.cfg`
+_TIMING_CALLBACK = os.path.join("callback_plugins", "pants_timing.py")
+
 
 @dataclass(frozen=True)
 class AnsibleFieldSet(DeploymentFieldSet):
@@ -47,65 +76,174 @@ class AnsibleCheckRequest(CheckRequest):
     name = Ansible.options_scope
 
 
-@rule(level=LogLevel.DEBUG)
-async def run_ansible_check(request: AnsibleCheckRequest, ansible: Ansible) -> CheckResults:
+@dataclass(frozen=True)
+class AnsiblePex:
+    """A PEX of ansible-core, which runs `ansible-playbook` by default.
+
+    `ansible-galaxy` is run from the same PEX, by selecting its console script with `PEX_SCRIPT`,
+    rather than resolving and building ansible-core a second time.
+    """
+
+    pex: Pex
+
+
+@rule(desc="Build the Ansible PEX", level=LogLevel.DEBUG)
+async def build_ansible_pex(ansible: Ansible) -> AnsiblePex:
+    # A venv PEX only pays for installing its requirements once, rather than on every run
+    pex_request = dataclasses.replace(ansible.to_pex_request(), layout=PexLayout.VENV)
+    pex = await Get(Pex, PexRequest, pex_request)
+    return AnsiblePex(pex)
+
+
+def _check_batches(
+    field_sets: Sequence[AnsibleFieldSet], playbooks: Mapping[AnsibleFieldSet, str], batch_size: int
+) -> list[list[AnsibleFieldSet]]:
+    """Split the field sets into batches of at most `batch_size`.
+
+    Sources are stripped of their source roots, so playbooks with the same stripped path (e.g. a
+    `playbook.yml` at the top of two source roots) would collide, and go in separate batches.
+    """
+    batches: list[list[AnsibleFieldSet]] = []
+    current: list[AnsibleFieldSet] = []
+    for field_set in field_sets:
+        if len(current) >= batch_size or any(
+            playbooks[other] == playbooks[field_set] for other in current
+        ):
+            batches.append(current)
+            current = []
+        current.append(field_set)
+    if current:
+        batches.append(current)
+    return batches
+
+
+@rule(desc="Check Ansible playbook syntax", level=LogLevel.DEBUG)
+async def run_ansible_check(
+    request: AnsibleCheckRequest, ansible: Ansible, ansible_pex: AnsiblePex
+) -> CheckResults:
     # if ansible.skip:
     # return CheckResults([], checker_name="Ansible")
 
-    # TODO: Pull this out into separate rule to hydrate the playbook
-    field_set: AnsibleFieldSet = request.field_sets[0]
-    logger.info(field_set)
-    wrapped_target = await Get(WrappedTarget, Address, field_set.address)
-    target = wrapped_target.target
-    sources = await Get(
-        HydratedSources,
-        HydrateSourcesRequest(
-            target.get(SingleSourceField),
-            for_sources_types=(AnsiblePlaybook,),
-        ),
+    # Playbooks from the same directory tend to share roles, so keep them in the same batch
+    field_sets = sorted(request.field_sets, key=lambda field_set: field_set.address)
+    stripped_playbooks = await MultiGet(
+        Get(StrippedSourceFiles, SourceFilesRequest([field_set.playbook]))
+        for field_set in field_sets
     )
+    playbooks = {
+        field_set: stripped.snapshot.files[0]
+        for field_set, stripped in zip(field_sets, stripped_playbooks)
+    }
+    batches = _check_batches(field_sets, playbooks, max(ansible.check_batch_size, 1))
 
-    # Drop the top-level directory
-    flattened_digest = await Get(
-        Digest, RemovePrefix(sources.snapshot.digest, sources.snapshot.dirs[0])
+    all_dependencies = await MultiGet(
+        Get(Targets, DependenciesRequest(field_set.dependencies)) for field_set in field_sets
     )
-
-    # Install ansible
-    ansible_pex = await Get(
-        Pex,
-        PexRequest(
-            output_filename="ansible.pex",
-            internal_only=True,
-            requirements=ansible.pex_requirements(),
-            interpreter_constraints=ansible.interpreter_constraints,
-            main=ansible.main,
-        ),
+    dependencies = dict(zip(field_sets, all_dependencies))
+    # As with deploying, the playbooks run against their sources stripped of their source roots
+    batch_sources = await MultiGet(
+        Get(
+            StrippedSourceFiles,
+            SourceFilesRequest(
+                [
+                    *(field_set.playbook for field_set in batch),
+                    *(
+                        tgt.get(SourcesField)
+                        for field_set in batch
+                        for tgt in dependencies[field_set]
+                    ),
+                ]
+            ),
+        )
+        for batch in batches
     )
 
-    # Run the ansible syntax check on the passed-in playbook
-    process_result = await Get(
-        FallibleProcessResult,
-        PexProcess(
-            ansible_pex,
-            argv=[
-                "--syntax-check",
-                field_set.playbook.value or field_set.playbook.default,
-            ],
-            description="Running Ansible syntax check...",
-            input_digest=flattened_digest,
-            level=LogLevel.DEBUG,
-        ),
+    # Run the ansible syntax check on each batch of playbooks, sharing the Ansible PEX
+    process_results = await MultiGet(
+        Get(
+            FallibleProcessResult,
+            PexProcess(
+                ansible_pex.pex,
+                argv=["--syntax-check", *(playbooks[field_set] for field_set in batch)],
+                description=(
+                    f"Running Ansible syntax check on {pluralize(len(batch), 'playbook')}."
+                ),
+                input_digest=sources.snapshot.digest,
+                level=LogLevel.DEBUG,
+            ),
+        )
+        for batch, sources in zip(batches, batch_sources)
     )
 
     return CheckResults(
-        [CheckResult.from_fallible_process_result(process_result)],
+        [
+            CheckResult.from_fallible_process_result(
+                process_result,
+                partition_description=", ".join(str(field_set.address) for field_set in batch),
+            )
+            for batch, process_result in zip(batches, process_results)
+        ],
         checker_name=request.name,
     )
 
 
+# e.g. `community.docker:3.4.0` or `community.docker:==3.4.0`
+@dataclass(frozen=True)
+class GalaxyInstallRequest:
+    args: tuple[str, ...]
+    input_digest: Digest
+    description: str
+    # Whether the collections' versions are pinned, so that the installation can be cached durably
+    pinned: bool
+
+
+@dataclass(frozen=True)
+class GalaxyCollections:
+    digest: Digest
+
+
+@rule(desc="Install Ansible Galaxy collections", level=LogLevel.DEBUG)
+async def install_galaxy_collections(
+    request: GalaxyInstallRequest, ansible_pex: AnsiblePex, galaxy: AnsibleGalaxy
+) -> GalaxyCollections:
+    result = await Get(
+        ProcessResult,
+        PexProcess(
+            ansible_pex.pex,
+            argv=(
+                "collection",
+                "install",
+                *request.args,
+                *(("--server", galaxy.server) if galaxy.server else ()),
+                "-p",
+                galaxy.collections_path,
+            ),
+            description=request.description,
+            input_digest=request.input_digest,
+            extra_env=galaxy.extra_env,
+            output_directories=(galaxy.collections_path,),
+            level=LogLevel.DEBUG,
+            # Pinned collections are cached like any other process (including remotely), as the
+            # same input always installs the same collections. Unpinned ones may change upstream,
+            # so are re-installed on every restart.
+            cache_scope=(
+                ProcessCacheScope.SUCCESSFUL
+                if request.pinned
+                else ProcessCacheScope.PER_RESTART_SUCCESSFUL
+            ),
+        ),
+    )
+    return GalaxyCollections(result.output_digest)
+
+
 @rule(level=LogLevel.DEBUG)
 async def run_ansible_playbook(
-    field_set: AnsibleFieldSet, ansible: Ansible, galaxy: AnsibleGalaxy
+    field_set: AnsibleFieldSet,
+    ansible: Ansible,
+    ansible_pex: AnsiblePex,
+    galaxy: AnsibleGalaxy,
+    deploy: DeploySubsystem,
+    bash: BashBinary,
 ) -> DeployResults:
     direct_deps = await Get(Targets, DependenciesRequest(field_set.dependencies))
 
@@ -116,65 +254,85 @@ async def run_ansible_playbook(
         ),
     )
 
-    # Install Ansible
-    ansible_pex = await Get(
-        Pex,
-        PexRequest,
-        ansible.to_pex_request(),
-    )
-
-    # Install Ansible Galaxy
-    galaxy_pex = await Get(
-        Pex,
-        PexRequest,
-        ansible.to_pex_request(main=galaxy.default_main),
-    )
-
     galaxy_requirements_digest = EMPTY_DIGEST
     if galaxy.requirements:
-        # Install any top-level Galaxy requirements
-        galaxy_requirements_process_result = await Get(
-            FallibleProcessResult,
-            PexProcess(
-                galaxy_pex,
-                argv=(
-                    "collection",
-                    "install",
-                    "-r",
-                    galaxy.requirements,
-                    "-p",
-                    galaxy.collections_path,
+        # Install any top-level Galaxy requirements, keyed only on the requirements file itself (and
+        # any collections it installs from the repo)
+        requirements_digest = await Get(
+            Digest,
+            DigestSubset(
+                stripped_sources.snapshot.digest,
+                PathGlobs(
+                    [galaxy.requirements],
+                    glob_match_error_behavior=GlobMatchErrorBehavior.error,
+                    description_of_origin="the option `[ansible-galaxy].requirements`",
+                ),
+            ),
+        )
+        requirements_contents = await Get(DigestContents, Digest, requirements_digest)
+        requirements = parse_galaxy_requirements(
+            requirements_contents[0].content, f"`{galaxy.requirements}`"
+        )
+
+        # Collections installed from the repo itself (a directory or a tarball) are installed along
+        # with the requirements, so must be dependencies of the deployment
+        local_digests = await MultiGet(
+            Get(
+                Digest,
+                DigestSubset(
+                    stripped_sources.snapshot.digest,
+                    PathGlobs(
+                        [path, os.path.join(path, "**")],
+                        glob_match_error_behavior=GlobMatchErrorBehavior.error,
+                        conjunction=GlobExpansionConjunction.any_match,
+                        description_of_origin=f"the local collections in `{galaxy.requirements}`",
+                    ),
                 ),
+            )
+            for path in requirements.local_paths
+        )
+        if local_digests:
+            requirements_digest = await Get(
+                Digest, MergeDigests([requirements_digest, *local_digests])
+            )
+
+        galaxy_requirements = await Get(
+            GalaxyCollections,
+            GalaxyInstallRequest(
+                args=("-r", galaxy.requirements),
+                input_digest=requirements_digest,
                 description=f"Installing ansible-galaxy from {galaxy.requirements}",
-                input_digest=stripped_sources.snapshot.digest,
-                output_directories=(galaxy.collections_path,),
-                level=LogLevel.DEBUG,
-                cache_scope=ProcessCacheScope.PER_RESTART_SUCCESSFUL,
+                pinned=requirements.pinned,
             ),
         )
-        galaxy_requirements_digest = galaxy_requirements_process_result.output_digest
+        galaxy_requirements_digest = galaxy_requirements.digest
 
     galaxy_collections_digest = EMPTY_DIGEST
     if galaxy.collections:
         # Install any top-level Galaxy collections
-        galaxy_process_result = await Get(
-            FallibleProcessResult,
-            PexProcess(
-                galaxy_pex,
-                argv=(
-                    "collection",
-                    "install",
-                    *galaxy.collections,
-                    "-p",
-                    galaxy.collections_path,
-                ),
+        galaxy_collections = await Get(
+            GalaxyCollections,
+            GalaxyInstallRequest(
+                args=tuple(galaxy.collections),
+                input_digest=EMPTY_DIGEST,
                 description="Installing ansible-galaxy collections",
-                output_directories=(galaxy.collections_path,),
-                level=LogLevel.DEBUG,
-                cache_scope=ProcessCacheScope.PER_RESTART_SUCCESSFUL,
+                pinned=all(is_pinned(collection) for collection in galaxy.collections),
             ),
         )
-        galaxy_collections_digest = galaxy_process_result.output_digest
+        galaxy_collections_digest = galaxy_collections.digest
+
+    playbook = field_set.playbook.value or field_set.playbook.default
+    timing_callback_digest = await Get(
+        Digest,
+        CreateDigest(
+            [
+                FileContent(
+                    os.path.join(os.path.dirname(playbook), _TIMING_CALLBACK),
+                    read_resource("experimental.ansible.callback_plugins", "pants_timing.py"),
+                )
+            ]
+        ),
+    )
 
     merged_digest = await Get(
         Digest,
@@ -183,28 +341,57 @@ async def run_ansible_playbook(
                 stripped_sources.snapshot.digest,
                 galaxy_requirements_digest,
                 galaxy_collections_digest,
+                timing_callback_digest,
             ]
         ),
     )
 
-    # Run the passed-in playbook
-    process_result = await Get(
-        FallibleProcessResult,
+    # Run the passed-in playbook, once one of the `[deploy].parallelism` slots is free
+    playbook_process = await Get(
+        Process,
         PexProcess(
-            ansible_pex,
+            ansible_pex.pex,
             argv=[
-                field_set.playbook.value or field_set.playbook.default,
+                playbook,
                 *ansible.args,
             ],
             description="Running Ansible Playbook...",
             input_digest=merged_digest,
+            # Record the time taken by each task on each host
+            extra_env={"PANTS_ANSIBLE_TIMINGS": TIMINGS_FILE},
+            output_files=(TIMINGS_FILE,),
             level=LogLevel.DEBUG,
             cache_scope=ProcessCacheScope.PER_RESTART_SUCCESSFUL,
         ),
     )
+    process_result = await Get(
+        FallibleProcessResult, Process, with_deploy_slot(playbook_process, deploy, bash)
+    )
+
+    # The timings are missing if the playbook didn't run to completion, and may be incomplete if it
+    # was killed while they were written. Either way, the playbook's own output explains why.
+    report = process_result.output_digest
+    timings_contents = await Get(DigestContents, Digest, process_result.output_digest)
+    summary = None
+    if timings_contents:
+        try:
+            summary = summarize_timings_file(timings_contents[0].content)
+        except InvalidTimingsError as e:
+            logger.warning(f"Ignoring the Ansible task timings of {field_set.address}: {e}")
+    if summary is not None:
+        summary_digest = await Get(
+            Digest, CreateDigest([FileContent(TIMINGS_SUMMARY_FILE, summary.encode())])
+        )
+        report = await Get(Digest, MergeDigests([report, summary_digest]))
 
     return DeployResults(
-        [DeployResult.from_fallible_process_result(process_result)],
+        [
+            DeployResult.from_fallible_process_result(
+                process_result,
+                partition_description=str(field_set.address),
+                report=report,
+            )
+        ],
         deployer_name=Ansible.options_scope,
     )
 
@@ -0,0 +1,120 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+from textwrap import dedent
+
+import pytest
+from experimental.ansible.rules import AnsibleCheckRequest, AnsibleFieldSet
+from experimental.ansible.rules import rules as ansible_rules
+from experimental.ansible.target_types import AnsibleDeployment, AnsibleSourcesGeneratorTarget
+from pants.backend.python.util_rules import pex
+from pants.core.goals.check import CheckResults
+from pants.core.util_rules import source_files, stripped_source_files
+from pants.engine.addresses import Address
+from pants.testutil.rule_runner import QueryRule, RuleRunner
+
+
+@pytest.fixture
+def rule_runner() -> RuleRunner:
+    return RuleRunner(
+        rules=[
+            *ansible_rules(),
+            *pex.rules(),
+            *source_files.rules(),
+            *stripped_source_files.rules(),
+            QueryRule(CheckResults, (AnsibleCheckRequest,)),
+        ],
+        target_types=[AnsibleDeployment, AnsibleSourcesGeneratorTarget],
+    )
+
+
+VALID_PLAYBOOK = dedent(
+    """\
+    ---
+    - hosts: localhost
+      roles:
+        - greeting
+    """
+)
+
+INVALID_PLAYBOOK = dedent(
+    """\
+    ---
+    - hosts: localhost
+      tasks:
+        - name: Not a module
+          not.a.real.module: {}
+    """
+)
+
+ROLE_TASKS = dedent(
+    """\
+    ---
+    - name: Greet
+      ansible.builtin.debug:
+        msg: Hello
+    """
+)
+
+
+def deployment(directory: str, playbook: str) -> dict[str, str]:
+    return {
+        f"{directory}/playbook.yml": playbook,
+        f"{directory}/roles/greeting/tasks/main.yml": ROLE_TASKS,
+        f"{directory}/BUILD": dedent(
+            """\
+            ansible_sources(name="roles", sources=["roles/**/*.yml"])
+            ansible_deployment(name="deploy", playbook="playbook.yml", dependencies=[":roles"])
+            """
+        ),
+    }
+
+
+def run_check(
+    rule_runner: RuleRunner, directories: list[str], *, extra_args: list[str]
+) -> CheckResults:
+    rule_runner.set_options(
+        ["--backend-packages=['experimental.ansible']", *extra_args],
+        env_inherit={"PATH", "PYENV_ROOT", "HOME"},
+    )
+    field_sets = [
+        AnsibleFieldSet.create(rule_runner.get_target(Address(directory, target_name="deploy")))
+        for directory in directories
+    ]
+    return rule_runner.request(CheckResults, [AnsibleCheckRequest(field_sets)])
+
+
+def test_batched_check(rule_runner: RuleRunner) -> None:
+    rule_runner.write_files(
+        {
+            **deployment("a", VALID_PLAYBOOK),
+            **deployment("b", VALID_PLAYBOOK),
+            **deployment("c", INVALID_PLAYBOOK),
+        }
+    )
+    check_results = run_check(
+        rule_runner,
+        ["c", "a", "b"],
+        extra_args=["--source-root-patterns=['/']", "--ansible-check-batch-size=2"],
+    )
+    assert [result.partition_description for result in check_results.results] == [
+        "a:deploy, b:deploy",
+        "c:deploy",
+    ]
+    assert check_results.results[0].exit_code == 0
+    assert check_results.results[1].exit_code != 0
+
+
+def test_colliding_playbooks_are_checked_separately(rule_runner: RuleRunner) -> None:
+    rule_runner.write_files({**deployment("a", VALID_PLAYBOOK), **deployment("b", VALID_PLAYBOOK)})
+    # Both playbooks are at `playbook.yml` once their source roots are stripped
+    check_results = run_check(
+        rule_runner,
+        ["a", "b"],
+        extra_args=["--source-root-patterns=['a', 'b']", "--ansible-check-batch-size=2"],
+    )
+    assert [
+        (result.partition_description, result.exit_code) for result in check_results.results
+    ] == [("a:deploy", 0), ("b:deploy", 0)]
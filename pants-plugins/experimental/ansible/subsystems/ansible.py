@@ -1,6 +1,6 @@
 from pants.backend.python.subsystems.python_tool_base import PythonToolBase
 from pants.backend.python.target_types import ConsoleScript
-from pants.option.option_types import ArgsListOption
+from pants.option.option_types import ArgsListOption, IntOption
 
 
 class Ansible(PythonToolBase):
@@ -15,3 +15,12 @@ class Ansible(PythonToolBase):
     default_interpreter_constraints = ["CPython>=3.7"]
 
     args = ArgsListOption(example="--ask-become-pass")
+
+    check_batch_size = IntOption(
+        default=25,
+        advanced=True,
+        help=(
+            "The maximum number of playbooks to syntax check in a single `ansible-playbook` "
+            "process. Each batch is checked concurrently, and is reported as its own partition."
+        ),
+    )
@@ -14,8 +14,10 @@ class AnsibleGalaxy(Subsystem):
         "--requirements",
         default=None,
         help=(
-            "A list of collections of the format 'my_namespace.my_collection' which will be "
-            "installed via `ansible-galaxy collection install -r` from the Galaxy server"
+            "A requirements file (e.g. 'requirements.yml') listing the collections to install via "
+            "`ansible-galaxy collection install -r` from the Galaxy server. The installation is "
+            "keyed on the file's content, and cached across runs (and remotely, if configured), "
+            "so the collections' versions should be pinned in it."
         ),
     )
 
@@ -23,7 +25,19 @@ class AnsibleGalaxy(Subsystem):
         "--collections",
         help=(
             "A list of collections of the format 'my_namespace.my_collection' which will be "
-            "installed via `ansible-galaxy collection install` from the Galaxy server"
+            "installed via `ansible-galaxy collection install` from the Galaxy server. If every "
+            "collection's version is pinned (e.g. 'my_namespace.my_collection:1.2.3'), the "
+            "installation is cached across runs (and remotely, if configured)."
+        ),
+    )
+
+    server = StrOption(
+        "--server",
+        default=None,
+        help=(
+            "The Galaxy server (or a local mirror of it) to install collections from, passed to "
+            "`ansible-galaxy collection install --server`. Defaults to the server configured for "
+            "`ansible-galaxy`, which is usually https://galaxy.ansible.com."
         ),
     )
 
@@ -32,3 +46,8 @@ class AnsibleGalaxy(Subsystem):
     )
 
     args = ArgsListOption(example="--token API_KEY")
+
+    @property
+    def extra_env(self) -> dict[str, str]:
+        """Runs `ansible-galaxy`, rather than `ansible-playbook`, from the Ansible PEX."""
+        return {"PEX_SCRIPT": self.default_main.name}
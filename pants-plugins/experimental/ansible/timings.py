@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from typing import Any
+
+# The timings written by the `pants_timing` callback plugin
+TIMINGS_FILE = "timings.json"
+TIMINGS_SUMMARY_FILE = "timings.txt"
+
+# The number of roles and tasks listed in the summary
+_TOP = 10
+
+
+def summarize_timings(timings: dict[str, Any]) -> str:
+    """Summarize where a playbook spent its time, by role, and by task on each host."""
+    tasks = timings.get("tasks", [])
+    by_role: dict[str, float] = defaultdict(float)
+    for task in tasks:
+        by_role[task["role"] or "(no role)"] += task["duration_ms"]
+
+    lines = [f"Playbook took {timings.get('total_ms', 0) / 1000:.1f}s", "", "Slowest roles:"]
+    lines.extend(
+        f"{ms / 1000:>9.1f}s  {role}"
+        for role, ms in sorted(by_role.items(), key=lambda item: item[1], reverse=True)[:_TOP]
+    )
+    lines.extend(("", "Slowest tasks:"))
+    lines.extend(
+        f"{task['duration_ms'] / 1000:>9.1f}s  {task['host']}: {task['task']} ({task['status']})"
+        for task in sorted(tasks, key=lambda task: task["duration_ms"], reverse=True)[:_TOP]
+    )
+    return "\n".join(lines) + "\n"
+
+
+class InvalidTimingsError(ValueError):
+    pass
+
+
+def summarize_timings_file(content: bytes) -> str:
+    """Summarize the timings file written by the callback plugin.
+
+    The file is incomplete if the playbook was killed while it was written, so raises
+    `InvalidTimingsError` if it can't be read.
+    """
+    try:
+        return summarize_timings(json.loads(content))
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise InvalidTimingsError(f"Invalid {TIMINGS_FILE}: {e!r}") from e
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import pytest
+from experimental.ansible.timings import (
+    InvalidTimingsError,
+    summarize_timings,
+    summarize_timings_file,
+)
+
+
+def test_summarize_timings() -> None:
+    timings = {
+        "total_ms": 12500,
+        "tasks": [
+            {"task": "apt", "role": "base", "host": "web1", "status": "ok", "duration_ms": 4000},
+            {"task": "apt", "role": "base", "host": "web2", "status": "ok", "duration_ms": 3000},
+            {"task": "deploy", "role": "app", "host": "web1", "status": "ok", "duration_ms": 5000},
+            {"task": "facts", "role": None, "host": "web1", "status": "ok", "duration_ms": 500},
+        ],
+    }
+    summary = summarize_timings(timings)
+    assert summary.startswith("Playbook took 12.5s")
+    roles = summary.split("Slowest roles:")[1].split("Slowest tasks:")[0].split()
+    assert roles == ["7.0s", "base", "5.0s", "app", "0.5s", "(no", "role)"]
+    tasks = summary.split("Slowest tasks:")[1].strip().splitlines()
+    assert tasks[0].split() == ["5.0s", "web1:", "deploy", "(ok)"]
+
+
+@pytest.mark.parametrize("content", [b"", b'{"total_ms": 100, "tasks": [{"task": "a', b"[]"])
+def test_summarize_invalid_timings_file(content: bytes) -> None:
+    with pytest.raises(InvalidTimingsError):
+        summarize_timings_file(content)
@@ -0,0 +1,567 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""A long-lived `pyrefly lsp` process, kept warm between runs of `pants check`.
+
+Checking a partition in a fresh sandbox means Pyrefly rebuilds its type graph (including every
+stub and 3rd-party module) from scratch on every run. Instead, a language server is started in the
+build root for each Pyrefly version, interpreter, set of source roots and set of config files, and
+is sent the files to check and the files that changed since the last run. It only re-checks what
+those changes affect, and publishes diagnostics for the open files.
+
+This file is run as a script, by a Process using the partition's requirements venv interpreter, so
+that waiting on the language server never blocks a rule. It only uses the stdlib:
+
+- `check` sends one request to the server for its key, starting the server if it isn't running,
+  and prints the diagnostics as JSON.
+- `serve` runs the server: a `pyrefly lsp` process behind a Unix socket in a named cache, which
+  exits once it has been idle for an hour, or as soon as the language server misbehaves.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote, urlparse
+
+# How long the server waits for another request before exiting
+_IDLE_TIMEOUT_SECONDS = 3600
+
+_SEVERITIES = {1: "error", 2: "warning", 3: "info", 4: "hint"}
+
+# The LSP `FileChangeType` for a changed file
+_CHANGED = 2
+
+
+class PyreflyDaemonError(Exception):
+    pass
+
+
+def _uri(path: str) -> str:
+    return Path(path).as_uri()
+
+
+def _path(uri: str) -> str:
+    return unquote(urlparse(uri).path)
+
+
+def read_message(stream: Any) -> dict[str, Any] | None:
+    """Read one LSP message from `stream`, or return None at the end of the stream.
+
+    Raises `PyreflyDaemonError` if the stream doesn't hold a well-formed message.
+    """
+    content_length = None
+    while line := stream.readline():
+        if line in (b"\r\n", b"\n"):
+            break
+        name, _, value = line.decode(errors="replace").partition(":")
+        if name.strip().lower() == "content-length":
+            try:
+                content_length = int(value)
+            except ValueError:
+                raise PyreflyDaemonError(f"Invalid LSP header: {line!r}")
+    if not line:
+        return None
+    if content_length is None:
+        raise PyreflyDaemonError("LSP message without a `Content-Length` header.")
+    body = stream.read(content_length)
+    try:
+        message = json.loads(body)
+    except ValueError as e:
+        raise PyreflyDaemonError(f"Invalid LSP message: {e}")
+    if not isinstance(message, dict):
+        raise PyreflyDaemonError(f"Invalid LSP message: {body[:200]!r}")
+    return message
+
+
+def encode_message(message: Mapping[str, Any]) -> bytes:
+    body = json.dumps(message).encode()
+    return f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+
+
+class PyreflyDaemon:
+    """A minimal LSP client for `pyrefly lsp`, which only cares about diagnostics."""
+
+    def __init__(
+        self,
+        exe: str,
+        build_root: str,
+        python_interpreter: str,
+        search_paths: tuple[str, ...],
+        timeout: float,
+    ) -> None:
+        self._build_root = build_root
+        self._python_interpreter = python_interpreter
+        self._search_paths = search_paths
+        self._timeout = timeout
+        self._process = subprocess.Popen(
+            (exe, "lsp"),
+            cwd=build_root,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        # The server's messages, ending with None (if it exited) or the error reading them
+        self._messages: queue.Queue[dict[str, Any] | PyreflyDaemonError | None] = queue.Queue()
+        threading.Thread(target=self._read_messages, daemon=True).start()
+
+        self._next_id = 0
+        # The version of each open document, by path
+        self._versions: dict[str, int] = {}
+        # The fingerprint of every file Pyrefly has been told about, by path
+        self._fingerprints: dict[str, str] = {}
+        # The diagnostics of each file checked since the last change, by path
+        self._diagnostics: dict[str, list[dict[str, Any]]] = {}
+
+        try:
+            self._initialize()
+        except Exception:
+            self._process.kill()
+            raise
+
+    def _initialize(self) -> None:
+        root_uri = _uri(self._build_root)
+        self._request(
+            "initialize",
+            {
+                "processId": os.getpid(),
+                "rootUri": root_uri,
+                "workspaceFolders": [{"uri": root_uri, "name": os.path.basename(self._build_root)}],
+                "capabilities": {
+                    "workspace": {
+                        "configuration": True,
+                        "didChangeWatchedFiles": {"dynamicRegistration": False},
+                    },
+                    "textDocument": {"publishDiagnostics": {}},
+                },
+            },
+        )
+        self._notify("initialized", {})
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+    def shutdown(self) -> None:
+        if self._process.stdin:
+            self._process.stdin.close()
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+
+    def check(
+        self, files: Mapping[str, bytes], fingerprints: Mapping[str, str]
+    ) -> list[dict[str, Any]]:
+        """Return the diagnostics for `files` (relative paths to their content).
+
+        `fingerprints` are the fingerprints of every file in their transitive closure (and of the
+        config files), which are compared against the previous checks to tell Pyrefly what changed
+        on disk.
+
+        Every file is opened (or changed) with a new version, so that the diagnostics published
+        for it can be told apart from those published before the check. An open document shadows
+        the file on disk, so any open document that changed on disk since is changed to match.
+        """
+        changed = [
+            path
+            for path, fingerprint in fingerprints.items()
+            if self._fingerprints.get(path, fingerprint) != fingerprint
+        ]
+        self._fingerprints.update(fingerprints)
+        if changed:
+            # Any change may affect the diagnostics of any file
+            self._diagnostics.clear()
+        elif all(path in self._diagnostics for path in files):
+            return self._checked_diagnostics(files)
+
+        # Don't mistake what was published after the previous check for the results of this one
+        self._drain()
+        changed_files = [
+            {"uri": _uri(os.path.join(self._build_root, path)), "type": _CHANGED}
+            for path in changed
+            if path not in files and path not in self._versions
+        ]
+        if changed_files:
+            self._notify("workspace/didChangeWatchedFiles", {"changes": changed_files})
+        for path in changed:
+            if path not in files and path in self._versions:
+                try:
+                    content = Path(self._build_root, path).read_bytes()
+                except FileNotFoundError:
+                    self._close(path)
+                else:
+                    self._sync(path, content)
+
+        for path, content in files.items():
+            self._sync(path, content)
+        self._wait_for_diagnostics(set(files))
+        return self._checked_diagnostics(files)
+
+    def _sync(self, path: str, content: bytes) -> None:
+        """Open the document for `path`, or change it, with a new version."""
+        uri = _uri(os.path.join(self._build_root, path))
+        text = content.decode(errors="replace")
+        if path not in self._versions:
+            self._versions[path] = 0
+            self._notify(
+                "textDocument/didOpen",
+                {"textDocument": {"uri": uri, "languageId": "python", "version": 0, "text": text}},
+            )
+        else:
+            self._versions[path] += 1
+            self._notify(
+                "textDocument/didChange",
+                {
+                    "textDocument": {"uri": uri, "version": self._versions[path]},
+                    "contentChanges": [{"text": text}],
+                },
+            )
+
+    def _close(self, path: str) -> None:
+        del self._versions[path]
+        uri = _uri(os.path.join(self._build_root, path))
+        self._notify("textDocument/didClose", {"textDocument": {"uri": uri}})
+
+    def _checked_diagnostics(self, files: Iterable[str]) -> list[dict[str, Any]]:
+        return [diagnostic for path in files for diagnostic in self._diagnostics[path]]
+
+    def _wait_for_diagnostics(self, pending: set[str]) -> None:
+        """Wait for the diagnostics of the latest version of each `pending` file."""
+        deadline = time.monotonic() + self._timeout
+        while pending:
+            try:
+                message = self._next_message(max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                raise PyreflyDaemonError(
+                    f"Timed out waiting for diagnostics for {len(pending)} files."
+                )
+            if message.get("method") != "textDocument/publishDiagnostics":
+                continue
+            try:
+                params = message["params"]
+                path = self._relpath(params["uri"])
+                if path not in pending:
+                    continue
+                # The version is optional, but if it's given it must be the latest one
+                version = self._versions[path]
+                if params.get("version", version) != version:
+                    continue
+                self._diagnostics[path] = self._parse_diagnostics(path, params["diagnostics"])
+            except (KeyError, TypeError) as e:
+                raise PyreflyDaemonError(
+                    f"Unexpected message from the language server: {message}"
+                ) from e
+            pending.discard(path)
+
+    def _drain(self) -> None:
+        """Handle the messages the server has already sent."""
+        try:
+            while True:
+                self._next_message(0)
+        except queue.Empty:
+            pass
+
+    def _next_message(self, timeout: float) -> dict[str, Any]:
+        """Get the next message from the server, responding to it if it's a request."""
+        message = self._messages.get(timeout=timeout)
+        if message is None:
+            raise PyreflyDaemonError("Pyrefly language server exited unexpectedly.")
+        if isinstance(message, PyreflyDaemonError):
+            raise message
+        try:
+            if "id" in message and "method" in message:
+                self._respond(message)
+        except (KeyError, TypeError) as e:
+            raise PyreflyDaemonError(
+                f"Unexpected message from the language server: {message}"
+            ) from e
+        return message
+
+    def _relpath(self, uri: str) -> str:
+        return os.path.relpath(_path(uri), self._build_root)
+
+    def _parse_diagnostics(
+        self, path: str, diagnostics: Iterable[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        return [
+            {
+                "path": path,
+                "line": diagnostic["range"]["start"]["line"] + 1,
+                "column": diagnostic["range"]["start"]["character"] + 1,
+                "code": str(diagnostic.get("code", "")),
+                "severity": _SEVERITIES.get(diagnostic.get("severity", 1), "error"),
+                "message": diagnostic["message"],
+            }
+            for diagnostic in diagnostics
+        ]
+
+    def _respond(self, request: dict[str, Any]) -> None:
+        result: Any = None
+        if request["method"] == "workspace/configuration":
+            # Point Pyrefly at the requirements venv and source roots, as an editor would
+            result = [
+                {
+                    "pythonPath": self._python_interpreter,
+                    "analysis": {"extraPaths": list(self._search_paths)},
+                }
+                if item.get("section") == "python"
+                else None
+                for item in request["params"]["items"]
+            ]
+        self._send({"jsonrpc": "2.0", "id": request["id"], "result": result})
+
+    def _request(self, method: str, params: dict[str, Any]) -> Any:
+        self._next_id += 1
+        request_id = self._next_id
+        self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        deadline = time.monotonic() + self._timeout
+        while True:
+            try:
+                message = self._next_message(max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                raise PyreflyDaemonError(f"Timed out waiting for a response to `{method}`.")
+            if message.get("id") == request_id and "method" not in message:
+                if "error" in message:
+                    raise PyreflyDaemonError(f"`{method}` failed: {message['error']}")
+                return message.get("result")
+
+    def _notify(self, method: str, params: dict[str, Any]) -> None:
+        self._send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def _send(self, message: dict[str, Any]) -> None:
+        assert self._process.stdin is not None
+        try:
+            self._process.stdin.write(encode_message(message))
+            self._process.stdin.flush()
+        except (BrokenPipeError, ValueError) as e:
+            raise PyreflyDaemonError("Pyrefly language server exited unexpectedly.") from e
+
+    def _read_messages(self) -> None:
+        assert self._process.stdout is not None
+        while True:
+            try:
+                message = read_message(self._process.stdout)
+            except PyreflyDaemonError as e:
+                # The stream can't be resynchronized, so the server is as good as dead
+                self._process.kill()
+                self._process.wait()
+                self._messages.put(e)
+                return
+            self._messages.put(message)
+            if message is None:
+                return
+
+
+def _recv_all(conn: socket.socket) -> bytes:
+    chunks = []
+    while chunk := conn.recv(65536):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def serve(
+    socket_path: str,
+    exe: str,
+    build_root: str,
+    python_interpreter: str,
+    search_paths: tuple[str, ...],
+    timeout: float,
+) -> None:
+    """Serve check requests on `socket_path` (one at a time) until idle, or the server fails."""
+    daemon = PyreflyDaemon(exe, build_root, python_interpreter, search_paths, timeout)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    inode = os.stat(socket_path).st_ino
+    server.listen()
+    server.settimeout(_IDLE_TIMEOUT_SECONDS)
+    try:
+        while daemon.alive:
+            try:
+                conn, _ = server.accept()
+            # Only an alias of `TimeoutError` from Python 3.10, and the venv may be older
+            except socket.timeout:  # noqa: UP041
+                return
+            with conn:
+                conn.settimeout(None)
+                request = json.loads(_recv_all(conn))
+                try:
+                    response: dict[str, Any] = {
+                        "diagnostics": daemon.check(
+                            {path: content.encode() for path, content in request["files"].items()},
+                            request["fingerprints"],
+                        )
+                    }
+                except PyreflyDaemonError as e:
+                    conn.sendall(json.dumps({"error": str(e)}).encode())
+                    return
+                conn.sendall(json.dumps(response).encode())
+    finally:
+        # Stop accepting requests before the language server goes, but don't remove the socket of
+        # a server which has since replaced this one
+        try:
+            if os.stat(socket_path).st_ino == inode:
+                os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+        server.close()
+        daemon.shutdown()
+
+
+def _install(source: str, destination: str) -> str:
+    """Copy `source` to `destination` (atomically) if it isn't already there."""
+    if not os.path.exists(destination):
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        tmp = f"{destination}.{os.getpid()}.tmp"
+        shutil.copy2(source, tmp)
+        os.replace(tmp, destination)
+    return destination
+
+
+def _connect(socket_path: str) -> socket.socket | None:
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        conn.close()
+        return None
+    return conn
+
+
+def _start_server(cache_dir: str, key: str, serve_args: list[str], timeout: float) -> socket.socket:
+    """Start a detached server for `key`, returning a connection once it's listening."""
+    socket_path = os.path.join(cache_dir, f"{key}.sock")
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    # The sandbox this runs in is deleted once the check is done, so the server runs a copy of this
+    # script from the cache
+    with open(__file__, "rb") as f:
+        script_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+    script = _install(__file__, os.path.join(cache_dir, f"daemon-{script_hash}.py"))
+    log_path = os.path.join(cache_dir, f"{key}.log")
+    with open(log_path, "wb") as log:
+        process = subprocess.Popen(
+            (sys.executable, script, "serve", "--socket", socket_path, *serve_args),
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        conn = _connect(socket_path)
+        if conn is not None:
+            return conn
+        if process.poll() is not None:
+            with open(log_path, errors="replace") as log:
+                raise PyreflyDaemonError(f"The Pyrefly server failed to start:\n{log.read()}")
+        time.sleep(0.05)
+    process.kill()
+    raise PyreflyDaemonError("Timed out waiting for the Pyrefly server to start.")
+
+
+def check(args: argparse.Namespace) -> int:
+    # The language server infers the Python version from the interpreter, so only use it when that
+    # matches the version a sandboxed check would use
+    python_version = "{}.{}".format(*sys.version_info[:2])
+    if python_version != args.python_version:
+        print(
+            f"The requirements venv's interpreter is Python {python_version}, rather than the "
+            f"partition's minimum of {args.python_version}.",
+            file=sys.stderr,
+        )
+        return 1
+
+    cache_dir = os.path.realpath(args.cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    exe = _install(args.exe, os.path.join(cache_dir, args.version, "pyrefly"))
+    with open(args.request, "rb") as f:
+        request = json.load(f)
+    request = {
+        "files": {path: Path(path).read_text(errors="replace") for path in request["files"]},
+        "fingerprints": request["fingerprints"],
+    }
+
+    try:
+        # Only one check starts the server for a key
+        with open(os.path.join(cache_dir, f"{args.key}.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            conn = _connect(os.path.join(cache_dir, f"{args.key}.sock")) or _start_server(
+                cache_dir,
+                args.key,
+                [
+                    "--exe",
+                    exe,
+                    "--build-root",
+                    args.build_root,
+                    "--timeout",
+                    str(args.timeout),
+                    *(arg for path in args.search_path for arg in ("--search-path", path)),
+                ],
+                args.timeout,
+            )
+        with conn:
+            conn.settimeout(args.timeout)
+            conn.sendall(json.dumps(request).encode())
+            conn.shutdown(socket.SHUT_WR)
+            response = json.loads(_recv_all(conn) or b'{"error": "The Pyrefly server exited."}')
+    except (PyreflyDaemonError, OSError, ValueError) as e:
+        print(f"{e}", file=sys.stderr)
+        return 1
+
+    if "error" in response:
+        print(response["error"], file=sys.stderr)
+        return 1
+    print(json.dumps(response["diagnostics"]))
+    return 0
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="pyrefly_daemon")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = subparsers.add_parser("check")
+    check_parser.add_argument("request")
+    check_parser.add_argument("--cache-dir", required=True)
+    check_parser.add_argument("--key", required=True)
+    check_parser.add_argument("--version", required=True)
+    check_parser.add_argument("--python-version", required=True)
+
+    serve_parser = subparsers.add_parser("serve")
+    serve_parser.add_argument("--socket", required=True)
+
+    for subparser in (check_parser, serve_parser):
+        subparser.add_argument("--exe", required=True)
+        subparser.add_argument("--build-root", required=True)
+        subparser.add_argument("--search-path", action="append", default=[])
+        subparser.add_argument("--timeout", type=float, required=True)
+
+    args = parser.parse_args(argv)
+    if args.command == "check":
+        return check(args)
+    serve(
+        args.socket,
+        args.exe,
+        args.build_root,
+        sys.executable,
+        tuple(args.search_path),
+        args.timeout,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,280 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+from experimental.pyrefly.daemon import (
+    PyreflyDaemon,
+    PyreflyDaemonError,
+    encode_message,
+    main,
+    read_message,
+)
+
+# A stand-in for `pyrefly lsp`, which publishes each open document's text as its diagnostic, along
+# with the names of the other files it was told changed. As in the real server, an open document
+# shadows the file on disk, so it only changes through `didChange`.
+FAKE_SERVER = dedent(
+    """\
+    import json
+    import sys
+
+
+    def read():
+        length = None
+        while True:
+            line = sys.stdin.buffer.readline()
+            if not line:
+                sys.exit(0)
+            if line == b"\\r\\n":
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        return json.loads(sys.stdin.buffer.read(length))
+
+
+    def write(body):
+        sys.stdout.buffer.write(b"Content-Length: %d\\r\\n\\r\\n" % len(body) + body)
+        sys.stdout.buffer.flush()
+
+
+    def publish(uri, text=None):
+        diagnostics = []
+        if text is not None:
+            others = sorted(name for name in changed if name != uri.rsplit("/", 1)[1])
+            message = text + (" after changes to " + ", ".join(others) if others else "")
+            diagnostic = {
+                "range": {"start": {"line": 2, "character": 4}},
+                "severity": 1,
+                "code": "bad-thing",
+                "message": message,
+            }
+            diagnostics.append(diagnostic)
+        params = {"uri": uri, "diagnostics": diagnostics}
+        if uri in documents:
+            params["version"] = documents[uri][0]
+        method = "textDocument/publishDiagnostics"
+        write(json.dumps({"jsonrpc": "2.0", "method": method, "params": params}).encode())
+
+
+    documents = {}
+    changed = set()
+    while True:
+        message = read()
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "initialize":
+            write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": {}}).encode())
+            continue
+        if method == "workspace/didChangeWatchedFiles":
+            for change in params["changes"]:
+                if change["uri"] not in documents:
+                    changed.add(change["uri"].rsplit("/", 1)[1])
+            for uri, (_, text) in documents.items():
+                publish(uri, text)
+        elif method == "textDocument/didClose":
+            uri = params["textDocument"]["uri"]
+            del documents[uri]
+            publish(uri)
+        elif method in ("textDocument/didOpen", "textDocument/didChange"):
+            uri, version = params["textDocument"]["uri"], params["textDocument"]["version"]
+            if method == "textDocument/didOpen":
+                text = params["textDocument"]["text"]
+            else:
+                text = params["contentChanges"][0]["text"]
+                if text != documents[uri][1]:
+                    changed.add(uri.rsplit("/", 1)[1])
+            if text == "exit":
+                sys.exit(1)
+            if text == "garbage":
+                write(b"{oops")
+                continue
+            documents[uri] = (version, text)
+            publish(uri, text)
+    """
+)
+
+
+@pytest.fixture
+def fake_pyrefly(tmp_path: Path) -> str:
+    exe = tmp_path / "pyrefly"
+    exe.write_text(f"#!{sys.executable}\n{FAKE_SERVER}")
+    exe.chmod(0o755)
+    return str(exe)
+
+
+@pytest.fixture
+def daemon(fake_pyrefly: str, tmp_path: Path) -> Iterator[PyreflyDaemon]:
+    daemon = PyreflyDaemon(fake_pyrefly, str(tmp_path), sys.executable, (), timeout=30)
+    yield daemon
+    daemon.shutdown()
+
+
+def diagnostic(path: str, message: str) -> dict[str, object]:
+    return {
+        "path": path,
+        "line": 3,
+        "column": 5,
+        "code": "bad-thing",
+        "severity": "error",
+        "message": message,
+    }
+
+
+def test_read_message() -> None:
+    stream = io.BytesIO(encode_message({"id": 1}) + encode_message({"id": 2}))
+    assert read_message(stream) == {"id": 1}
+    assert read_message(stream) == {"id": 2}
+    assert read_message(stream) is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"Content-Length: 5\r\n\r\n{oops", b"Content-Length: nope\r\n\r\n{}", b"\r\n{}"],
+)
+def test_read_invalid_message(data: bytes) -> None:
+    with pytest.raises(PyreflyDaemonError):
+        read_message(io.BytesIO(data))
+
+
+def test_check(daemon: PyreflyDaemon) -> None:
+    assert daemon.check({"a.py": b"first"}, {"a.py": "1", "b.py": "1"}) == [
+        diagnostic("a.py", "first")
+    ]
+    # Nothing changed, so the last diagnostics are returned without asking the server
+    assert daemon.check({"a.py": b"first"}, {"a.py": "1", "b.py": "1"}) == [
+        diagnostic("a.py", "first")
+    ]
+    assert daemon.check({"a.py": b"second"}, {"a.py": "2", "b.py": "1"}) == [
+        diagnostic("a.py", "second")
+    ]
+
+
+def test_check_sends_changed_files(daemon: PyreflyDaemon) -> None:
+    daemon.check({"a.py": b"first"}, {"a.py": "1", "b.py": "1", "pyrefly.toml": "1"})
+    assert daemon.check({"a.py": b"first"}, {"a.py": "1", "b.py": "2", "pyrefly.toml": "2"}) == [
+        diagnostic("a.py", "first after changes to b.py, pyrefly.toml")
+    ]
+    # Any change invalidates the diagnostics of every file
+    assert daemon.check({"c.py": b"third"}, {"c.py": "1", "b.py": "3"}) == [
+        diagnostic("c.py", "third after changes to b.py, pyrefly.toml")
+    ]
+    assert daemon.check({"a.py": b"first"}, {"a.py": "1", "b.py": "3", "pyrefly.toml": "2"}) == [
+        diagnostic("a.py", "first after changes to b.py, pyrefly.toml")
+    ]
+
+
+def test_check_dependency_changed(daemon: PyreflyDaemon, tmp_path: Path) -> None:
+    # b.py is still open from its own check when it changes on disk, and then becomes a dependency
+    # of a.py, whose check must see that change
+    assert daemon.check({"b.py": b"second"}, {"b.py": "1"}) == [diagnostic("b.py", "second")]
+    (tmp_path / "b.py").write_text("second, changed")
+    assert daemon.check({"a.py": b"first"}, {"a.py": "1", "b.py": "2"}) == [
+        diagnostic("a.py", "first after changes to b.py")
+    ]
+    # b.py is deleted, so it's closed
+    (tmp_path / "b.py").unlink()
+    assert daemon.check({"a.py": b"first"}, {"a.py": "1", "b.py": "3"}) == [
+        diagnostic("a.py", "first after changes to b.py")
+    ]
+
+
+def test_invalid_message_fails_fast(daemon: PyreflyDaemon) -> None:
+    start = time.monotonic()
+    with pytest.raises(PyreflyDaemonError, match="Invalid LSP message"):
+        daemon.check({"a.py": b"garbage"}, {"a.py": "1"})
+    assert time.monotonic() - start < 10
+    assert not daemon.alive
+
+
+def test_server_exits(daemon: PyreflyDaemon) -> None:
+    with pytest.raises(PyreflyDaemonError, match="exited unexpectedly"):
+        daemon.check({"a.py": b"exit"}, {"a.py": "1"})
+
+
+def run_client(
+    tmp_path: Path, fake_pyrefly: str, capsys: pytest.CaptureFixture[str], content: str
+) -> tuple[int, str, str]:
+    (tmp_path / "a.py").write_text(content)
+    (tmp_path / "request.json").write_text(
+        json.dumps({"files": ["a.py"], "fingerprints": {"a.py": content}})
+    )
+    exit_code = main(
+        [
+            "check",
+            "request.json",
+            "--cache-dir=cache",
+            "--key=test",
+            "--version=0.0.0",
+            "--python-version={}.{}".format(*sys.version_info[:2]),
+            f"--exe={fake_pyrefly}",
+            f"--build-root={tmp_path}",
+            "--timeout=30",
+        ]
+    )
+    stdout, stderr = capsys.readouterr()
+    return exit_code, stdout, stderr
+
+
+def test_client(
+    tmp_path: Path,
+    fake_pyrefly: str,
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    socket_path = tmp_path / "cache" / "test.sock"
+
+    # The first check starts the server, and the second reuses it
+    assert run_client(tmp_path, fake_pyrefly, capsys, "first") == (
+        0,
+        json.dumps([diagnostic("a.py", "first")]) + "\n",
+        "",
+    )
+    assert socket_path.exists()
+    assert (tmp_path / "cache" / "0.0.0" / "pyrefly").exists()
+    assert run_client(tmp_path, fake_pyrefly, capsys, "second")[:2] == (
+        0,
+        json.dumps([diagnostic("a.py", "second")]) + "\n",
+    )
+
+    # A failing language server fails the check, and takes the server down with it
+    exit_code, _, stderr = run_client(tmp_path, fake_pyrefly, capsys, "exit")
+    assert exit_code == 1
+    assert "exited unexpectedly" in stderr
+    deadline = time.monotonic() + 10
+    while socket_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not socket_path.exists()
+
+
+def test_client_wrong_interpreter(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    exit_code = main(
+        [
+            "check",
+            "request.json",
+            "--cache-dir=cache",
+            "--key=test",
+            "--version=0.0.0",
+            "--python-version=2.7",
+            "--exe=pyrefly",
+            f"--build-root={tmp_path}",
+            "--timeout=30",
+        ]
+    )
+    assert exit_code == 1
+    assert "rather than the partition's minimum of 2.7" in capsys.readouterr().err
+    assert not os.path.exists(tmp_path / "cache")
@@ -3,6 +3,9 @@
 
 from __future__ import annotations
 
+import dataclasses
+import hashlib
+import json
 import logging
 import os
 from collections.abc import Iterable
@@ -10,46 +13,64 @@ from dataclasses import dataclass
 
 from experimental.pyrefly.skip_field import SkipPyreflyField
 from experimental.pyrefly.subsystems import Pyrefly
+from experimental.util_rules import requirements_venv
+from experimental.util_rules.diagnostics import (
+    Diagnostic,
+    check_result_with_report,
+    create_report,
+    render_diagnostics,
+)
+from experimental.util_rules.partition import coherent_batches, merge_process_results
+from experimental.util_rules.profile import (
+    PartitionProfiler,
+    ProfiledCheckResult,
+    finish_profile,
+    profiled_check_result,
+    timed,
+)
+from experimental.util_rules.requirements_venv import (
+    RequirementsVenv,
+    RequirementsVenvRequest,
+    materialize_requirements_venv,
+)
 from pants.backend.python.subsystems.setup import PythonSetup
 from pants.backend.python.target_types import (
     InterpreterConstraintsField,
     PythonResolveField,
     PythonSourceField,
 )
-from pants.backend.python.util_rules import pex_from_targets
 from pants.backend.python.util_rules.interpreter_constraints import (
     InterpreterConstraints,
 )
 from pants.backend.python.util_rules.partition import (
     _partition_by_interpreter_constraints_and_resolve,
 )
-from pants.backend.python.util_rules.pex import (
-    PexRequest,
-    VenvPexProcess,
-    VenvPexRequest,
-    create_pex,
-    create_venv_pex,
-)
-from pants.backend.python.util_rules.pex_environment import PexEnvironment
-from pants.backend.python.util_rules.pex_from_targets import RequirementsPexRequest
 from pants.backend.python.util_rules.python_sources import (
     PythonSourceFilesRequest,
     prepare_python_sources,
 )
+from pants.base.build_root import BuildRoot
 from pants.core.goals.check import CheckRequest, CheckResult, CheckResults
 from pants.core.util_rules import config_files
-from pants.core.util_rules.config_files import find_config_file
-from pants.core.util_rules.external_tool import download_external_tool
+from pants.core.util_rules.config_files import ConfigFiles, find_config_file
+from pants.core.util_rules.environments import EnvironmentTarget, LocalEnvironmentTarget
+from pants.core.util_rules.external_tool import DownloadedExternalTool, download_external_tool
 from pants.core.util_rules.source_files import (
     SourceFilesRequest,
     determine_source_files,
 )
+from pants.engine.addresses import Addresses
 from pants.engine.collection import Collection
-from pants.engine.fs import MergeDigests
+from pants.engine.fs import EMPTY_DIGEST, CreateDigest, FileContent, FileEntry, MergeDigests
 from pants.engine.internals.graph import resolve_coarsened_targets
-from pants.engine.intrinsics import execute_process, merge_digests
+from pants.engine.intrinsics import (
+    create_digest,
+    execute_process,
+    get_digest_entries,
+    merge_digests,
+)
 from pants.engine.platform import Platform
-from pants.engine.process import Process, ProcessCacheScope, execute_process_or_raise
+from pants.engine.process import Process, ProcessCacheScope
 from pants.engine.rules import Rule, collect_rules, concurrently, implicitly, rule
 from pants.engine.target import (
     CoarsenedTargets,
@@ -60,10 +81,20 @@ from pants.engine.target import (
 from pants.engine.unions import UnionRule
 from pants.util.logging import LogLevel
 from pants.util.ordered_set import FrozenOrderedSet, OrderedSet
+from pants.util.resources import read_resource
 from pants.util.strutil import pluralize
 
 logger = logging.getLogger(__name__)
 
+# The transitive sources and config files are mounted here, as Pyrefly's working directory
+_SOURCES_KEY = "__sources"
+
+# The language server outlives the sandbox, so it (and its binary) is kept in this named cache
+_DAEMON_CACHE_NAME = "pyrefly_daemon"
+_DAEMON_CACHE_PATH = ".cache/pyrefly_daemon"
+_DAEMON_SCRIPT = "__pyrefly_daemon.py"
+_DAEMON_REQUEST = "__pyrefly_daemon_request.json"
+
 
 @dataclass(frozen=True)
 class PyreflyFieldSet(FieldSet):
@@ -88,6 +119,7 @@ class PyreflyPartition:
     root_targets: CoarsenedTargets
     resolve_description: str | None
     interpreter_constraints: InterpreterConstraints
+    resolve: str
 
     def description(self) -> str:
         ics = str(sorted(str(c) for c in self.interpreter_constraints))
@@ -98,84 +130,291 @@ class PyreflyPartitions(Collection[PyreflyPartition]):
     pass
 
 
-@rule(
-    desc="Pyrefly typecheck each partition based on its interpreter_constraints",
-    level=LogLevel.DEBUG,
-)
-async def pyrefly_typecheck_partition(
+def _parse_diagnostics(stdout: bytes) -> list[Diagnostic]:
+    """Parse Pyrefly's JSON output (`--output-format=json`)."""
+    if not stdout.strip():
+        return []
+    return [
+        Diagnostic(
+            path=error["path"],
+            line=error["line"],
+            column=error["column"],
+            code=error["name"],
+            severity=error.get("severity", "error"),
+            message=error["description"],
+        )
+        for error in json.loads(stdout)["errors"]
+    ]
+
+
+async def _batch_partition(
+    partition: PyreflyPartition, batch_size: int
+) -> tuple[PyreflyPartition, ...]:
+    """Split a partition into dependency-coherent batches of root targets, balanced by source size."""
+    sources = await determine_source_files(
+        SourceFilesRequest(fs.sources for fs in partition.field_sets)
+    )
+    entries = await get_digest_entries(sources.snapshot.digest)
+    file_sizes = {
+        entry.path: entry.file_digest.serialized_bytes_length
+        for entry in entries
+        if isinstance(entry, FileEntry)
+    }
+
+    field_sets_by_address = {fs.address: fs for fs in partition.field_sets}
+    field_sets_by_root = {
+        root: [
+            field_sets_by_address[tgt.address]
+            for tgt in root.members
+            if tgt.address in field_sets_by_address
+        ]
+        for root in partition.root_targets
+    }
+
+    batches = coherent_batches(
+        tuple(partition.root_targets),
+        dependencies=lambda root: root.dependencies,
+        size=lambda root: len(field_sets_by_root[root]),
+        weight=lambda root: sum(
+            file_sizes.get(fs.sources.file_path or "", 0) for fs in field_sets_by_root[root]
+        ),
+        batch_size=batch_size,
+    )
+    return tuple(
+        dataclasses.replace(
+            partition,
+            field_sets=FrozenOrderedSet(fs for root in batch for fs in field_sets_by_root[root]),
+            root_targets=CoarsenedTargets(batch),
+        )
+        for batch in batches
+    )
+
+
+def _python_version(partition: PyreflyPartition) -> str:
+    # TODO: If finding the minimum failed, just arbitrarily hardcoded it to 3.10...
+    return (
+        partition.interpreter_constraints.minimum_python_version(
+            ["3.7", "3.8", "3.9", "3.10", "3.11", "3.12", "3.13", "3.14"]
+        )
+        or "3.10"
+    )
+
+
+def _daemon_diagnostics(stdout: bytes) -> list[Diagnostic]:
+    """Parse the diagnostics printed by the language server's client (see `daemon.py`)."""
+    return [Diagnostic(**diagnostic) for diagnostic in json.loads(stdout)]
+
+
+async def _check_with_daemon(
     partition: PyreflyPartition,
     pyrefly: Pyrefly,
-    platform: Platform,
-    pex_environment: PexEnvironment,
-) -> CheckResult:
-    pyrefly_tool, config_files, roots_sources, transitive_sources, requirements_pex = await concurrently(
-        download_external_tool(pyrefly.get_request(platform)),
-        find_config_file(pyrefly.config_request()),
+    pyrefly_tool: DownloadedExternalTool,
+    config_files: ConfigFiles,
+    requirements_venv: RequirementsVenv,
+    build_root: BuildRoot,
+    environment_target: EnvironmentTarget,
+    profiler: PartitionProfiler,
+) -> ProfiledCheckResult | None:
+    """Check a partition with the Pyrefly language server, or return None if it can't be used.
+
+    The root files are sent to the server as open documents, along with any changes to their
+    transitive closure (and the config files) since the last check, so that only the affected
+    files are re-checked. The server is talked to by a Process, so that waiting on it doesn't tie
+    up the engine.
+    """
+    if environment_target.val is not None and not isinstance(
+        environment_target.val, LocalEnvironmentTarget
+    ):
+        logger.warning(
+            "The Pyrefly language server only runs in a local environment, so "
+            f"{partition.description()} will be checked in a sandbox instead."
+        )
+        return None
+    if pyrefly.args:
+        logger.warning(
+            "`[pyrefly].args` can't be passed to the Pyrefly language server, so "
+            f"{partition.description()} will be checked in a sandbox instead."
+        )
+        return None
+
+    roots, sources = await concurrently(
         determine_source_files(SourceFilesRequest(fs.sources for fs in partition.field_sets)),
         prepare_python_sources(
             PythonSourceFilesRequest(partition.root_targets.closure()), **implicitly()
         ),
-        create_pex(
-            **implicitly(
-                RequirementsPexRequest(
-                    (fs.address for fs in partition.field_sets),
-                    hardcoded_interpreter_constraints=partition.interpreter_constraints,
-                )
-            )
-        ),
+    )
+    entries = await get_digest_entries(
+        await merge_digests(
+            MergeDigests((sources.source_files.snapshot.digest, config_files.snapshot.digest))
+        )
     )
 
-    # Create a venv with the 3rd-party requirements and let Pyrefly know about it using `--venv`
-    complete_pex_env = pex_environment.in_workspace()
-    requirements_venv_pex = await create_venv_pex(
-        VenvPexRequest(
-            PexRequest(
-                output_filename="requirements_venv.pex",
-                internal_only=True,
-                pex_path=[requirements_pex],
-                interpreter_constraints=partition.interpreter_constraints,
+    python_version = _python_version(partition)
+    interpreter = os.path.join(requirements_venv.path, "bin", "python")
+    search_paths = tuple(os.path.join(build_root.path, root) for root in sources.source_roots)
+    # A server per Pyrefly version, interpreter, source roots and config files. Changes to the
+    # config files' content are sent to the server along with changes to the sources
+    key = hashlib.sha256(
+        json.dumps(
+            [pyrefly.version, interpreter, search_paths, sorted(config_files.snapshot.files)]
+        ).encode()
+    ).hexdigest()[:16]
+    request = {
+        "files": roots.snapshot.files,
+        "fingerprints": {
+            entry.path: entry.file_digest.fingerprint
+            for entry in entries
+            if isinstance(entry, FileEntry)
+        },
+    }
+    client_digest = await create_digest(
+        CreateDigest(
+            [
+                FileContent(_DAEMON_SCRIPT, read_resource("experimental.pyrefly", "daemon.py")),
+                FileContent(_DAEMON_REQUEST, json.dumps(request).encode()),
+            ]
+        )
+    )
+    input_digest = await merge_digests(
+        MergeDigests((client_digest, roots.snapshot.digest, pyrefly_tool.digest))
+    )
+    profiler.phase("sources")
+
+    result = await execute_process(
+        Process(
+            argv=(
+                interpreter,
+                _DAEMON_SCRIPT,
+                "check",
+                _DAEMON_REQUEST,
+                f"--cache-dir={_DAEMON_CACHE_PATH}",
+                f"--key={key}",
+                f"--version={pyrefly.version}",
+                f"--python-version={python_version}",
+                f"--exe={pyrefly_tool.exe}",
+                f"--build-root={build_root.path}",
+                f"--timeout={pyrefly.daemon_timeout}",
+                *(f"--search-path={path}" for path in search_paths),
+            ),
+            input_digest=input_digest,
+            append_only_caches={_DAEMON_CACHE_NAME: _DAEMON_CACHE_PATH},
+            description=(
+                f"Check {pluralize(len(roots.files), 'file')} with the Pyrefly language server."
             ),
-            complete_pex_env,
+            level=LogLevel.DEBUG,
+            # The server reads the sources from the build root, so its results can't be reused
+            # by another session
+            cache_scope=ProcessCacheScope.PER_SESSION,
         ),
         **implicitly(),
     )
-
-    # Force the requirements venv to materialize always by running a no-op.
-    # This operation must be called with `ProcessCacheScope.SESSION`
-    # so that it runs every time.
-    # TODO: Cargo culted from the Pyright backend
-    _ = await execute_process_or_raise(
-        **implicitly(
-            VenvPexProcess(
-                requirements_venv_pex,
-                description="Force venv to materialize",
-                argv=["-c", "''"],
-                cache_scope=ProcessCacheScope.PER_SESSION,
-            )
+    if result.exit_code != 0:
+        logger.warning(
+            f"The Pyrefly language server failed, so {partition.description()} will be checked "
+            f"in a sandbox instead: {result.stderr.decode(errors='replace').strip()}"
         )
+        return None
+    diagnostics = _daemon_diagnostics(result.stdout)
+    profiler.phase("daemon")
+
+    check_result = CheckResult(
+        exit_code=int(any(d.severity == "error" for d in diagnostics)),
+        stdout=render_diagnostics(diagnostics),
+        stderr="",
+        partition_description=partition.description(),
+        report=await create_report(diagnostics) if pyrefly.report else EMPTY_DIGEST,
     )
+    profiler.phase("report")
 
-    input_digest = await merge_digests(
-        MergeDigests(
-            (
-                # roots_sources.snapshot.digest,
-                transitive_sources.source_files.snapshot.digest,
-                config_files.snapshot.digest,
-                requirements_venv_pex.digest,
-            )
-        )
+    profile = await finish_profile(
+        profiler,
+        measure_inputs=pyrefly.profile,
+        sources=(sources.source_files.snapshot.digest,),
+        requirements_venv=requirements_venv,
     )
+    return await profiled_check_result(check_result, profile, write_report=pyrefly.profile)
 
-    immutable_input_key = "__pyrefly_tool"
-    exe_path = os.path.join(immutable_input_key, pyrefly_tool.exe)
 
-    # TODO: If finding the minimum failed, just arbitrarily hardcoded it to 3.10...
-    python_version = (
-        partition.interpreter_constraints.minimum_python_version(
-            ["3.7", "3.8", "3.9", "3.10", "3.11", "3.12", "3.13", "3.14"]
+@rule(
+    desc="Pyrefly typecheck each partition based on its interpreter_constraints",
+    level=LogLevel.DEBUG,
+)
+async def pyrefly_typecheck_partition(
+    partition: PyreflyPartition,
+    pyrefly: Pyrefly,
+    platform: Platform,
+    build_root: BuildRoot,
+    environment_target: EnvironmentTarget,
+) -> ProfiledCheckResult:
+    profiler = PartitionProfiler(Pyrefly.options_scope, partition.description())
+    pyrefly_tool, config_files, requirements_venv = await concurrently(
+        timed(profiler, "download_tool", download_external_tool(pyrefly.get_request(platform))),
+        timed(profiler, "config_files", find_config_file(pyrefly.config_request())),
+        # Create a venv with the 3rd-party requirements and let Pyrefly know about it
+        timed(
+            profiler,
+            "requirements_venv",
+            materialize_requirements_venv(
+                RequirementsVenvRequest(
+                    partition.resolve,
+                    partition.interpreter_constraints,
+                    Addresses(fs.address for fs in partition.field_sets),
+                ),
+                **implicitly(),
+            ),
+        ),
+    )
+
+    profiler.phase("setup")
+
+    if pyrefly.use_daemon:
+        daemon_result = await _check_with_daemon(
+            partition,
+            pyrefly,
+            pyrefly_tool,
+            config_files,
+            requirements_venv,
+            build_root,
+            environment_target,
+            profiler,
         )
-        or "3.10"
+        if daemon_result is not None:
+            return daemon_result
+
+    # The requirements venv is shared by every batch, so that batching doesn't create (and
+    # materialize) a venv per batch
+    batches = (
+        await _batch_partition(partition, pyrefly.batch_size)
+        if pyrefly.batch_size
+        else (partition,)
+    )
+    roots_sources = await concurrently(
+        determine_source_files(SourceFilesRequest(fs.sources for fs in batch.field_sets))
+        for batch in batches
+    )
+    transitive_sources = await concurrently(
+        prepare_python_sources(
+            PythonSourceFilesRequest(batch.root_targets.closure()), **implicitly()
+        )
+        for batch in batches
     )
+    profiler.phase("sources")
+
+    # The sources are passed as immutable inputs, which are materialized once per digest and then
+    # symlinked into each sandbox, rather than being copied in for every run. The config files are
+    # merged in, so that the tool discovers them in its working directory.
+    sources_digests = await concurrently(
+        merge_digests(
+            MergeDigests((sources.source_files.snapshot.digest, config_files.snapshot.digest))
+        )
+        for sources in transitive_sources
+    )
+    profiler.phase("merge_inputs")
+
+    immutable_input_key = "__pyrefly_tool"
+    exe_path = os.path.join("{chroot}", immutable_input_key, pyrefly_tool.exe)
+
+    python_version = _python_version(partition)
     # TODO: Handle this properly, checking out the various ways we can set the correct python version from config, pants, universe, etc
 
     TODO_DUMP_CONFIG = False
@@ -183,23 +422,52 @@ async def pyrefly_typecheck_partition(
         "check" if not TODO_DUMP_CONFIG else "dump-config",
         f"--python-version={python_version}",
         # TODO: This is greasy... Also, I don't know the configuration very well yet - so, unsure if this is the one of 3-4 interpreter paths to use
-        f"--python-interpreter-path={os.path.join(complete_pex_env.pex_root, requirements_venv_pex.venv_rel_dir)}",
+        f"--python-interpreter-path={requirements_venv.path}",
+        *(("--output-format=json",) if pyrefly.report else ()),
     )
-    result = await execute_process(
-        Process(
-            argv=(exe_path, *initial_args, *pyrefly.args, *roots_sources.snapshot.files),
-            input_digest=input_digest,
-            immutable_input_digests={immutable_input_key: pyrefly_tool.digest},
-            description=f"Run Pyrefly on {pluralize(len(roots_sources.files), 'file')}.",
-            level=LogLevel.DEBUG,
-        ),
-        **implicitly(),
+    results = await concurrently(
+        execute_process(
+            Process(
+                argv=(
+                    exe_path,
+                    *initial_args,
+                    *(f"--search-path={root}" for root in sources.source_roots),
+                    *pyrefly.args,
+                    *roots.snapshot.files,
+                ),
+                immutable_input_digests={
+                    immutable_input_key: pyrefly_tool.digest,
+                    _SOURCES_KEY: sources_digest,
+                },
+                working_directory=_SOURCES_KEY,
+                description=f"Run Pyrefly on {pluralize(len(roots.files), 'file')}.",
+                level=LogLevel.DEBUG,
+            ),
+            **implicitly(),
+        )
+        for roots, sources, sources_digest in zip(
+            roots_sources, transitive_sources, sources_digests
+        )
     )
 
-    return CheckResult.from_fallible_process_result(
-        result,
-        partition_description=partition.description(),
+    profiler.phase("run")
+
+    if pyrefly.report:
+        result = await check_result_with_report(
+            results, _parse_diagnostics, partition.description()
+        )
+    else:
+        result = merge_process_results(results, partition.description())
+    profiler.phase("report")
+
+    profile = await finish_profile(
+        profiler,
+        measure_inputs=pyrefly.profile,
+        sources=sources_digests,
+        requirements_venv=requirements_venv,
+        results=results,
     )
+    return await profiled_check_result(result, profile, write_report=pyrefly.profile)
 
 
 @rule(
@@ -231,6 +499,7 @@ async def pyrefly_determine_partitions(
             ),
             resolve if len(python_setup.resolves) > 1 else None,
             interpreter_constraints or pyrefly.interpreter_constraints,
+            resolve,
         )
         for (resolve, interpreter_constraints), field_sets in sorted(
             resolve_and_interpreter_constraints_to_field_sets.items()
@@ -254,7 +523,7 @@ async def pyrefly_typecheck(
         pyrefly_typecheck_partition(partition, **implicitly()) for partition in partitions
     )
     return CheckResults(
-        partitioned_results,
+        [partitioned_result.result for partitioned_result in partitioned_results],
         checker_name=request.tool_name,
     )
 
@@ -263,6 +532,6 @@ def rules() -> Iterable[Rule | UnionRule]:
     return (
         *collect_rules(),
         *config_files.rules(),
-        *pex_from_targets.rules(),
+        *requirements_venv.rules(),
         UnionRule(CheckRequest, PyreflyRequest),
     )
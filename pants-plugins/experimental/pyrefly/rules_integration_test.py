@@ -0,0 +1,100 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import sys
+from textwrap import dedent
+
+import pytest
+from experimental.pyrefly import subsystems
+from experimental.pyrefly.rules import PyreflyFieldSet, PyreflyRequest
+from experimental.pyrefly.rules import rules as pyrefly_rules
+from pants.backend.python import target_types_rules
+from pants.backend.python.target_types import PythonSourcesGeneratorTarget
+from pants.backend.python.util_rules import python_sources
+from pants.core.goals.check import CheckResult, CheckResults
+from pants.core.util_rules import source_files
+from pants.engine.addresses import Address
+from pants.testutil.rule_runner import QueryRule, RuleRunner
+
+
+@pytest.fixture
+def rule_runner() -> RuleRunner:
+    return RuleRunner(
+        rules=[
+            *pyrefly_rules(),
+            *subsystems.rules(),
+            *python_sources.rules(),
+            *source_files.rules(),
+            *target_types_rules.rules(),
+            QueryRule(CheckResults, (PyreflyRequest,)),
+        ],
+        target_types=[PythonSourcesGeneratorTarget],
+    )
+
+
+GOOD_FILE = dedent(
+    """\
+    def add(x: int, y: int) -> int:
+        return x + y
+    """
+)
+
+BAD_FILE = dedent(
+    """\
+    from project.good import add
+
+    def greet() -> int:
+        return add(1, "2")
+    """
+)
+
+
+def run_pyrefly(rule_runner: RuleRunner, *, extra_args: list[str]) -> tuple[CheckResult, ...]:
+    rule_runner.write_files(
+        {
+            "project/good.py": GOOD_FILE,
+            "project/bad.py": BAD_FILE,
+            "project/BUILD": "python_sources()",
+        }
+    )
+    rule_runner.set_options(
+        [
+            "--python-enable-resolves=false",
+            # The language server is only used when the venv's interpreter is the partition's
+            # minimum version
+            "--python-interpreter-constraints=['=={}.{}.*']".format(*sys.version_info[:2]),
+            "--pyrefly-report",
+            *extra_args,
+        ],
+        env_inherit={"PATH", "PYENV_ROOT", "HOME"},
+    )
+    field_sets = [
+        PyreflyFieldSet.create(rule_runner.get_target(Address("project", relative_file_path=path)))
+        for path in ("good.py", "bad.py")
+    ]
+    return rule_runner.request(CheckResults, [PyreflyRequest(field_sets)]).results
+
+
+def test_daemon_matches_sandbox(rule_runner: RuleRunner) -> None:
+    sandbox_results = run_pyrefly(rule_runner, extra_args=[])
+    assert len(sandbox_results) == 1
+    assert sandbox_results[0].exit_code == 1
+    assert "project/bad.py:4:" in sandbox_results[0].stdout
+
+    daemon_results = run_pyrefly(rule_runner, extra_args=["--pyrefly-use-daemon"])
+    assert [(r.exit_code, r.stdout) for r in daemon_results] == [
+        (r.exit_code, r.stdout) for r in sandbox_results
+    ]
+
+
+def test_daemon_falls_back_with_args(rule_runner: RuleRunner) -> None:
+    # `[pyrefly].args` can't be passed to the language server, so the partition is checked in a
+    # sandbox, where they are
+    results = run_pyrefly(
+        rule_runner,
+        extra_args=["--pyrefly-use-daemon", "--pyrefly-args=--ignore=bad-argument-type"],
+    )
+    assert len(results) == 1
+    assert results[0].exit_code == 0
@@ -0,0 +1,101 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from experimental.pyrefly.rules import _daemon_diagnostics, _parse_diagnostics
+from experimental.util_rules.diagnostics import Diagnostic
+
+
+def test_daemon_diagnostics() -> None:
+    stdout = json.dumps(
+        [
+            {
+                "path": "src/app.py",
+                "line": 3,
+                "column": 5,
+                "code": "bad-return",
+                "severity": "error",
+                "message": "Returned type `str` is not assignable to declared return type `int`",
+            }
+        ]
+    ).encode()
+    assert _daemon_diagnostics(stdout) == [
+        Diagnostic(
+            path="src/app.py",
+            line=3,
+            column=5,
+            code="bad-return",
+            severity="error",
+            message="Returned type `str` is not assignable to declared return type `int`",
+        )
+    ]
+
+
+def test_daemon_diagnostics_empty() -> None:
+    assert _daemon_diagnostics(b"[]\n") == []
+
+
+@pytest.fixture
+def json_output() -> bytes:
+    return json.dumps(
+        {
+            "errors": [
+                {
+                    "line": 3,
+                    "column": 12,
+                    "stop_line": 3,
+                    "stop_column": 17,
+                    "path": "src/app.py",
+                    "code": -2,
+                    "name": "bad-return",
+                    "description": "Returned type `str` is not assignable to declared return "
+                    "type `int`",
+                    "concise_description": "Returned type `str` is not assignable",
+                    "severity": "error",
+                },
+                # Older versions of Pyrefly don't report a severity
+                {
+                    "line": 1,
+                    "column": 1,
+                    "path": "src/util.py",
+                    "name": "import-error",
+                    "description": "Could not find import of `yaml`",
+                },
+            ]
+        }
+    ).encode()
+
+
+def test_parse_diagnostics(json_output: bytes) -> None:
+    assert _parse_diagnostics(json_output) == [
+        Diagnostic(
+            path="src/app.py",
+            line=3,
+            column=12,
+            code="bad-return",
+            severity="error",
+            message="Returned type `str` is not assignable to declared return type `int`",
+        ),
+        Diagnostic(
+            path="src/util.py",
+            line=1,
+            column=1,
+            code="import-error",
+            severity="error",
+            message="Could not find import of `yaml`",
+        ),
+    ]
+
+
+@pytest.mark.parametrize("stdout", [b"", b"\n", b'{"errors": []}\n'])
+def test_parse_diagnostics_empty(stdout: bytes) -> None:
+    assert _parse_diagnostics(stdout) == []
+
+
+def test_parse_invalid_diagnostics() -> None:
+    with pytest.raises(KeyError):
+        _parse_diagnostics(b'{"message": "Pyrefly crashed"}')
@@ -14,7 +14,13 @@ from pants.core.util_rules.external_tool import TemplatedExternalTool
 from pants.engine.platform import Platform
 from pants.engine.rules import Rule, collect_rules
 from pants.engine.unions import UnionRule
-from pants.option.option_types import ArgsListOption, SkipOption, StrListOption
+from pants.option.option_types import (
+    ArgsListOption,
+    BoolOption,
+    IntOption,
+    SkipOption,
+    StrListOption,
+)
 from pants.util.strutil import softwrap
 
 
@@ -51,6 +57,79 @@ class Pyrefly(TemplatedExternalTool):
     skip = SkipOption("check")
     args = ArgsListOption(example="--version")
 
+    report = BoolOption(
+        default=False,
+        help=softwrap(
+            """
+            If true, request JSON diagnostics from Pyrefly, and write them to
+            `dist/check/pyrefly/` as a report (with one file per partition), using the same
+            schema as the other Python type checker plugins. The console output is then rendered
+            from those diagnostics.
+            """
+        ),
+    )
+
+    profile = BoolOption(
+        default=False,
+        help=softwrap(
+            """
+            If true, write the wall time of each phase of checking a partition (e.g. setup,
+            sources, running Pyrefly), and the size of its inputs, to `dist/check/pyrefly/` as
+            `profile.json` in each partition's report.
+
+            The timings (but not the size of the inputs, which is only measured when this is set)
+            are always attached as metadata to each partition's workunit, for any
+            `[GLOBAL].streaming_workunits_handlers`.
+            """
+        ),
+    )
+
+    batch_size = IntOption(
+        default=None,
+        help=softwrap(
+            """
+            If set, split each partition into batches of at most this many files, which are
+            checked by concurrent Pyrefly processes.
+
+            Batches are cut from root targets walked in dependency order, so each batch is a
+            group of related files sharing most of their transitive closure, and are balanced by
+            their total source size. Each batch only sees its own transitive closure, so batches
+            are also cached independently.
+
+            If unset, each partition is checked by a single Pyrefly process.
+            """
+        ),
+    )
+
+    use_daemon = BoolOption(
+        default=False,
+        advanced=True,
+        help=softwrap(
+            """
+            If true, check each partition with a long-lived Pyrefly language server
+            (`pyrefly lsp`), rather than a new Pyrefly process in a sandbox.
+
+            The language server runs in the build root, and keeps its type graph in memory
+            between runs, so only the files affected by a change are re-checked. There is a
+            server per Pyrefly version, requirements venv, set of source roots and set of config
+            files, which exits after an hour without a check. This is not hermetic: the server
+            reads the sources from the build root rather than from a sandbox, and its results
+            are only cached by Pants for the rest of the run.
+
+            The language server is only used in a local environment, without `[pyrefly].args`
+            (which it can't be passed), and when the requirements venv's interpreter is the
+            partition's minimum Python version (which the server checks against). Otherwise, or
+            if it fails or times out, the partition is checked in a sandbox instead.
+            """
+        ),
+    )
+
+    daemon_timeout = IntOption(
+        default=300,
+        advanced=True,
+        help="How long to wait (in seconds) for the Pyrefly language server to check a partition.",
+    )
+
     _interpreter_constraints = StrListOption(
         advanced=True,
         default=["CPython>=3.8,<3.15"],
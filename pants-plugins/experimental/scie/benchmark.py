@@ -0,0 +1,193 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""A `scie-benchmark` goal, measuring how quickly the binaries built by `scie_binary` start.
+
+Each binary is run repeatedly by `benchmark_runner.py` in a sandbox, both cold (with an empty
+`SCIE_BASE`, so it has to extract its interpreter and files first) and warm (re-using a `SCIE_BASE`
+from a previous run). This makes it possible to compare e.g. lazy and embedded interpreters, or the
+`pex` and `venv` layouts.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections.abc import Iterable
+
+from experimental.scie.benchmark_runner import BenchmarkError
+from experimental.scie.rules import ScieFieldSet
+from experimental.scie.subsystems import Science
+from pants.core.goals.package import build_package
+from pants.core.util_rules.adhoc_binaries import PythonBuildStandaloneBinary
+from pants.core.util_rules.distdir import DistDir
+from pants.engine.console import Console
+from pants.engine.fs import CreateDigest, FileContent, MergeDigests, Workspace
+from pants.engine.goal import Goal, GoalSubsystem
+from pants.engine.internals.graph import find_valid_field_sets_for_target_roots
+from pants.engine.intrinsics import create_digest, merge_digests
+from pants.engine.platform import Platform
+from pants.engine.process import Process, ProcessCacheScope, execute_process
+from pants.engine.rules import Rule, collect_rules, concurrently, goal_rule, implicitly
+from pants.engine.target import NoApplicableTargetsBehavior, TargetRootsToFieldSetsRequest
+from pants.option.errors import OptionsError
+from pants.option.option_types import IntOption, StrListOption
+from pants.util.logging import LogLevel
+from pants.util.resources import read_resource
+from pants.util.strutil import pluralize, softwrap
+
+logger = logging.getLogger(__name__)
+
+_RUNNER_SCRIPT = "__scie_benchmark_runner.py"
+
+
+class ScieBenchmarkSubsystem(GoalSubsystem):
+    name = "scie-benchmark"
+    help = softwrap(
+        """
+        Measure how quickly the binaries built by `scie_binary` targets start, both cold (with an
+        empty `SCIE_BASE`) and warm.
+
+        Reports the p50/p95 startup time, the peak RSS, the size of the binary, the size of the
+        extracted files and an estimate of the time taken to extract them (the difference between
+        the cold and warm p50s), and writes them as JSON to `dist/scie-benchmark/`.
+        """
+    )
+
+    iterations = IntOption(
+        default=10,
+        help="The number of cold runs, and of warm runs, of each binary. Must be at least 1.",
+    )
+    args = StrListOption(
+        default=[],
+        help=softwrap(
+            """
+            Arguments to pass to each binary, which should make it exit quickly and successfully
+            (e.g. `--help` or `--version` for a CLI).
+            """
+        ),
+    )
+    timeout = IntOption(
+        default=60,
+        help="The maximum time (in seconds) for a single run of a binary.",
+    )
+
+
+class ScieBenchmark(Goal):
+    subsystem_cls = ScieBenchmarkSubsystem
+    environment_behavior = Goal.EnvironmentBehavior.LOCAL_ONLY
+
+
+def _native_artifact(relpaths: Iterable[str], binary_name: str, native_platform: str) -> str:
+    """Pick the binary for this platform, which is only suffixed if `platforms` was set."""
+    relpaths = list(relpaths)
+    for relpath in relpaths:
+        if os.path.basename(relpath) in (binary_name, f"{binary_name}-{native_platform}"):
+            return relpath
+    raise BenchmarkError(
+        f"None of {relpaths} can run on this machine ({native_platform}). Add it to `platforms`."
+    )
+
+
+@goal_rule
+async def scie_benchmark(
+    console: Console,
+    subsystem: ScieBenchmarkSubsystem,
+    workspace: Workspace,
+    dist_dir: DistDir,
+    platform: Platform,
+    python: PythonBuildStandaloneBinary,
+) -> ScieBenchmark:
+    if subsystem.iterations < 1:
+        raise OptionsError(
+            f"`[{subsystem.name}].iterations` must be at least 1, but was {subsystem.iterations}."
+        )
+
+    target_roots_to_field_sets = await find_valid_field_sets_for_target_roots(
+        TargetRootsToFieldSetsRequest(
+            ScieFieldSet,
+            goal_description=f"the `{subsystem.name}` goal",
+            no_applicable_targets_behavior=NoApplicableTargetsBehavior.error,
+        ),
+        **implicitly(),
+    )
+    field_sets = target_roots_to_field_sets.field_sets
+    packages = await concurrently(
+        build_package(field_set, **implicitly()) for field_set in field_sets
+    )
+    runner_digest = await create_digest(
+        CreateDigest(
+            [FileContent(_RUNNER_SCRIPT, read_resource("experimental.scie", "benchmark_runner.py"))]
+        )
+    )
+
+    native_platform = Science.default_url_platform_mapping[platform.value]
+    exit_code = 0
+    reports = []
+    for field_set, package in zip(field_sets, packages):
+        binary_name = field_set.binary_name.value or field_set.address.target_name
+        try:
+            relpath = _native_artifact(
+                (a.relpath for a in package.artifacts if a.relpath), binary_name, native_platform
+            )
+        except BenchmarkError as e:
+            console.print_stderr(console.red(f"✕ {field_set.address}: {e}"))
+            exit_code = 1
+            continue
+
+        # The binaries are benchmarked one at a time, so that they don't skew each other's timings.
+        # Each `SCIE_BASE` is a temporary directory in the sandbox, and the results are only valid
+        # for this session.
+        console.print_stderr(
+            f"Benchmarking {relpath} ({pluralize(subsystem.iterations, 'run')})..."
+        )
+        input_digest = await merge_digests(MergeDigests((package.digest, runner_digest)))
+        result = await execute_process(
+            Process(
+                argv=(
+                    python.path,
+                    _RUNNER_SCRIPT,
+                    f"--iterations={subsystem.iterations}",
+                    f"--timeout={subsystem.timeout}",
+                    relpath,
+                    *subsystem.args,
+                ),
+                input_digest=input_digest,
+                append_only_caches=python.APPEND_ONLY_CACHES,
+                description=f"Benchmark {relpath}",
+                level=LogLevel.DEBUG,
+                cache_scope=ProcessCacheScope.PER_SESSION,
+            ),
+            **implicitly(),
+        )
+        if result.exit_code != 0:
+            error = result.stderr.decode(errors="replace").strip()
+            console.print_stderr(console.red(f"✕ {field_set.address}: {error}"))
+            exit_code = 1
+            continue
+
+        report = json.loads(result.stdout)
+        console.print_stdout(
+            f"{report['binary']}: "
+            f"cold p50={report['cold']['p50_ms']:.1f}ms p95={report['cold']['p95_ms']:.1f}ms, "
+            f"warm p50={report['warm']['p50_ms']:.1f}ms p95={report['warm']['p95_ms']:.1f}ms, "
+            f"max RSS={report['cold']['max_rss_bytes'] / 2**20:.1f}MiB, "
+            f"size={report['binary_bytes'] / 2**20:.1f}MiB, "
+            f"extracted={report['extraction_bytes'] / 2**20:.1f}MiB "
+            f"(estimated {report['extraction_ms_estimate']:.1f}ms)"
+        )
+        reports.append(FileContent(f"{os.path.basename(relpath)}.json", result.stdout))
+
+    report_digest = await create_digest(CreateDigest(reports))
+    workspace.write_digest(
+        report_digest, path_prefix=os.path.join(dist_dir.relpath, subsystem.name)
+    )
+    return ScieBenchmark(exit_code=exit_code)
+
+
+def rules() -> Iterable[Rule]:
+    return (
+        *collect_rules(),
+        *ScieBenchmarkSubsystem.rules(),  # type: ignore[call-arg]
+    )
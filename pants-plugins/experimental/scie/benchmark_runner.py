@@ -0,0 +1,161 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Measures how quickly a binary starts, for the `scie-benchmark` goal.
+
+This is run as a script (by Pants's own interpreter, in a sandbox), so may only use the stdlib. The
+binary is run repeatedly, both cold (with an empty `SCIE_BASE`, so it has to extract its
+interpreter and files first) and warm (re-using a `SCIE_BASE` from a previous run), and the results
+are printed as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Run:
+    elapsed_ms: float
+    max_rss_bytes: int
+
+
+@dataclass(frozen=True)
+class Summary:
+    runs: int
+    p50_ms: float
+    p95_ms: float
+    mean_ms: float
+    max_rss_bytes: int
+
+    @classmethod
+    def of(cls, runs: Sequence[Run]) -> Summary:
+        elapsed = [run.elapsed_ms for run in runs]
+        return cls(
+            runs=len(runs),
+            p50_ms=round(percentile(elapsed, 50), 3),
+            p95_ms=round(percentile(elapsed, 95), 3),
+            mean_ms=round(sum(elapsed) / len(elapsed), 3),
+            max_rss_bytes=max(run.max_rss_bytes for run in runs),
+        )
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    binary: str
+    cold: Summary
+    warm: Summary
+    binary_bytes: int
+    # The size of everything the binary extracted into `SCIE_BASE` on its first run
+    extraction_bytes: int
+    # An estimate of the time spent extracting, as the difference between the cold and warm p50s.
+    # It isn't measured directly, as the extraction happens inside scie-jump.
+    extraction_ms_estimate: float
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """The nearest-rank percentile, which is always one of the measured values."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def _directory_size(path: str) -> int:
+    return sum(
+        os.lstat(os.path.join(root, name)).st_size
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def _run_once(argv: Sequence[str], scie_base: str, timeout: float) -> Run:
+    """Run the binary to completion, measuring its wall time and peak RSS."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        argv,
+        env={**os.environ, "SCIE_BASE": scie_base},
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    try:
+        # `wait4` reports the resource usage of the process itself, which is the interpreter, as
+        # scie-jump execs into it
+        _, status, rusage = os.wait4(process.pid, 0)
+    finally:
+        timer.cancel()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    exit_code = os.waitstatus_to_exitcode(status)
+    # The process was reaped by `wait4`, so don't let `Popen` try to reap it again
+    process.returncode = exit_code
+    if exit_code != 0:
+        raise BenchmarkError(f"`{' '.join(argv)}` exited with {exit_code}.")
+    # `ru_maxrss` is in kilobytes on Linux, but in bytes on macOS
+    max_rss_bytes = rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return Run(elapsed_ms, max_rss_bytes)
+
+
+def benchmark(binary: str, argv: Sequence[str], iterations: int, timeout: float) -> BenchmarkResult:
+    if iterations < 1:
+        raise BenchmarkError(f"The number of iterations must be at least 1, but was {iterations}.")
+
+    with tempfile.TemporaryDirectory(prefix="scie-benchmark-") as tmpdir:
+        cold_runs = []
+        for i in range(iterations):
+            scie_base = os.path.join(tmpdir, f"cold-{i}")
+            cold_runs.append(_run_once(argv, scie_base, timeout))
+        extraction_bytes = _directory_size(os.path.join(tmpdir, "cold-0"))
+
+        # The first cold run's `SCIE_BASE` is already populated, so re-use it for the warm runs
+        warm_base = os.path.join(tmpdir, "cold-0")
+        warm_runs = [_run_once(argv, warm_base, timeout) for _ in range(iterations)]
+
+    cold, warm = Summary.of(cold_runs), Summary.of(warm_runs)
+    return BenchmarkResult(
+        binary=binary,
+        cold=cold,
+        warm=warm,
+        binary_bytes=os.path.getsize(argv[0]),
+        extraction_bytes=extraction_bytes,
+        extraction_ms_estimate=round(max(cold.p50_ms - warm.p50_ms, 0.0), 3),
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, required=True)
+    parser.add_argument("--timeout", type=float, required=True)
+    parser.add_argument("binary")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    options = parser.parse_args(argv)
+
+    exe = os.path.abspath(options.binary)
+    try:
+        result = benchmark(
+            options.binary, (exe, *options.args), options.iterations, options.timeout
+        )
+    except BenchmarkError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(json.dumps(asdict(result), indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+import pytest
+from experimental.scie.benchmark_runner import BenchmarkError, benchmark, main, percentile
+
+
+def test_percentile() -> None:
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 95) == 5.0
+    assert percentile([7.0], 95) == 7.0
+
+
+def test_benchmark() -> None:
+    result = benchmark("python", (sys.executable, "-c", "pass"), iterations=2, timeout=30)
+    assert result.cold.runs == result.warm.runs == 2
+    assert 0 < result.warm.p50_ms <= result.warm.p95_ms
+    assert result.cold.max_rss_bytes > 0
+    assert result.binary_bytes == os.path.getsize(sys.executable)
+    assert result.extraction_ms_estimate >= 0
+
+
+def test_benchmark_failure() -> None:
+    with pytest.raises(BenchmarkError):
+        benchmark("python", (sys.executable, "-c", "raise SystemExit(3)"), iterations=1, timeout=30)
+
+
+@pytest.mark.parametrize("iterations", [0, -1])
+def test_benchmark_invalid_iterations(iterations: int) -> None:
+    with pytest.raises(BenchmarkError, match="must be at least 1"):
+        benchmark("python", (sys.executable, "-c", "pass"), iterations=iterations, timeout=30)
+
+
+def test_main(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["--iterations=1", "--timeout=30", sys.executable, "-c", "pass"]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["binary"] == sys.executable
+    assert result["cold"]["runs"] == result["warm"]["runs"] == 1
+
+    assert main(["--iterations=0", "--timeout=30", sys.executable, "-c", "pass"]) == 1
+    assert "must be at least 1" in capsys.readouterr().err
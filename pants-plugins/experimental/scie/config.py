@@ -3,8 +3,12 @@
 
 from __future__ import annotations
 
+import dataclasses
 import logging
-from dataclasses import dataclass
+import re
+from collections.abc import Iterator, Mapping
+from dataclasses import asdict, dataclass, field
+from typing import Any
 
 import toml
 
@@ -39,7 +43,9 @@ class LiftConfig:
     interpreters: list[Interpreter]
     files: list[File]
     commands: list[Command]
-    bindings: frozenset[Command] = frozenset()
+    bindings: list[Command] = field(default_factory=list)
+    scie_jump: ScieJump | None = None
+    ptex: Ptex | None = None
 
     def __post_init__(self):
         if any(isinstance(i, dict) for i in self.interpreters):
@@ -50,6 +56,10 @@ class LiftConfig:
             object.__setattr__(self, "commands", [Command(**c) for c in self.commands])  # type: ignore
         if any(isinstance(b, dict) for b in self.bindings):
             object.__setattr__(self, "bindings", [Command(**b) for b in self.bindings])  # type: ignore
+        if isinstance(self.scie_jump, dict):
+            object.__setattr__(self, "scie_jump", ScieJump(**self.scie_jump))
+        if isinstance(self.ptex, dict):
+            object.__setattr__(self, "ptex", Ptex(**self.ptex))
 
 
 @dataclass(frozen=True)
@@ -59,17 +69,121 @@ class Interpreter:
     provider: str = "PythonBuildStandalone"
     release: str = "20251031"
     lazy: bool = True
+    base_url: str | None = None
+
+
+@dataclass(frozen=True)
+class ScieJump:
+    version: str | None = None
+    base_url: str | None = None
+
+
+@dataclass(frozen=True)
+class Ptex:
+    version: str | None = None
+    base_url: str | None = None
 
 
 @dataclass(frozen=True)
 class File:
     name: str
+    # e.g. `zip` or `tar.zst`, which scie-jump extracts to a directory, and otherwise a `blob`
+    type: str | None = None
 
 
 @dataclass(frozen=True)
 class Command:
     exe: str
     args: list[str]
-    env: dict[str, str] | None = None
+    # e.g. `{"default": {"PEX_TOOLS": "1"}}`, per science's `Env` table
+    env: dict[str, dict[str, str]] | None = None
     name: str | None = None
     description: str | None = None
+
+
+def _deep_merge(base: Mapping[str, Any], overrides: Mapping[str, Any]) -> dict[str, Any]:
+    """Merge `overrides` into `base`, recursing into tables, while anything else is replaced."""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, Mapping) and isinstance(merged.get(key), Mapping):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def merge_config(generated: Config, overrides: Mapping[str, Any]) -> Config:
+    """Merge a user's lift config (as parsed TOML) over a generated one.
+
+    Anything set in the user's config wins, and the generated config (from the target's fields)
+    fills in whatever it leaves out. Arrays (e.g. `files` or `interpreters`) are replaced as a
+    whole, rather than merged element-wise.
+    """
+    # Drop unset (None) fields, so that they don't shadow tables from the user's config
+    base = asdict(generated, dict_factory=lambda items: {k: v for k, v in items if v is not None})
+    return Config(**_deep_merge(base, overrides))
+
+
+def _sorted_tables(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {key: _sorted_tables(value[key]) for key in sorted(value) if value[key] is not None}
+    if isinstance(value, list):
+        return [_sorted_tables(item) for item in value]
+    return value
+
+
+def dumps_config(config: Config) -> str:
+    """Serialize a config to TOML, such that equivalent configs are byte-for-byte identical.
+
+    Keys are sorted, unset (None) fields are dropped, and `files` and `platforms` are sorted, as
+    their order doesn't matter to science. Any other arrays (e.g. `commands`) keep their order.
+    """
+    lift = dataclasses.replace(
+        config.lift,
+        platforms=sorted(set(config.lift.platforms)),
+        files=sorted(set(config.lift.files), key=lambda file: file.name),
+    )
+    return toml.dumps(_sorted_tables(asdict(dataclasses.replace(config, lift=lift))))
+
+
+# Matches the placeholders in a command, e.g. `{app.pex}` or `{:app-pex}`, but not the interpreter
+# placeholders, e.g. `#{cpython:python}`
+_PLACEHOLDER = re.compile(r"(?<!#)\{([^{}]+)\}")
+
+
+def _command_strings(command: Command) -> Iterator[str]:
+    yield command.exe
+    yield from command.args
+    if command.env:
+        # science nests env vars under `default`/`replace`/`remove_*` tables
+        for value in command.env.values():
+            yield from (value.values() if isinstance(value, Mapping) else (value,))
+
+
+def _references(placeholder: str, file: File) -> bool:
+    """Whether the placeholder names the file, either alone (`{name}`) or qualified (`{name:...}`)."""
+    return placeholder == file.name or placeholder.startswith(f"{file.name}:")
+
+
+def prune_unreferenced_files(config: Config) -> Config:
+    """Remove the files which aren't referenced by any command or binding.
+
+    These would otherwise be shipped in (and unpacked from) the scie, without anything using them.
+    """
+    placeholders = {
+        placeholder
+        for command in (*config.lift.commands, *config.lift.bindings)
+        for string in _command_strings(command)
+        for placeholder in _PLACEHOLDER.findall(str(string))
+    }
+    files = [
+        file
+        for file in config.lift.files
+        if any(_references(placeholder, file) for placeholder in placeholders)
+    ]
+    if len(files) == len(config.lift.files):
+        return config
+
+    pruned = sorted(file.name for file in config.lift.files if file not in files)
+    logger.debug(f"Pruned files not referenced by any command or binding: {pruned}")
+    return dataclasses.replace(config, lift=dataclasses.replace(config.lift, files=files))
@@ -0,0 +1,130 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import dataclasses
+
+import toml
+from experimental.scie.config import (
+    Command,
+    Config,
+    File,
+    Interpreter,
+    LiftConfig,
+    dumps_config,
+    merge_config,
+    prune_unreferenced_files,
+)
+
+GENERATED = Config(
+    lift=LiftConfig(
+        name="mycli",
+        description="Generated",
+        platforms=["linux-x86_64"],
+        interpreters=[Interpreter(version="3.11")],
+        files=[File("mycli.pex"), File("data.txt")],
+        commands=[Command(exe="#{cpython:python}", args=["{mycli.pex}"])],
+    )
+)
+
+
+def test_merge_config_fills_omitted_fields() -> None:
+    overrides = toml.loads(
+        """
+        [lift]
+        description = "From lift.toml"
+
+        [[lift.commands]]
+        exe = "{scie.bindings.venv}/venv/bin/mycli"
+        args = []
+        """
+    )
+    config = merge_config(GENERATED, overrides)
+
+    assert config.lift.name == "mycli"
+    assert config.lift.description == "From lift.toml"
+    assert config.lift.platforms == ["linux-x86_64"]
+    assert config.lift.interpreters == [Interpreter(version="3.11")]
+    assert config.lift.commands == [Command(exe="{scie.bindings.venv}/venv/bin/mycli", args=[])]
+
+
+def test_merge_config_merges_tables() -> None:
+    overrides = toml.loads(
+        """
+        [lift.scie_jump]
+        version = "1.8.2"
+        """
+    )
+    config = merge_config(GENERATED, overrides)
+    assert config.lift.scie_jump is not None
+    assert config.lift.scie_jump.version == "1.8.2"
+
+
+def test_prune_unreferenced_files() -> None:
+    config = prune_unreferenced_files(GENERATED)
+    assert config.lift.files == [File("mycli.pex")]
+
+
+def test_prune_keeps_files_referenced_by_bindings() -> None:
+    config = merge_config(
+        GENERATED,
+        toml.loads(
+            """
+            [[lift.files]]
+            name = ":mycli-pex"
+
+            [[lift.files]]
+            name = "unused.txt"
+
+            [[lift.commands]]
+            exe = "{scie.bindings.venv}/venv/bin/mycli"
+            args = []
+
+            [[lift.bindings]]
+            name = "venv"
+            exe = "#{cpython:python}"
+            args = ["{:mycli-pex}", "venv", "{scie.bindings}/venv"]
+            """
+        ),
+    )
+    assert prune_unreferenced_files(config).lift.files == [File(":mycli-pex")]
+
+
+def test_prune_matches_placeholders_exactly() -> None:
+    config = merge_config(
+        GENERATED,
+        toml.loads(
+            """
+            [[lift.files]]
+            name = "app"
+
+            [[lift.files]]
+            name = "app.pex"
+
+            [[lift.files]]
+            name = "cpython"
+
+            [[lift.commands]]
+            exe = "#{cpython:python}"
+            args = ["{app.pex}", "--data", "{app:data}"]
+            """
+        ),
+    )
+    assert [file.name for file in prune_unreferenced_files(config).lift.files] == [
+        "app",
+        "app.pex",
+    ]
+
+
+def test_dumps_config_is_deterministic() -> None:
+    def config(files: list[File], env: dict[str, str]) -> Config:
+        command = Command(exe="#{cpython:python}", args=["{mycli.pex}"], env={"default": env})
+        return Config(lift=dataclasses.replace(GENERATED.lift, files=files, commands=[command]))
+
+    dumped = dumps_config(config([File("mycli.pex"), File("data.txt")], {"A": "1", "B": "2"}))
+    assert dumped == dumps_config(
+        config([File("data.txt"), File("mycli.pex")], {"B": "2", "A": "1"})
+    )
+    assert dumped.index('name = "data.txt"') < dumped.index('name = "mycli.pex"')
+    assert dumped.index('A = "1"') < dumped.index('B = "2"')
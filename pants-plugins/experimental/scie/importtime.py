@@ -0,0 +1,252 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""An import-time report for the binaries built by `scie_binary`.
+
+The built binary is run once with `PYTHONPROFILEIMPORTTIME` set (i.e. `-X importtime`), and the
+interpreter's per-module import timings are sorted into a report, leaving out those made by the PEX
+bootstrap. Expensive non-stdlib imports made at the top-level of the binary's own modules are
+listed as candidates for importing lazily.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+from collections.abc import Collection, Iterable, Sequence
+from dataclasses import dataclass
+
+from experimental.util_rules.named_caches import (
+    TrimNamedCacheRequest,
+    named_cache_name,
+    trim_named_cache,
+)
+from pants.engine.fs import CreateDigest, Digest, FileContent
+from pants.engine.intrinsics import create_digest
+from pants.engine.process import Process, execute_process
+from pants.engine.rules import Rule, collect_rules, concurrently, implicitly, rule
+from pants.engine.unions import UnionRule
+from pants.util.logging import LogLevel
+
+logger = logging.getLogger(__name__)
+
+IMPORT_TIME_SUFFIX = "-importtime.txt"
+
+# The number of lazy-import candidates shown when packaging
+_SUMMARY_LINES = 5
+
+# Imported by the PEX bootstrap (or the interpreter's site hooks) before the binary's own code runs
+_BOOTSTRAP_PACKAGES = frozenset(("__pex__", "_pex", "pex", "sitecustomize", "_distutils_hack"))
+
+# The scie base, where the binary's interpreter and PEX are extracted (or downloaded, for a lazy
+# interpreter) on its first run
+_SCIE_BASE_PATH = ".cache/scie_base"
+
+# Run by the binary's own interpreter, via the PEX's `PEX_INTERPRETER` mode
+_STDLIB_MODULE_NAMES = "import sys; print(chr(10).join(sorted(sys.stdlib_module_names)))"
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    module: str
+    # How deeply nested the import was, where 0 is imported by the entry point (or at startup)
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTime]:
+    """Parse the `import time: <self> | <cumulative> | <module>` lines written by the interpreter.
+
+    Nested imports are indented by two spaces per level, after the last `|`.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|", 2)
+        # Skips the header line
+        if not self_us.strip().isdigit():
+            continue
+        name = module.lstrip(" ")
+        imports.append(
+            ImportTime(
+                module=name,
+                depth=(len(module) - len(name) - 1) // 2,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    return imports
+
+
+def without_bootstrap(imports: Sequence[ImportTime]) -> list[ImportTime]:
+    """Drop the imports made by the PEX bootstrap, along with everything they imported.
+
+    A module's nested imports are reported before it, and are more deeply indented.
+    """
+    kept = []
+    bootstrap_depth = None
+    for imp in reversed(imports):
+        if bootstrap_depth is not None and imp.depth > bootstrap_depth:
+            continue
+        bootstrap_depth = None
+        if imp.module.partition(".")[0] in _BOOTSTRAP_PACKAGES:
+            bootstrap_depth = imp.depth
+            continue
+        kept.append(imp)
+    return kept[::-1]
+
+
+def lazy_import_candidates(
+    imports: Sequence[ImportTime], stdlib_module_names: Collection[str]
+) -> list[ImportTime]:
+    """The non-stdlib imports made at the top-level of the binary's own modules, slowest first.
+
+    The binary's own modules (e.g. its entry point) are the non-stdlib imports at depth 0, once the
+    bootstrap is left out, so the candidates are their direct (depth 1) imports.
+    """
+
+    def is_stdlib(imp: ImportTime) -> bool:
+        return imp.module.partition(".")[0] in stdlib_module_names
+
+    candidates = []
+    parent = None
+    # A module's nested imports are reported before it, so walk backwards to see the parent first
+    for imp in reversed(imports):
+        if imp.depth == 0:
+            parent = imp
+        elif imp.depth == 1 and parent is not None and not is_stdlib(parent) and not is_stdlib(imp):
+            candidates.append(imp)
+    return sorted(candidates, key=lambda imp: imp.cumulative_us, reverse=True)
+
+
+def _format(imp: ImportTime) -> str:
+    return f"{imp.cumulative_us / 1000:>10.1f} {imp.self_us / 1000:>10.1f}   {imp.module}"
+
+
+def render_report(
+    title: str, imports: Sequence[ImportTime], stdlib_module_names: Collection[str]
+) -> str:
+    header = f"{'cumul (ms)':>10} {'self (ms)':>10}   module"
+    total_us = sum(imp.self_us for imp in imports)
+    return "\n".join(
+        (
+            f"# {title}",
+            f"{len(imports)} modules imported in {total_us / 1000:.1f}ms",
+            "",
+            "## Lazy-import candidates (non-stdlib imports made by the binary's own modules)",
+            header,
+            *(_format(imp) for imp in lazy_import_candidates(imports, stdlib_module_names)),
+            "",
+            "## All imports",
+            header,
+            *(
+                _format(imp)
+                for imp in sorted(imports, key=lambda imp: imp.cumulative_us, reverse=True)
+            ),
+            "",
+        )
+    )
+
+
+@dataclass(frozen=True)
+class ImportTimeRequest:
+    digest: Digest
+    binary: str
+    # The named commands to profile (selected with `SCIE_BOOT`), where `None` is the default one
+    commands: tuple[str | None, ...]
+    args: tuple[str, ...]
+    # The size cap of the named cache the binary is extracted to
+    cache_max_size_mb: int
+
+
+@dataclass(frozen=True)
+class ImportTimeReport:
+    digest: Digest
+    path: str
+    summary: tuple[str, ...]
+
+
+@rule(desc="Profile the imports of a scie", level=LogLevel.DEBUG)
+async def profile_scie_imports(request: ImportTimeRequest) -> ImportTimeReport:
+    # The scie base outlives the sandbox in a named cache, so the binary's interpreter (which may
+    # be downloaded, for a lazy interpreter) is only extracted once, rather than on every build.
+    # Each entry is keyed on its content's hash, so a stale one is never used.
+    cache_name = named_cache_name("scie", "base")
+    _ = await trim_named_cache(
+        TrimNamedCacheRequest(cache_name, request.cache_max_size_mb), **implicitly()
+    )
+
+    def binary_process(description: str, args: Iterable[str], env: dict[str, str]) -> Process:
+        return Process(
+            argv=(f"./{request.binary}", *args),
+            input_digest=request.digest,
+            append_only_caches={cache_name: _SCIE_BASE_PATH},
+            env={"SCIE_BASE": f"{{chroot}}/{_SCIE_BASE_PATH}", **env},
+            description=description,
+            level=LogLevel.DEBUG,
+        )
+
+    stdlib_result, *results = await concurrently(
+        execute_process(
+            **implicitly(
+                binary_process(
+                    f"List the stdlib modules of {request.binary}",
+                    ("-c", _STDLIB_MODULE_NAMES),
+                    {"PEX_INTERPRETER": "1"},
+                )
+            )
+        ),
+        *(
+            execute_process(
+                **implicitly(
+                    binary_process(
+                        f"Profile the imports of {request.binary}"
+                        + (f" ({command})" if command else ""),
+                        request.args,
+                        {
+                            "PYTHONPROFILEIMPORTTIME": "1",
+                            **({"SCIE_BOOT": command} if command else {}),
+                        },
+                    )
+                )
+            )
+            for command in request.commands
+        ),
+    )
+
+    # The binary's interpreter may be a different version to this one (or not expose its stdlib
+    # modules, before Python 3.10), so this one's are only a fallback
+    stdlib_module_names: Collection[str] = frozenset(stdlib_result.stdout.decode().split())
+    if stdlib_result.exit_code != 0 or not stdlib_module_names:
+        logger.debug(
+            f"Failed to list the stdlib modules of {request.binary}, so using those of Python "
+            f"{sys.version_info.major}.{sys.version_info.minor}: "
+            f"{stdlib_result.stderr.decode(errors='replace')}"
+        )
+        stdlib_module_names = sys.stdlib_module_names
+
+    sections = []
+    summary = []
+    for command, result in zip(request.commands, results):
+        title = f"{request.binary} {command}" if command else request.binary
+        # The entry point may well fail with the given args, but it has still imported everything
+        if result.exit_code != 0:
+            logger.warning(f"`{title}` exited with {result.exit_code} while profiling its imports.")
+        imports = without_bootstrap(parse_importtime(result.stderr.decode(errors="replace")))
+        if not imports:
+            logger.warning(f"`{title}` didn't report any import times.")
+        sections.append(render_report(title, imports, stdlib_module_names))
+        summary.extend(
+            f"{title}: {imp.module} {imp.cumulative_us / 1000:.1f}ms"
+            for imp in lazy_import_candidates(imports, stdlib_module_names)[:_SUMMARY_LINES]
+        )
+
+    path = f"{request.binary}{IMPORT_TIME_SUFFIX}"
+    digest = await create_digest(CreateDigest([FileContent(path, "\n".join(sections).encode())]))
+    return ImportTimeReport(digest, path, tuple(summary))
+
+
+def rules() -> Iterable[Rule | UnionRule]:
+    return (*collect_rules(),)
@@ -0,0 +1,85 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import sys
+
+from experimental.scie.importtime import (
+    ImportTime,
+    lazy_import_candidates,
+    parse_importtime,
+    render_report,
+    without_bootstrap,
+)
+
+STDERR = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:        80 |        200 | encodings
+import time:       300 |        300 |       yaml.reader
+import time:       500 |        800 |     yaml
+import time:       400 |       1200 |   mycli.config
+import time:      2000 |       2000 |   requests
+import time:        90 |         90 |   json
+import time:       100 |       3390 | mycli.main
+usage: mycli [-h]
+"""
+
+BOOTSTRAP_STDERR = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     zipfile
+import time:       200 |        300 |   __pex__.pex_bootstrapper
+import time:       400 |        700 | __pex__
+import time:        50 |         50 | sitecustomize
+import time:       500 |        500 | mycli
+"""
+
+
+def test_parse_importtime() -> None:
+    imports = parse_importtime(STDERR)
+    assert imports[0] == ImportTime(module="_io", depth=1, self_us=120, cumulative_us=120)
+    assert [(imp.module, imp.depth) for imp in imports] == [
+        ("_io", 1),
+        ("encodings", 0),
+        ("yaml.reader", 3),
+        ("yaml", 2),
+        ("mycli.config", 1),
+        ("requests", 1),
+        ("json", 1),
+        ("mycli.main", 0),
+    ]
+
+
+def test_without_bootstrap() -> None:
+    imports = without_bootstrap(parse_importtime(STDERR + BOOTSTRAP_STDERR))
+    assert [imp.module for imp in imports] == [
+        *(imp.module for imp in parse_importtime(STDERR)),
+        "mycli",
+    ]
+
+
+def test_lazy_import_candidates() -> None:
+    candidates = lazy_import_candidates(parse_importtime(STDERR), sys.stdlib_module_names)
+    assert [imp.module for imp in candidates] == ["requests", "mycli.config"]
+
+
+def test_lazy_import_candidates_target_stdlib() -> None:
+    # e.g. a module only in the target interpreter's stdlib
+    candidates = lazy_import_candidates(parse_importtime(STDERR), {"encodings", "requests"})
+    assert [imp.module for imp in candidates] == ["mycli.config", "json"]
+
+
+def test_lazy_import_candidates_without_own_modules() -> None:
+    # Only the stdlib was imported at depth 0, e.g. by a `-c` command
+    assert lazy_import_candidates(parse_importtime(STDERR), {"encodings", "mycli"}) == []
+
+
+def test_render_report() -> None:
+    report = render_report("mycli", parse_importtime(STDERR), sys.stdlib_module_names)
+    assert "8 modules imported in 3.6ms" in report
+    candidates = report.split("## All imports")[0]
+    assert candidates.index("requests") < candidates.index("mycli.config")
+    assert "encodings" not in candidates
+    assert "mycli.main" not in candidates
+    assert "yaml" not in candidates
@@ -0,0 +1,171 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""A local mirror of the artifacts science would otherwise download while building a scie.
+
+`science download` fetches (and verifies against their published checksums) the scie-jump
+launcher, `ptex` and interpreter distributions in the same layout as their upstream release pages.
+Each download is its own process, so it is cached by Pants (locally, and remotely if configured)
+and only ever runs once. The lift config is then pointed at the mirror via `file://` base URLs.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from experimental.scie.config import Config, Interpreter, Ptex, ScieJump
+from experimental.scie.subsystems import Science
+from pants.core.util_rules.external_tool import download_external_tool
+from pants.core.util_rules.system_binaries import BashBinary
+from pants.engine.fs import Digest, MergeDigests
+from pants.engine.intrinsics import merge_digests
+from pants.engine.platform import Platform
+from pants.engine.process import Process, execute_process_or_raise
+from pants.engine.rules import Rule, collect_rules, concurrently, implicitly, rule
+from pants.engine.unions import UnionRule
+from pants.option.errors import OptionsError
+from pants.util.logging import LogLevel
+
+MIRROR_DIR = "__science_mirror"
+
+# `file://` URLs must be absolute, but the sandbox's path is only known when science runs, so the
+# lift config refers to it with this placeholder, which is substituted right before the build
+CHROOT_PLACEHOLDER = "@CHROOT@"
+_MIRROR_URL = f"file://{CHROOT_PLACEHOLDER}/{MIRROR_DIR}"
+
+
+@dataclass(frozen=True)
+class ScienceMirrorRequest:
+    platform: str
+    scie_jump_version: str
+    ptex_version: str | None
+    # Only embedded interpreters are mirrored, as lazy ones are fetched when the scie first runs
+    interpreters: tuple[Interpreter, ...]
+
+
+@dataclass(frozen=True)
+class ScienceMirror:
+    digest: Digest
+
+
+def offline_config(config: Config, science: Science) -> Config:
+    """Point a lift config's downloads at the mirror."""
+    if not science.scie_jump_version:
+        raise OptionsError("`[science].offline` requires `[science].scie_jump_version` to be set.")
+    lazy = any(interpreter.lazy for interpreter in config.lift.interpreters)
+    if lazy and not science.ptex_version:
+        raise OptionsError(
+            "`[science].offline` requires `[science].ptex_version` to be set, as "
+            f"`{config.lift.name}` has a lazy interpreter."
+        )
+
+    return dataclasses.replace(
+        config,
+        lift=dataclasses.replace(
+            config.lift,
+            interpreters=[
+                interpreter
+                if interpreter.lazy
+                else dataclasses.replace(
+                    interpreter, base_url=f"{_MIRROR_URL}/providers/{interpreter.provider}"
+                )
+                for interpreter in config.lift.interpreters
+            ],
+            scie_jump=ScieJump(
+                version=science.scie_jump_version, base_url=f"{_MIRROR_URL}/scie-jump"
+            ),
+            ptex=(
+                Ptex(version=science.ptex_version, base_url=f"{_MIRROR_URL}/ptex")
+                if lazy
+                else config.lift.ptex
+            ),
+        ),
+    )
+
+
+def mirror_request(config: Config, platform: str, science: Science) -> ScienceMirrorRequest:
+    assert science.scie_jump_version is not None
+    return ScienceMirrorRequest(
+        platform=platform,
+        scie_jump_version=science.scie_jump_version,
+        ptex_version=(
+            science.ptex_version
+            if any(interpreter.lazy for interpreter in config.lift.interpreters)
+            else None
+        ),
+        interpreters=tuple(
+            interpreter for interpreter in config.lift.interpreters if not interpreter.lazy
+        ),
+    )
+
+
+def substitute_chroot(bash: BashBinary, lift_path: str, argv: Iterable[str]) -> tuple[str, ...]:
+    """Wrap `argv` so that it runs after the mirror's placeholder is replaced in the lift config."""
+    script = f'sed "s|{CHROOT_PLACEHOLDER}|$PWD|g" "$0" > "$0.tmp" && mv "$0.tmp" "$0" && exec "$@"'
+    return (bash.path, "-c", script, lift_path, *argv)
+
+
+@rule(desc="Download the artifacts needed to build a scie", level=LogLevel.DEBUG)
+async def download_science_mirror(
+    request: ScienceMirrorRequest, science: Science, platform: Platform
+) -> ScienceMirror:
+    downloaded_tool = await download_external_tool(science.get_request(platform))
+
+    # Each download is a description, the `science download` args, and the mirror subdirectory
+    downloads: list[tuple[str, tuple[str, ...], str]] = [
+        (
+            f"scie-jump {request.scie_jump_version}",
+            ("scie-jump", "--version", request.scie_jump_version),
+            "scie-jump",
+        )
+    ]
+    if request.ptex_version:
+        downloads.append(
+            (f"ptex {request.ptex_version}", ("ptex", "--version", request.ptex_version), "ptex")
+        )
+    for interpreter in request.interpreters:
+        downloads.append(
+            (
+                f"{interpreter.provider} {interpreter.version} ({interpreter.release})",
+                (
+                    "provider",
+                    interpreter.provider,
+                    "--version",
+                    interpreter.version,
+                    "--release",
+                    interpreter.release,
+                ),
+                os.path.join("providers", interpreter.provider),
+            )
+        )
+
+    results = await concurrently(
+        execute_process_or_raise(
+            **implicitly(
+                Process(
+                    argv=(
+                        downloaded_tool.exe,
+                        "download",
+                        *args,
+                        "--platform",
+                        request.platform,
+                        os.path.join(MIRROR_DIR, dest),
+                    ),
+                    input_digest=downloaded_tool.digest,
+                    output_directories=(os.path.join(MIRROR_DIR, dest),),
+                    description=f"Download {name} for {request.platform}",
+                    level=LogLevel.DEBUG,
+                )
+            )
+        )
+        for name, args, dest in downloads
+    )
+    digest = await merge_digests(MergeDigests(result.output_digest for result in results))
+    return ScienceMirror(digest)
+
+
+def rules() -> Iterable[Rule | UnionRule]:
+    return (*collect_rules(),)
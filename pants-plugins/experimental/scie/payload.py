@@ -0,0 +1,155 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Re-packing a PEX into the format it's embedded in a scie as.
+
+A PEX is a zip, so it can be embedded as-is (a `blob`, copied out of the scie when it first runs),
+or as a `zip` which scie-jump extracts into a directory, which the interpreter then runs as a loose
+PEX. It can also be re-packed as a zstd-compressed tarball, at a chosen compression level, which is
+usually smaller and quicker to extract than the PEX's own (deflate) compression.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import tarfile
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from pants.core.util_rules.system_binaries import (
+    SEARCH_PATHS,
+    BinaryNotFoundError,
+    BinaryPathRequest,
+    BinaryPathTest,
+    UnzipBinary,
+    find_binary,
+)
+from pants.engine.fs import CreateDigest, Digest, FileContent, RemovePrefix
+from pants.engine.intrinsics import create_digest, get_digest_contents, remove_prefix
+from pants.engine.process import Process, execute_process_or_raise
+from pants.engine.rules import Rule, collect_rules, implicitly, rule
+from pants.engine.unions import UnionRule
+from pants.util.logging import LogLevel
+
+TAR_ZST_SUFFIX = ".tar.zst"
+
+# zstd's own default
+DEFAULT_COMPRESSION_LEVEL = 3
+
+_UNZIPPED_PEX = "__pex"
+
+
+@dataclass(frozen=True)
+class RepackPexRequest:
+    digest: Digest
+    path: str
+    compression_level: int
+
+
+@dataclass(frozen=True)
+class RepackedPex:
+    digest: Digest
+    path: str
+
+
+def _tar_info(
+    name: str, *, directory: bool = False, size: int = 0, executable: bool = False
+) -> tarfile.TarInfo:
+    info = tarfile.TarInfo(name)
+    info.type = tarfile.DIRTYPE if directory else tarfile.REGTYPE
+    info.size = size
+    info.mode = 0o755 if directory or executable else 0o644
+    info.mtime = 0
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    return info
+
+
+def normalized_tarball(files: Iterable[FileContent]) -> bytes:
+    """Archive the files as a tarball which only depends on their paths, content and modes.
+
+    Entries are sorted by path, and are owned by root, dated to the epoch and have their modes
+    normalized (to 0755 for directories and executables, and 0644 otherwise), so the tarball is the
+    same whoever builds it, whenever, and with whatever umask.
+    """
+    files_by_path = {file.path: file for file in files}
+    directories = set()
+    for path in files_by_path:
+        parent = os.path.dirname(path)
+        while parent:
+            directories.add(parent)
+            parent = os.path.dirname(parent)
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT) as tar:
+        for path in sorted(directories | files_by_path.keys()):
+            file = files_by_path.get(path)
+            if file is None:
+                tar.addfile(_tar_info(path, directory=True))
+            else:
+                info = _tar_info(path, size=len(file.content), executable=file.is_executable)
+                tar.addfile(info, io.BytesIO(file.content))
+    return buffer.getvalue()
+
+
+@rule(desc="Re-pack a PEX as a zstd-compressed tarball", level=LogLevel.DEBUG)
+async def repack_pex(request: RepackPexRequest, unzip: UnzipBinary) -> RepackedPex:
+    zstd_paths = await find_binary(
+        BinaryPathRequest(
+            binary_name="zstd", search_path=SEARCH_PATHS, test=BinaryPathTest(args=["--version"])
+        ),
+        **implicitly(),
+    )
+    if not zstd_paths.first_path:
+        raise BinaryNotFoundError(
+            "Cannot find `zstd`, which is needed for `file_type='tar.zst'`. Please install it, or "
+            "use another `file_type`."
+        )
+
+    unzipped = await execute_process_or_raise(
+        **implicitly(
+            Process(
+                argv=(unzip.path, "-q", request.path, "-d", _UNZIPPED_PEX),
+                input_digest=request.digest,
+                output_directories=(_UNZIPPED_PEX,),
+                description=f"Unzip {request.path}",
+                level=LogLevel.DEBUG,
+            )
+        )
+    )
+    contents = await get_digest_contents(
+        await remove_prefix(RemovePrefix(unzipped.output_digest, _UNZIPPED_PEX))
+    )
+
+    # The tarball is built here rather than with `tar`, whose flags to normalize the archive
+    # differ between GNU and BSD tar
+    tar_path = f"{request.path}.tar"
+    tar_digest = await create_digest(
+        CreateDigest([FileContent(tar_path, normalized_tarball(contents))])
+    )
+    output_path = f"{request.path}{TAR_ZST_SUFFIX}"
+    result = await execute_process_or_raise(
+        **implicitly(
+            Process(
+                argv=(
+                    zstd_paths.first_path.path,
+                    "-q",
+                    f"-{request.compression_level}",
+                    tar_path,
+                    "-o",
+                    output_path,
+                ),
+                input_digest=tar_digest,
+                output_files=(output_path,),
+                description=(
+                    f"Compress {request.path} with zstd (level {request.compression_level})"
+                ),
+                level=LogLevel.DEBUG,
+            )
+        )
+    )
+    return RepackedPex(result.output_digest, output_path)
+
+
+def rules() -> Iterable[Rule | UnionRule]:
+    return (*collect_rules(),)
@@ -0,0 +1,40 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import io
+import tarfile
+
+from experimental.scie.payload import normalized_tarball
+from pants.engine.fs import FileContent
+
+FILES = [
+    FileContent("__main__.py", b"import app"),
+    FileContent(".bootstrap/pex/pex.py", b"# pex"),
+    FileContent(".deps/app.whl/bin/app", b"#!/bin/sh", is_executable=True),
+]
+
+
+def test_normalized_tarball() -> None:
+    tarball = normalized_tarball(FILES)
+    with tarfile.open(fileobj=io.BytesIO(tarball)) as tar:
+        members = tar.getmembers()
+        assert [(m.name, m.isdir(), oct(m.mode)) for m in members] == [
+            (".bootstrap", True, "0o755"),
+            (".bootstrap/pex", True, "0o755"),
+            (".bootstrap/pex/pex.py", False, "0o644"),
+            (".deps", True, "0o755"),
+            (".deps/app.whl", True, "0o755"),
+            (".deps/app.whl/bin", True, "0o755"),
+            (".deps/app.whl/bin/app", False, "0o755"),
+            ("__main__.py", False, "0o644"),
+        ]
+        assert {(m.uid, m.gid, m.uname, m.gname, m.mtime) for m in members} == {(0, 0, "", "", 0)}
+        extracted = tar.extractfile("__main__.py")
+        assert extracted is not None
+        assert extracted.read() == b"import app"
+
+
+def test_normalized_tarball_is_reproducible() -> None:
+    assert normalized_tarball(FILES) == normalized_tarball(reversed(FILES))
@@ -10,6 +10,7 @@ from __future__ import annotations
 
 from collections.abc import Iterable
 
+from experimental.scie.benchmark import rules as benchmark_rules
 from experimental.scie.rules import rules as scie_rules
 from experimental.scie.target_types import ScieTarget
 from pants.engine.rules import Rule
@@ -18,7 +19,10 @@ from pants.engine.unions import UnionRule
 
 
 def rules() -> Iterable[Rule | UnionRule]:
-    return (*scie_rules(),)
+    return (
+        *scie_rules(),
+        *benchmark_rules(),
+    )
 
 
 def target_types() -> Iterable[type[Target]]:
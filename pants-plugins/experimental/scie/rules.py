@@ -3,22 +3,62 @@
 
 from __future__ import annotations
 
+import dataclasses
 import logging
 import os
 from collections.abc import Iterable, Mapping
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from pathlib import PurePath
-from typing import Final
+from typing import Any, Final
 
 import toml
-from experimental.scie.config import Command, Config, File, Interpreter, LiftConfig
+from experimental.scie.config import (
+    Command,
+    Config,
+    File,
+    Interpreter,
+    LiftConfig,
+    Ptex,
+    ScieJump,
+    dumps_config,
+    merge_config,
+    prune_unreferenced_files,
+)
+from experimental.scie.importtime import (
+    IMPORT_TIME_SUFFIX,
+    ImportTimeRequest,
+    profile_scie_imports,
+)
+from experimental.scie.importtime import rules as importtime_rules
+from experimental.scie.mirror import (
+    download_science_mirror,
+    mirror_request,
+    offline_config,
+    substitute_chroot,
+)
+from experimental.scie.mirror import rules as mirror_rules
+from experimental.scie.payload import DEFAULT_COMPRESSION_LEVEL, RepackPexRequest, repack_pex
+from experimental.scie.payload import rules as payload_rules
 from experimental.scie.subsystems import Science
 from experimental.scie.target_types import (
     ScieBinaryNameField,
+    ScieCompressionLevelField,
     ScieDependenciesField,
+    ScieFileType,
+    ScieFileTypeField,
+    ScieImportTimeArgsField,
+    ScieLayout,
+    ScieLayoutField,
     ScieLiftSourceField,
     SciePlatformField,
 )
+from experimental.util_rules import named_caches
+from experimental.util_rules.named_caches import (
+    TrimNamedCacheRequest,
+    named_cache_name,
+    trim_named_cache,
+)
+from pants.backend.python.target_types import PexIncludeToolsField
 from pants.backend.python.util_rules.pex_from_targets import (
     InterpreterConstraintsRequest,
     interpreter_constraints_for_targets,
@@ -33,7 +73,9 @@ from pants.core.goals.package import (
 from pants.core.goals.run import RunFieldSet, RunInSandboxBehavior, RunRequest
 from pants.core.target_types import EnvironmentAwarePackageRequest
 from pants.core.util_rules.external_tool import download_external_tool
-from pants.engine.fs import EMPTY_DIGEST, CreateDigest, FileContent, MergeDigests
+from pants.core.util_rules.system_binaries import BashBinary
+from pants.engine.addresses import Address
+from pants.engine.fs import EMPTY_DIGEST, CreateDigest, Digest, FileContent, FileEntry, MergeDigests
 from pants.engine.internals.graph import (
     find_valid_field_sets,
     hydrate_sources,
@@ -41,8 +83,8 @@ from pants.engine.internals.graph import (
 )
 from pants.engine.intrinsics import (
     create_digest,
-    digest_to_snapshot,
     get_digest_contents,
+    get_digest_entries,
     merge_digests,
 )
 from pants.engine.platform import Platform
@@ -53,6 +95,7 @@ from pants.engine.target import (
     DescriptionField,
     FieldSetsPerTargetRequest,
     HydrateSourcesRequest,
+    InvalidFieldException,
     Targets,
 )
 from pants.engine.unions import UnionRule
@@ -62,6 +105,9 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_LIFT_PATH: Final[str] = "lift.toml"
 
+# science keeps its downloads and extractions in `$SCIENCE_CACHE_DIR`, backed by a named cache
+_SCIENCE_CACHE_PATH: Final[str] = ".cache/science"
+
 
 @dataclass(frozen=True)
 class ScieFieldSet(PackageFieldSet, RunFieldSet):
@@ -72,6 +118,10 @@ class ScieFieldSet(PackageFieldSet, RunFieldSet):
     description: DescriptionField
     dependencies: ScieDependenciesField
     platforms: SciePlatformField
+    layout: ScieLayoutField
+    file_type: ScieFileTypeField
+    compression_level: ScieCompressionLevelField
+    import_time_args: ScieImportTimeArgsField
     lift: ScieLiftSourceField
 
 
@@ -112,6 +162,186 @@ def _get_files_config(built_packages: Iterable[BuiltPackage]) -> Iterable[File]:
     return [File(str(path)) for path in artifact_names]
 
 
+class ScieReproducibilityError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class _PexArtifact:
+    address: Address
+    path: PurePath
+    digest: Digest
+
+    @property
+    def name(self) -> str:
+        return self.address.target_name
+
+
+def _pex_artifact(address: Address, built_package: BuiltPackage) -> _PexArtifact:
+    # Ensure there is only 1 .pex artifact in the .pex package
+    pex_artifacts = [
+        artifact.relpath
+        for artifact in built_package.artifacts
+        if artifact.relpath is not None and artifact.relpath.endswith(".pex")
+    ]
+    assert len(pex_artifacts) == 1, (
+        f"Expected exactly 1 .pex artifact from {address}, but found {len(pex_artifacts)}"
+    )
+    return _PexArtifact(address, PurePath(pex_artifacts[0]), built_package.digest)
+
+
+def _pex_for_reference(pexes: list[_PexArtifact], reference: str) -> _PexArtifact:
+    """Find the PEX for a `:target_name` reference in the lift config."""
+    if len(pexes) == 1:
+        return pexes[0]
+    for pex in pexes:
+        if pex.name == reference.removeprefix(":"):
+            return pex
+    raise InvalidFieldException(
+        f"`{reference}` in the lift config doesn't match any of the `pex_binary` dependencies: "
+        f"{sorted(pex.name for pex in pexes)}"
+    )
+
+
+# With several PEXes, they share a PEX_ROOT, so the wheels they have in common are only installed
+# once when the scie runs. Each PEX still embeds its own wheels, as they're built by `pex_binary`.
+_SHARED_PEX_ROOT = "{scie.bindings}/pex_root"
+
+
+def _pex_layout(pexes: list[_PexArtifact]) -> list[Command]:
+    """The commands to run each PEX with the embedded interpreter.
+
+    A single PEX is the default command, while several PEXes are each a command named after their
+    `pex_binary`, and are selected with `SCIE_BOOT=<name>`.
+    """
+    if len(pexes) == 1:
+        return [Command(exe="#{cpython:python}", args=[f"{{{pexes[0].path}}}"])]
+    return [
+        Command(
+            name=pex.name,
+            exe="#{cpython:python}",
+            args=[f"{{{pex.path}}}"],
+            env={"default": {"PEX_ROOT": _SHARED_PEX_ROOT}},
+        )
+        for pex in pexes
+    ]
+
+
+def _venv_layout(pexes: list[_PexArtifact]) -> tuple[list[Command], list[Command]]:
+    """The commands and bindings to run each PEX from a venv, installed when the scie first runs.
+
+    Each `venv` binding only runs once, as science caches its output in `SCIE_BASE`. It installs
+    the PEX (with compiled bytecode) using the PEX's own tools, and the command then runs the
+    venv's `pex` entry point script with the venv's interpreter, skipping the PEX bootstrap.
+    """
+    commands, bindings = [], []
+    for pex in pexes:
+        # A single PEX keeps the unnamed default command, as with the `pex` layout
+        name = pex.name if len(pexes) > 1 else None
+        binding_name = f"venv-{name}" if name else "venv"
+        bindings.append(
+            Command(
+                name=binding_name,
+                description=f"Installs {pex.name} into a venv, and pre-compiles its bytecode",
+                exe="#{cpython:python}",
+                args=[
+                    f"{{{pex.path}}}",
+                    "venv",
+                    "--bin-path",
+                    "prepend",
+                    "--compile",
+                    "--rm",
+                    "all",
+                    f"{{scie.bindings}}/{binding_name}",
+                ],
+                env={
+                    "default": {
+                        "PEX_TOOLS": "1",
+                        "PEX_ROOT": f"{{scie.bindings}}/pex_root-{binding_name}",
+                    }
+                },
+            )
+        )
+        venv = f"{{scie.bindings.{binding_name}}}/{binding_name}"
+        commands.append(Command(name=name, exe=f"{venv}/bin/python", args=[f"{venv}/pex"]))
+    return commands, bindings
+
+
+def _assert_includes_tools(targets: Targets, address: Address) -> None:
+    target = next(tgt for tgt in targets if tgt.address == address)
+    if not target.get(PexIncludeToolsField).value:
+        raise InvalidFieldException(
+            f"`layout='venv'` installs the PEX into a venv with its tools, but {address} doesn't "
+            "set `include_tools=True`."
+        )
+
+
+def _output_files(config: Config) -> list[str]:
+    # With `--use-platform-suffix`, each binary is suffixed by its platform
+    if config.lift.platforms:
+        return [f"{config.lift.name}-{lift_platform}" for lift_platform in config.lift.platforms]
+    return [config.lift.name]
+
+
+async def _verify_reproducible(
+    address: Address, builds: list[Digest], rebuilds: list[Digest]
+) -> None:
+    """Check that building the same config twice produced identical binaries."""
+    if builds == rebuilds:
+        return
+    all_entries = await concurrently(get_digest_entries(digest) for digest in (*builds, *rebuilds))
+    build_files = {
+        entry.path: entry.file_digest
+        for entries in all_entries[: len(builds)]
+        for entry in entries
+        if isinstance(entry, FileEntry)
+    }
+    rebuild_files = {
+        entry.path: entry.file_digest
+        for entries in all_entries[len(builds) :]
+        for entry in entries
+        if isinstance(entry, FileEntry)
+    }
+    differing = sorted(
+        path
+        for path in build_files.keys() | rebuild_files.keys()
+        if build_files.get(path) != rebuild_files.get(path)
+    )
+    raise ScieReproducibilityError(
+        f"Building {address} twice produced different binaries: {differing}. Check for "
+        "timestamps or other build-time state in its files, and pin `[science].scie_jump_version` "
+        "(and `[science].ptex_version`) so both builds use the same launcher."
+    )
+
+
+def _native_binary(config: Config, native_platform: str) -> str | None:
+    """The binary which can run on this machine, if it was built."""
+    if not config.lift.platforms:
+        return config.lift.name
+    if native_platform in config.lift.platforms:
+        return f"{config.lift.name}-{native_platform}"
+    return None
+
+
+def _pin_launcher_versions(config: Config, science: Science) -> Config:
+    """Apply the configured scie-jump and ptex versions, unless the lift config sets its own."""
+    scie_jump, ptex = config.lift.scie_jump, config.lift.ptex
+    if science.scie_jump_version and not (scie_jump and scie_jump.version):
+        scie_jump = dataclasses.replace(scie_jump or ScieJump(), version=science.scie_jump_version)
+    if science.ptex_version and not (ptex and ptex.version):
+        ptex = dataclasses.replace(ptex or Ptex(), version=science.ptex_version)
+    return dataclasses.replace(
+        config, lift=dataclasses.replace(config.lift, scie_jump=scie_jump, ptex=ptex)
+    )
+
+
+def _science_argv(
+    argv: tuple[str, ...], lift_path: str, science: Science, bash: BashBinary
+) -> tuple[str, ...]:
+    # The mirror's `file://` URLs need the sandbox's absolute path substituted into the config
+    return substitute_chroot(bash, lift_path, argv) if science.offline else argv
+
+
 def _contains_pex(built_package: BuiltPackage) -> bool:
     return any(
         artifact.relpath is not None and artifact.relpath.endswith(".pex")
@@ -119,13 +349,13 @@ def _contains_pex(built_package: BuiltPackage) -> bool:
     )
 
 
-async def _parse_lift_source(source: ScieLiftSourceField) -> Config:
+async def _parse_lift_source(source: ScieLiftSourceField) -> dict[str, Any]:
     hydrated_sources = await hydrate_sources(HydrateSourcesRequest(source), **implicitly())
     digest_contents = await get_digest_contents(hydrated_sources.snapshot.digest)
     content = digest_contents[0].content.decode("utf-8")
     lift_toml = toml.loads(content)
     logger.debug(lift_toml)
-    return Config(**lift_toml)
+    return lift_toml
 
 
 @rule(level=LogLevel.DEBUG)
@@ -133,6 +363,7 @@ async def scie_binary(
     science: Science,
     field_set: ScieFieldSet,
     platform: Platform,
+    bash: BashBinary,
 ) -> BuiltPackage:
     # Grab the dependencies of this target, and build them
     direct_deps = await resolve_targets(**implicitly(DependenciesRequest(field_set.dependencies)))
@@ -148,23 +379,37 @@ async def scie_binary(
     # Split the built packages into .pex and non-.pex packages
     pex_packages = [built_pkg for built_pkg in built_packages if _contains_pex(built_pkg)]
     non_pex_packages = [built_pkg for built_pkg in built_packages if not _contains_pex(built_pkg)]
+    assert pex_packages, "Expected at least 1 .pex package, but found none"
 
-    # Ensure that there is exactly 1 .pex file - reduces complexity of this plugin for now
-    assert len(pex_packages) == 1, f"Expected exactly 1 .pex package, but found {len(pex_packages)}"
-    pex_package = pex_packages[0]
-
-    # Ensure there is only 1 .pex artifact in the .pex package
-    pex_artifacts = [
-        artifact
-        for artifact in pex_package.artifacts
-        if artifact.relpath is not None and artifact.relpath.endswith(".pex")
+    # Each .pex package becomes its own command, sharing the scie's interpreter
+    pexes = [
+        _pex_artifact(dep_field_set.address, built_pkg)
+        for dep_field_set, built_pkg in zip(deps_field_sets.field_sets, built_packages)
+        if _contains_pex(built_pkg)
     ]
-    assert len(pex_artifacts) == 1, (
-        f"Expected exactly 1 .pex artifact, but found {len(pex_artifacts)}"
-    )
-    pex_artifact = pex_artifacts[0]
-    assert pex_artifact.relpath is not None, "Expected single .pex artifact to have a relpath"
-    pex_artifact_path = PurePath(pex_artifact.relpath)
+
+    file_type = ScieFileType(field_set.file_type.value)
+    if field_set.compression_level.value is not None and file_type != ScieFileType.TAR_ZST:
+        raise InvalidFieldException(
+            f"`compression_level` is only used with `file_type='tar.zst'`, but {field_set.address} "
+            f"has `file_type='{file_type.value}'`."
+        )
+    if file_type == ScieFileType.TAR_ZST:
+        repacked_pexes = await concurrently(
+            repack_pex(
+                RepackPexRequest(
+                    pex.digest,
+                    str(pex.path),
+                    field_set.compression_level.value or DEFAULT_COMPRESSION_LEVEL,
+                ),
+                **implicitly(),
+            )
+            for pex in pexes
+        )
+        pexes = [
+            dataclasses.replace(pex, path=PurePath(repacked.path), digest=repacked.digest)
+            for pex, repacked in zip(pexes, repacked_pexes)
+        ]
 
     # Prepare the configuration toml for the Science tool
     binary_name = field_set.binary_name.value or field_set.address.target_name
@@ -174,7 +419,20 @@ async def scie_binary(
     )
     interpreter_config = await _get_interpreter_config(direct_deps)
     # TODO: This might be better solved by using the `:target_name` syntax and letting downstream handle it
-    files_config = _get_files_config(built_packages)
+    files_config = [
+        *_get_files_config(non_pex_packages),
+        *(
+            File(str(pex.path), type=None if file_type == ScieFileType.BLOB else file_type.value)
+            for pex in pexes
+        ),
+    ]
+
+    if field_set.layout.value == ScieLayout.VENV.value:
+        for pex in pexes:
+            _assert_includes_tools(direct_deps, pex.address)
+        commands, bindings = _venv_layout(pexes)
+    else:
+        commands, bindings = _pex_layout(pexes), []
 
     # Create a toml configuration from the input targets and the minimum_version, and place that into a Digest for later usage
     generated_config = Config(
@@ -183,83 +441,187 @@ async def scie_binary(
             description=field_set.description.value or "",
             platforms=list(target_platforms),
             interpreters=[interpreter_config],
-            files=list(files_config),
-            commands=[Command(exe="#{cpython:python}", args=[f"{{{pex_artifact_path}}}"])],
+            files=files_config,
+            commands=commands,
+            bindings=bindings,
         )
     )
 
-    parsed_config: Config | None = None
-    lift_digest = EMPTY_DIGEST
+    config = generated_config
     lift_path = DEFAULT_LIFT_PATH
     if field_set.lift.value is not None:
-        # If the user specified a lift.toml file, then use that instead of the generated one
-        parsed_config = await _parse_lift_source(field_set.lift)
+        # If the user specified a lift.toml file, then merge it over the generated config, so the
+        # target's fields fill in whatever it leaves out
+        lift_toml = await _parse_lift_source(field_set.lift)
+        config = merge_config(generated_config, lift_toml)
         assert field_set.lift.file_path is not None
         lift_path = field_set.lift.file_path
 
-    # TODO: Merge the parsed config with the generated config, rather than replacing it
-    config = parsed_config or generated_config
-
-    config_content = toml.dumps(asdict(config)).encode()
-    lift_digest = await create_digest(CreateDigest([FileContent(lift_path, config_content)]))
+        # Don't ship files that nothing uses. Only the user's own commands can be trusted to
+        # reference every file they need, as the generated ones only reference the PEXes, and other
+        # files may be read at runtime (e.g. through `SCIE_BASE`)
+        if {"commands", "bindings"} & lift_toml.get("lift", {}).keys():
+            config = prune_unreferenced_files(config)
 
     # Download the Science tool for this platform
     downloaded_tool = await download_external_tool(science.get_request(platform))
 
-    # Put the dependencies and toml configuration into a digest
-    input_digest = await merge_digests(
-        MergeDigests(
-            (
-                lift_digest,
-                downloaded_tool.digest,
-                *(pkg.digest for pkg in non_pex_packages),
-                pex_package.digest,
+    if science.scie_jump_version or science.ptex_version:
+        config = _pin_launcher_versions(config, science)
+
+    # Each platform is built by its own science process, from a config only listing that platform,
+    # so that platforms are built concurrently, and are cached independently of each other
+    platform_configs = [
+        dataclasses.replace(
+            config, lift=dataclasses.replace(config.lift, platforms=[lift_platform])
+        )
+        for lift_platform in config.lift.platforms
+    ] or [config]
+    # If offline, download everything science would fetch into a mirror for each platform first,
+    # and point each config at it
+    mirror_digests = [EMPTY_DIGEST] * len(platform_configs)
+    if science.offline:
+        native_platform = science.default_url_platform_mapping[platform.value]
+        platform_configs = [
+            offline_config(platform_config, science) for platform_config in platform_configs
+        ]
+        mirrors = await concurrently(
+            download_science_mirror(
+                mirror_request(
+                    platform_config,
+                    (platform_config.lift.platforms or [native_platform])[0],
+                    science,
+                ),
+                **implicitly(),
             )
+            for platform_config in platform_configs
+        )
+        mirror_digests = [mirror.digest for mirror in mirrors]
+
+    lift_digests = await concurrently(
+        create_digest(
+            CreateDigest([FileContent(lift_path, dumps_config(platform_config).encode())])
         )
+        for platform_config in platform_configs
     )
 
-    # The output files are based on the config.lift.name key and each of the platforms (if specified), otherwise just the config.lift.name for native-only
-    output_files = [config.lift.name] + [
-        f"{config.lift.name}-{platform}" for platform in config.lift.platforms
-    ]
+    # Put the dependencies and toml configuration into a digest
+    input_digests = await concurrently(
+        merge_digests(
+            MergeDigests(
+                (
+                    lift_digest,
+                    mirror_digest,
+                    downloaded_tool.digest,
+                    *(pkg.digest for pkg in non_pex_packages),
+                    *(pex.digest for pex in pexes),
+                )
+            )
+        )
+        for lift_digest, mirror_digest in zip(lift_digests, mirror_digests)
+    )
 
     # If any of the config filenames start with `:` then add a filemapping command line arg in the form --file NAME=LOCATION
     file_mappings = [
-        f"--file {file.name}={pex_artifact_path}"
+        arg
         for file in config.lift.files
         if file.name.startswith(":")
+        for arg in ("--file", f"{file.name}={_pex_for_reference(pexes, file.name).path}")
     ]
-    # Split each file mapping into a list of arguments
-    file_mappings = [arg for mapping in file_mappings for arg in mapping.split(" ")]
     logger.debug(file_mappings)
 
-    # Run science to generate the scie binaries (depending on the `platforms` setting)
-    argv = (
-        downloaded_tool.exe,
-        "lift",
-        *file_mappings,
-        "build",
-        "--use-platform-suffix" if config.lift.platforms else "",
-        lift_path,
+    # science's cache outlives the sandbox in a named cache, shared by every platform's build. Its
+    # entries are grouped by kind (downloads, extracted interpreters, ...) into top-level
+    # directories, so are trimmed a level down, which keeps whole entries
+    cache_name = named_cache_name("science", science.version)
+    _ = await trim_named_cache(
+        TrimNamedCacheRequest(cache_name, science.cache_max_size_mb, entry_depth=2),
+        **implicitly(),
     )
 
-    result = await execute_process_or_raise(
-        **implicitly(
-            Process(
-                argv=argv,
-                input_digest=input_digest,
-                description="Run science on the input digests",
-                output_files=output_files,
-                level=LogLevel.DEBUG,
-            )
+    def science_process(platform_config: Config, input_digest: Digest, *, rebuild: bool) -> Process:
+        return Process(
+            argv=_science_argv(
+                (
+                    downloaded_tool.exe,
+                    "lift",
+                    *file_mappings,
+                    "build",
+                    *(("--use-platform-suffix",) if platform_config.lift.platforms else ()),
+                    lift_path,
+                ),
+                lift_path,
+                science,
+                bash,
+            ),
+            input_digest=input_digest,
+            append_only_caches={cache_name: _SCIENCE_CACHE_PATH},
+            env={
+                "SCIENCE_CACHE_DIR": f"{{chroot}}/{_SCIENCE_CACHE_PATH}",
+                # Only changes the process's cache key, so the rebuild isn't served from the cache
+                **({"__SCIE_REPRODUCIBILITY_REBUILD": "1"} if rebuild else {}),
+            },
+            description=(
+                f"{'Rebuild' if rebuild else 'Run'} science for "
+                f"{', '.join(platform_config.lift.platforms)}"
+                if platform_config.lift.platforms
+                else f"{'Rebuild' if rebuild else 'Run'} science on the input digests"
+            ),
+            output_files=_output_files(platform_config),
+            level=LogLevel.DEBUG,
         )
-    )
-    snapshot = await digest_to_snapshot(result.output_digest)
 
-    return BuiltPackage(
-        result.output_digest,
-        artifacts=tuple(BuiltPackageArtifact(file) for file in snapshot.files),
+    # Run science to generate the scie binary for each platform (or just the native one), and if
+    # verifying reproducibility, a second time for each
+    builds = [(False, *args) for args in zip(platform_configs, input_digests)]
+    if science.verify_reproducible:
+        builds += [(True, *args) for args in zip(platform_configs, input_digests)]
+    all_results = await concurrently(
+        execute_process_or_raise(
+            **implicitly(science_process(platform_config, input_digest, rebuild=rebuild))
+        )
+        for rebuild, platform_config, input_digest in builds
     )
+    results = all_results[: len(platform_configs)]
+    if science.verify_reproducible:
+        await _verify_reproducible(
+            field_set.address,
+            [result.output_digest for result in results],
+            [result.output_digest for result in all_results[len(platform_configs) :]],
+        )
+    output_digest = await merge_digests(MergeDigests(result.output_digest for result in results))
+    # Report the size of each binary, to weigh against its extraction time (see `scie-benchmark`)
+    entries = await get_digest_entries(output_digest)
+    artifacts = tuple(
+        BuiltPackageArtifact(
+            entry.path,
+            extra_log_lines=(f"Size: {entry.file_digest.serialized_bytes_length / 2**20:.1f}MiB",),
+        )
+        for entry in sorted(entries, key=lambda entry: entry.path)
+        if isinstance(entry, FileEntry)
+    )
+
+    if field_set.import_time_args.value is not None:
+        native_binary = _native_binary(config, science.default_url_platform_mapping[platform.value])
+        if native_binary is None:
+            logger.warning(
+                f"Not profiling the imports of {field_set.address}, as it wasn't built for this "
+                "platform."
+            )
+        else:
+            report = await profile_scie_imports(
+                ImportTimeRequest(
+                    digest=output_digest,
+                    binary=native_binary,
+                    commands=tuple(command.name for command in config.lift.commands),
+                    args=tuple(field_set.import_time_args.value),
+                    cache_max_size_mb=science.cache_max_size_mb,
+                )
+            )
+            output_digest = await merge_digests(MergeDigests((output_digest, report.digest)))
+            artifacts += (BuiltPackageArtifact(report.path, extra_log_lines=report.summary),)
+
+    return BuiltPackage(output_digest, artifacts=artifacts)
 
 
 @rule
@@ -271,8 +633,14 @@ async def run_scie_binary(field_set: ScieFieldSet) -> RunRequest:
     """
 
     binary = await build_package(field_set, **implicitly())
-    assert len(binary.artifacts) == 1, "`scie_binary` should only generate one output package"
-    artifact = binary.artifacts[0]
+    # Skip the import-time report, if there is one
+    artifacts = [
+        artifact
+        for artifact in binary.artifacts
+        if not (artifact.relpath or "").endswith(IMPORT_TIME_SUFFIX)
+    ]
+    assert len(artifacts) == 1, "`scie_binary` should only generate one output package"
+    artifact = artifacts[0]
     assert artifact.relpath is not None
     return RunRequest(digest=binary.digest, args=(os.path.join("{chroot}", artifact.relpath),))
 
@@ -280,6 +648,10 @@ async def run_scie_binary(field_set: ScieFieldSet) -> RunRequest:
 def rules() -> Iterable[Rule | UnionRule]:
     return (
         *collect_rules(),
+        *importtime_rules(),
+        *mirror_rules(),
+        *payload_rules(),
+        *named_caches.rules(),
         UnionRule(PackageFieldSet, ScieFieldSet),
         *ScieFieldSet.rules(),
     )
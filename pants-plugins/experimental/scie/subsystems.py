@@ -8,6 +8,7 @@ from collections.abc import Iterable
 from pants.core.util_rules.external_tool import TemplatedExternalTool
 from pants.engine.rules import Rule, collect_rules
 from pants.engine.unions import UnionRule
+from pants.option.option_types import BoolOption, IntOption, StrOption
 from pants.util.strutil import softwrap
 
 
@@ -36,6 +37,77 @@ class Science(TemplatedExternalTool):
 
     # args = ArgsListOption(example="--release")
 
+    cache_max_size_mb = IntOption(
+        default=4096,
+        advanced=True,
+        help=softwrap(
+            """
+            The maximum size (in MB) of science's download and extraction cache, before the least
+            recently modified entries are evicted. Set to 0 to disable eviction.
+
+            The cache is kept in a named cache, keyed on the science version, so that interpreter
+            distributions and launchers are only downloaded once per machine, rather than once
+            per build.
+
+            This also caps the named cache that binaries are extracted to when profiling their
+            imports (see `import_time_args`).
+            """
+        ),
+    )
+
+    offline = BoolOption(
+        default=False,
+        help=softwrap(
+            """
+            If true, download the scie-jump launcher, the `ptex` fetcher (for lazy interpreters)
+            and any embedded interpreter distributions with `science download`, in separate
+            processes which are cached by Pants. Each `science lift build` is then pointed at
+            those downloads (via `base_url`), so it never reaches the network.
+
+            This requires `[science].scie_jump_version`, and `[science].ptex_version` if any
+            interpreter is lazy. Lazy interpreters are still fetched from their usual location
+            when the scie first runs.
+
+            This is experimental: the `science download` arguments and the layout of its
+            downloads (which the `base_url`s point into) haven't been verified against every
+            version of science, so check that offline builds work with the pinned version.
+            """
+        ),
+    )
+
+    scie_jump_version = StrOption(
+        default=None,
+        help=softwrap(
+            """
+            The version of the scie-jump launcher to build with (e.g. `1.8.2`). If unset, science
+            picks its own default, which may change between science releases.
+            """
+        ),
+    )
+
+    ptex_version = StrOption(
+        default=None,
+        help=softwrap(
+            """
+            The version of `ptex` (used to fetch lazy interpreters at runtime) to build with. If
+            unset, science picks its own default.
+            """
+        ),
+    )
+
+    verify_reproducible = BoolOption(
+        default=False,
+        advanced=True,
+        help=softwrap(
+            """
+            If true, build each `scie_binary` twice, in independent processes, and fail if the
+            binaries differ. Any difference means the binary can't be reliably served from a
+            remote cache. This doubles the build time, so is intended for CI, or for diagnosing
+            cache misses.
+            """
+        ),
+    )
+
 
 def rules() -> Iterable[Rule | UnionRule]:
     return (
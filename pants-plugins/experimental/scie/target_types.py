@@ -6,10 +6,14 @@ from __future__ import annotations
 from enum import Enum
 
 from pants.core.goals.package import OutputPathField
+from pants.engine.addresses import Address
 from pants.engine.target import (
     COMMON_TARGET_FIELDS,
     Dependencies,
+    IntField,
+    InvalidFieldException,
     OptionalSingleSourceField,
+    StringField,
     StringSequenceField,
     Target,
 )
@@ -21,8 +25,12 @@ class ScieDependenciesField(Dependencies):
     supports_transitive_excludes = True
     help = softwrap(
         """
-        The address of a single `pex_binary` target to include in the binary, e.g.
+        The addresses of the `pex_binary` targets to include in the binary, e.g.
         `['src/python/project:pex']`.
+
+        A single `pex_binary` is run by default. With several, each is a command named after its
+        `pex_binary` target, selected with `SCIE_BOOT=<name>`, and they share the binary's
+        interpreter and the directory their 3rd-party wheels are installed into.
         """
     )
 
@@ -59,14 +67,112 @@ class SciePlatformField(StringSequenceField):
     )
 
 
+class ScieLayout(Enum):
+    PEX = "pex"
+    VENV = "venv"
+
+
+class ScieLayoutField(StringField):
+    alias = "layout"
+    default = ScieLayout.PEX.value
+    valid_choices = ScieLayout
+    help = softwrap(
+        """
+        How the `pex_binary` dependency is run by the generated `scie`.
+
+        With `pex` (the default), the scie runs the PEX with its embedded interpreter, and the
+        PEX bootstraps itself on every run.
+
+        With `venv`, the scie installs the PEX into a venv (with its bytecode compiled) the first
+        time it runs, using a boot binding, and every run after that starts the venv's
+        interpreter directly. The venv lives in the scie's cache (`SCIE_BASE`), so startup is
+        just interpreter boot plus imports. This requires `include_tools=True` on the
+        `pex_binary`.
+
+        This only applies to the generated configuration, and is ignored if a `lift` file sets
+        its own `commands`.
+        """
+    )
+
+
+class ScieFileType(Enum):
+    BLOB = "blob"
+    ZIP = "zip"
+    TAR_ZST = "tar.zst"
+
+
+class ScieFileTypeField(StringField):
+    alias = "file_type"
+    default = ScieFileType.BLOB.value
+    valid_choices = ScieFileType
+    help = softwrap(
+        """
+        How the `pex_binary` dependencies are embedded in the generated `scie`.
+
+        With `blob` (the default), each PEX is embedded as-is, and copied out of the scie the
+        first time it runs.
+
+        With `zip`, each PEX is extracted into a directory the first time the scie runs, and is
+        run as a loose PEX from there.
+
+        With `tar.zst`, each PEX is re-packed as a zstd-compressed tarball, at
+        `compression_level`, and is extracted and run like `zip`. This is usually smaller than a
+        PEX's own compression, and quicker to extract. It requires `zstd` to be installed.
+
+        Use the `scie-benchmark` goal to compare the extraction time of each.
+        """
+    )
+
+
+class ScieCompressionLevelField(IntField):
+    alias = "compression_level"
+    default = None
+    help = softwrap(
+        """
+        The zstd compression level (from 1 to 19) for `file_type='tar.zst'`, trading a slower
+        build for a smaller binary. Defaults to zstd's own default of 3.
+        """
+    )
+
+    @classmethod
+    def compute_value(cls, raw_value: int | None, address: Address) -> int | None:
+        value = super().compute_value(raw_value, address)
+        if value is not None and not 1 <= value <= 19:
+            raise InvalidFieldException(
+                f"The `{cls.alias}` field in target {address} must be between 1 and 19, but was "
+                f"{value}."
+            )
+        return value
+
+
+class ScieImportTimeArgsField(StringSequenceField):
+    alias = "import_time_args"
+    default = None
+    help = softwrap(
+        """
+        If set, the built binary is run with these arguments under `-X importtime` after it's
+        packaged, and a report of its imports (sorted by their cost) is written next to it as
+        `<binary name>-importtime.txt`. Expensive top-level imports of non-stdlib modules are
+        listed as candidates for importing lazily, and the slowest are logged.
+
+        The arguments should make the binary import what it usually would and exit quickly, e.g.
+        `["--help"]` for a CLI. If the binary has several commands, each is profiled.
+
+        The binary is only profiled if it was built for the current platform.
+        """
+    )
+
+
 class ScieLiftSourceField(OptionalSingleSourceField):
     alias = "lift"
     expected_file_extensions = (".toml",)
     default = None
     help = softwrap(
         """
-        If set, the specified toml file will be used to configure the `scie` and all other
-        fields will be ignored.
+        If set, the specified toml file will be used to configure the `scie`. Anything it
+        leaves out (e.g. the `name`, `platforms`, `interpreters` or `files`) is filled in from
+        this target's other fields, and any `files` not referenced by a command or binding are
+        dropped.
 
         The path is relative to the BUILD file's directory and it must end in a `.toml` extension.
 
@@ -126,6 +232,10 @@ class ScieTarget(Target):
         ScieDependenciesField,
         ScieBinaryNameField,
         SciePlatformField,
+        ScieLayoutField,
+        ScieFileTypeField,
+        ScieCompressionLevelField,
+        ScieImportTimeArgsField,
         ScieLiftSourceField,
     )
     help = softwrap(
@@ -3,6 +3,8 @@
 
 from __future__ import annotations
 
+import dataclasses
+import json
 import logging
 import os
 from collections.abc import Iterable
@@ -10,33 +12,42 @@ from dataclasses import dataclass
 
 from experimental.ty.skip_field import SkipTyField
 from experimental.ty.subsystems import Ty
+from experimental.util_rules import named_caches, requirements_venv
+from experimental.util_rules.diagnostics import Diagnostic, check_result_with_report
+from experimental.util_rules.named_caches import (
+    TrimNamedCacheRequest,
+    named_cache_name,
+    trim_named_cache,
+)
+from experimental.util_rules.partition import merge_process_results, overlapping_closures
+from experimental.util_rules.profile import (
+    PartitionProfiler,
+    ProfiledCheckResult,
+    finish_profile,
+    profiled_check_result,
+    timed,
+)
+from experimental.util_rules.requirements_venv import (
+    RequirementsVenvRequest,
+    materialize_requirements_venv,
+)
 from pants.backend.python.subsystems.setup import PythonSetup
 from pants.backend.python.target_types import (
     InterpreterConstraintsField,
     PythonResolveField,
     PythonSourceField,
 )
-from pants.backend.python.util_rules import pex_from_targets
 from pants.backend.python.util_rules.interpreter_constraints import (
     InterpreterConstraints,
 )
 from pants.backend.python.util_rules.partition import (
     _partition_by_interpreter_constraints_and_resolve,
 )
-from pants.backend.python.util_rules.pex import (
-    PexRequest,
-    VenvPexProcess,
-    VenvPexRequest,
-    create_pex,
-    create_venv_pex,
-)
-from pants.backend.python.util_rules.pex_environment import PexEnvironment
-from pants.backend.python.util_rules.pex_from_targets import RequirementsPexRequest
 from pants.backend.python.util_rules.python_sources import (
     PythonSourceFilesRequest,
     prepare_python_sources,
 )
-from pants.core.goals.check import CheckRequest, CheckResult, CheckResults
+from pants.core.goals.check import CheckRequest, CheckResults
 from pants.core.util_rules import config_files
 from pants.core.util_rules.config_files import find_config_file
 from pants.core.util_rules.external_tool import download_external_tool
@@ -44,14 +55,16 @@ from pants.core.util_rules.source_files import (
     SourceFilesRequest,
     determine_source_files,
 )
+from pants.engine.addresses import Addresses
 from pants.engine.collection import Collection
 from pants.engine.fs import MergeDigests
 from pants.engine.internals.graph import resolve_coarsened_targets
 from pants.engine.intrinsics import execute_process, merge_digests
 from pants.engine.platform import Platform
-from pants.engine.process import Process, ProcessCacheScope, execute_process_or_raise
+from pants.engine.process import Process
 from pants.engine.rules import Rule, collect_rules, concurrently, implicitly, rule
 from pants.engine.target import (
+    CoarsenedTarget,
     CoarsenedTargets,
     CoarsenedTargetsRequest,
     FieldSet,
@@ -64,6 +77,12 @@ from pants.util.strutil import pluralize
 
 logger = logging.getLogger(__name__)
 
+# The transitive sources and config files are mounted here, as Ty's working directory
+_SOURCES_KEY = "__sources"
+
+# Ty uses `$XDG_CACHE_HOME/ty` for its cache, which is backed by a named cache
+_TY_CACHE_PATH = ".cache/ty"
+
 
 @dataclass(frozen=True)
 class TyFieldSet(FieldSet):
@@ -88,6 +107,7 @@ class TyPartition:
     root_targets: CoarsenedTargets
     resolve_description: str | None
     interpreter_constraints: InterpreterConstraints
+    resolve: str
 
     def description(self) -> str:
         ics = str(sorted(str(c) for c in self.interpreter_constraints))
@@ -98,6 +118,77 @@ class TyPartitions(Collection[TyPartition]):
     pass
 
 
+def _parse_diagnostics(stdout: bytes) -> list[Diagnostic]:
+    """Parse Ty's GitLab Code Quality output (`--output-format=gitlab`).
+
+    Each issue is located by its `positions`, or only by its `lines` (starting at the first column)
+    when Ty doesn't know the column.
+    """
+    if not stdout.strip():
+        return []
+    diagnostics = []
+    for issue in json.loads(stdout):
+        location = issue["location"]
+        begin = location.get("positions", {}).get("begin") or {"line": location["lines"]["begin"]}
+        diagnostics.append(
+            Diagnostic(
+                path=location["path"],
+                line=begin["line"],
+                column=begin.get("column", 1),
+                code=issue["check_name"],
+                severity=issue["severity"],
+                message=issue["description"],
+            )
+        )
+    return diagnostics
+
+
+def _sub_partitions(
+    partition: TyPartition, groups: Iterable[Iterable[CoarsenedTarget]]
+) -> tuple[TyPartition, ...]:
+    field_sets_by_address = {fs.address: fs for fs in partition.field_sets}
+    return tuple(
+        dataclasses.replace(
+            partition,
+            field_sets=FrozenOrderedSet(
+                field_sets_by_address[tgt.address]
+                for root in group
+                for tgt in root.members
+                if tgt.address in field_sets_by_address
+            ),
+            root_targets=CoarsenedTargets(group),
+        )
+        for group in groups
+    )
+
+
+def _split_incrementally(partition: TyPartition) -> tuple[TyPartition, ...]:
+    """Split a partition into one sub-partition per root `CoarsenedTarget`.
+
+    Each sub-partition only carries its own transitive closure, so its Ty process is keyed on the
+    sources of that closure alone, and is served from the process cache if none of them changed.
+    """
+    return _sub_partitions(partition, ([root] for root in partition.root_targets))
+
+
+def _split_by_closure(partition: TyPartition) -> tuple[TyPartition, ...]:
+    """Split a partition into groups of roots whose transitive closures share first-party sources.
+
+    Disjoint subprojects in the same resolve then run in separate Ty processes, each only seeing
+    (and keyed on) its own sources. Roots are only joined through Python sources, as every project
+    depends on some of the same 3rd-party requirements.
+    """
+    groups = overlapping_closures(
+        tuple(partition.root_targets),
+        closure=lambda root: (
+            tgt.address for tgt in root.closure() if tgt.has_field(PythonSourceField)
+        ),
+    )
+    if len(groups) <= 1:
+        return (partition,)
+    return _sub_partitions(partition, groups)
+
+
 @rule(
     desc="Ty typecheck each partition based on its interpreter_constraints",
     level=LogLevel.DEBUG,
@@ -106,68 +197,58 @@ async def ty_typecheck_partition(
     partition: TyPartition,
     ty: Ty,
     platform: Platform,
-    pex_environment: PexEnvironment,
-) -> CheckResult:
-    ty_tool, config_files, roots_sources, transitive_sources, requirements_pex = await concurrently(
-        download_external_tool(ty.get_request(platform)),
-        find_config_file(ty.config_request()),
-        determine_source_files(SourceFilesRequest(fs.sources for fs in partition.field_sets)),
-        prepare_python_sources(
-            PythonSourceFilesRequest(partition.root_targets.closure()), **implicitly()
-        ),
-        create_pex(
-            **implicitly(
-                RequirementsPexRequest(
-                    (fs.address for fs in partition.field_sets),
-                    hardcoded_interpreter_constraints=partition.interpreter_constraints,
-                )
-            )
-        ),
-    )
-
-    # Create a venv with the 3rd-party requirements and let Ty know about it using `--venv`
-    complete_pex_env = pex_environment.in_workspace()
-    requirements_venv_pex = await create_venv_pex(
-        VenvPexRequest(
-            PexRequest(
-                output_filename="requirements_venv.pex",
-                internal_only=True,
-                pex_path=[requirements_pex],
-                interpreter_constraints=partition.interpreter_constraints,
+) -> ProfiledCheckResult:
+    profiler = PartitionProfiler(Ty.options_scope, partition.description())
+    ty_tool, config_files, requirements_venv = await concurrently(
+        timed(profiler, "download_tool", download_external_tool(ty.get_request(platform))),
+        timed(profiler, "config_files", find_config_file(ty.config_request())),
+        # Create a venv with the 3rd-party requirements and let Ty know about it
+        timed(
+            profiler,
+            "requirements_venv",
+            materialize_requirements_venv(
+                RequirementsVenvRequest(
+                    partition.resolve,
+                    partition.interpreter_constraints,
+                    Addresses(fs.address for fs in partition.field_sets),
+                ),
+                **implicitly(),
             ),
-            complete_pex_env,
         ),
-        **implicitly(),
     )
 
-    # Force the requirements venv to materialize always by running a no-op.
-    # This operation must be called with `ProcessCacheScope.SESSION`
-    # so that it runs every time.
-    # TODO: Cargo culted from the Pyright backend
-    _ = await execute_process_or_raise(
-        **implicitly(
-            VenvPexProcess(
-                requirements_venv_pex,
-                description="Force venv to materialize",
-                argv=["-c", "''"],
-                cache_scope=ProcessCacheScope.PER_SESSION,
-            )
+    profiler.phase("setup")
+
+    # The requirements venv is shared by every sub-partition, so that splitting doesn't
+    # create (and materialize) a venv per sub-partition
+    sub_partitions = (
+        _split_incrementally(partition) if ty.incremental else _split_by_closure(partition)
+    )
+    roots_sources = await concurrently(
+        determine_source_files(SourceFilesRequest(fs.sources for fs in sub_partition.field_sets))
+        for sub_partition in sub_partitions
+    )
+    transitive_sources = await concurrently(
+        prepare_python_sources(
+            PythonSourceFilesRequest(sub_partition.root_targets.closure()), **implicitly()
         )
+        for sub_partition in sub_partitions
     )
+    profiler.phase("sources")
 
-    input_digest = await merge_digests(
-        MergeDigests(
-            (
-                # roots_sources.snapshot.digest,
-                transitive_sources.source_files.snapshot.digest,
-                config_files.snapshot.digest,
-                requirements_venv_pex.digest,
-            )
+    # The sources are passed as immutable inputs, which are materialized once per digest and then
+    # symlinked into each sandbox, rather than being copied in for every run. The config files are
+    # merged in, so that the tool discovers them in its working directory.
+    sources_digests = await concurrently(
+        merge_digests(
+            MergeDigests((sources.source_files.snapshot.digest, config_files.snapshot.digest))
         )
+        for sources in transitive_sources
     )
+    profiler.phase("merge_inputs")
 
     immutable_input_key = "__ty_tool"
-    exe_path = os.path.join(immutable_input_key, ty_tool.exe)
+    exe_path = os.path.join("{chroot}", immutable_input_key, ty_tool.exe)
 
     # TODO: If finding the minimum failed, just arbitrarily hardcoded it to 3.10...
     python_version = (
@@ -176,28 +257,68 @@ async def ty_typecheck_partition(
         )
         or "3.10"
     )
+
+    # Ty's cache outlives the sandbox in a named cache, which is only safe to share between runs
+    # using the same Ty version, Python version and resolve
+    cache_name = named_cache_name("ty", ty.version, f"py{python_version}", partition.resolve)
+    _ = await trim_named_cache(
+        TrimNamedCacheRequest(cache_name, ty.cache_max_size_mb), **implicitly()
+    )
+    profiler.phase("trim_cache")
+
     # TODO: Handle this properly, checking out the various ways we can set the correct python version from config, pants, universe, etc
     initial_args = (
         "check",
         f"--python-version={python_version}",
         # TODO: This is greasy...
-        f"--venv={os.path.join(complete_pex_env.pex_root, requirements_venv_pex.venv_rel_dir)}",
+        f"--venv={requirements_venv.path}",
+        *(("--output-format=gitlab",) if ty.report else ()),
     )
-    result = await execute_process(
-        Process(
-            argv=(exe_path, *initial_args, *ty.args, *roots_sources.snapshot.files),
-            input_digest=input_digest,
-            immutable_input_digests={immutable_input_key: ty_tool.digest},
-            description=f"Run Ty on {pluralize(len(roots_sources.files), 'file')}.",
-            level=LogLevel.DEBUG,
-        ),
-        **implicitly(),
+    results = await concurrently(
+        execute_process(
+            Process(
+                argv=(
+                    exe_path,
+                    *initial_args,
+                    *(f"--extra-search-path={root}" for root in sources.source_roots),
+                    *ty.args,
+                    *roots.snapshot.files,
+                ),
+                immutable_input_digests={
+                    immutable_input_key: ty_tool.digest,
+                    _SOURCES_KEY: sources_digest,
+                },
+                working_directory=_SOURCES_KEY,
+                append_only_caches={cache_name: _TY_CACHE_PATH},
+                env={"XDG_CACHE_HOME": "{chroot}/.cache"},
+                description=f"Run Ty on {pluralize(len(roots.files), 'file')}.",
+                level=LogLevel.DEBUG,
+            ),
+            **implicitly(),
+        )
+        for roots, sources, sources_digest in zip(
+            roots_sources, transitive_sources, sources_digests
+        )
     )
 
-    return CheckResult.from_fallible_process_result(
-        result,
-        partition_description=partition.description(),
+    profiler.phase("run")
+
+    if ty.report:
+        result = await check_result_with_report(
+            results, _parse_diagnostics, partition.description()
+        )
+    else:
+        result = merge_process_results(results, partition.description())
+    profiler.phase("report")
+
+    profile = await finish_profile(
+        profiler,
+        measure_inputs=ty.profile,
+        sources=sources_digests,
+        requirements_venv=requirements_venv,
+        results=results,
     )
+    return await profiled_check_result(result, profile, write_report=ty.profile)
 
 
 @rule(
@@ -229,6 +350,7 @@ async def ty_determine_partitions(
             ),
             resolve if len(python_setup.resolves) > 1 else None,
             interpreter_constraints or ty.interpreter_constraints,
+            resolve,
         )
         for (resolve, interpreter_constraints), field_sets in sorted(
             resolve_and_interpreter_constraints_to_field_sets.items()
@@ -252,7 +374,7 @@ async def ty_typecheck(
         ty_typecheck_partition(partition, **implicitly()) for partition in partitions
     )
     return CheckResults(
-        partitioned_results,
+        [partitioned_result.result for partitioned_result in partitioned_results],
         checker_name=request.tool_name,
     )
 
@@ -261,6 +383,7 @@ def rules() -> Iterable[Rule | UnionRule]:
     return (
         *collect_rules(),
         *config_files.rules(),
-        *pex_from_targets.rules(),
+        *named_caches.rules(),
+        *requirements_venv.rules(),
         UnionRule(CheckRequest, TyRequest),
     )
@@ -0,0 +1,70 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from experimental.ty.rules import _parse_diagnostics
+from experimental.util_rules.diagnostics import Diagnostic
+
+
+@pytest.fixture
+def gitlab_output() -> bytes:
+    return json.dumps(
+        [
+            {
+                "check_name": "unresolved-import",
+                "description": "Cannot resolve imported module `yaml`",
+                "severity": "major",
+                "fingerprint": "0a1b2c3d",
+                "location": {
+                    "path": "src/app.py",
+                    "positions": {
+                        "begin": {"line": 1, "column": 8},
+                        "end": {"line": 1, "column": 12},
+                    },
+                },
+            },
+            {
+                "check_name": "invalid-syntax",
+                "description": "Unexpected indentation",
+                "severity": "critical",
+                "fingerprint": "4e5f6a7b",
+                "location": {"path": "src/util.py", "lines": {"begin": 7}},
+            },
+        ]
+    ).encode()
+
+
+def test_parse_diagnostics(gitlab_output: bytes) -> None:
+    assert _parse_diagnostics(gitlab_output) == [
+        Diagnostic(
+            path="src/app.py",
+            line=1,
+            column=8,
+            code="unresolved-import",
+            severity="major",
+            message="Cannot resolve imported module `yaml`",
+        ),
+        # Only located by its lines, so starts at the first column
+        Diagnostic(
+            path="src/util.py",
+            line=7,
+            column=1,
+            code="invalid-syntax",
+            severity="critical",
+            message="Unexpected indentation",
+        ),
+    ]
+
+
+@pytest.mark.parametrize("stdout", [b"", b"\n", b"[]\n"])
+def test_parse_diagnostics_empty(stdout: bytes) -> None:
+    assert _parse_diagnostics(stdout) == []
+
+
+def test_parse_invalid_diagnostics() -> None:
+    with pytest.raises(ValueError):
+        _parse_diagnostics(b"error: ty panicked")
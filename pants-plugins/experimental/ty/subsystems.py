@@ -14,7 +14,13 @@ from pants.core.util_rules.external_tool import TemplatedExternalTool
 from pants.engine.platform import Platform
 from pants.engine.rules import Rule, collect_rules
 from pants.engine.unions import UnionRule
-from pants.option.option_types import ArgsListOption, SkipOption, StrListOption
+from pants.option.option_types import (
+    ArgsListOption,
+    BoolOption,
+    IntOption,
+    SkipOption,
+    StrListOption,
+)
 from pants.util.strutil import softwrap
 
 
@@ -49,6 +55,60 @@ class Ty(TemplatedExternalTool):
     skip = SkipOption("check")
     args = ArgsListOption(example="--version")
 
+    report = BoolOption(
+        default=False,
+        help=softwrap(
+            """
+            If true, request JSON diagnostics from Ty, and write them to `dist/check/ty/` as a
+            report (with one file per partition), using the same schema as the other Python
+            type checker plugins. The console output is then rendered from those diagnostics.
+            """
+        ),
+    )
+
+    profile = BoolOption(
+        default=False,
+        help=softwrap(
+            """
+            If true, write the wall time of each phase of checking a partition (e.g. setup,
+            sources, running Ty), and the size of its inputs, to `dist/check/ty/` as
+            `profile.json` in each partition's report.
+
+            The timings (but not the size of the inputs, which is only measured when this is set)
+            are always attached as metadata to each partition's workunit, for any
+            `[GLOBAL].streaming_workunits_handlers`.
+            """
+        ),
+    )
+
+    incremental = BoolOption(
+        default=False,
+        help=softwrap(
+            """
+            If true, split each partition into one Ty process per root target (or dependency
+            cycle), with each process only seeing its own transitive closure.
+
+            Touching a file then only re-runs Ty for the targets that depend on it, while
+            everything else is served from the process cache. This trades a larger number of
+            smaller processes for much faster incremental runs in large repositories.
+            """
+        ),
+    )
+
+    cache_max_size_mb = IntOption(
+        default=1024,
+        advanced=True,
+        help=softwrap(
+            """
+            The maximum size (in MB) of each of Ty's persistent caches, before the least recently
+            modified entries are evicted. Set to 0 to disable eviction.
+
+            Ty's cache is kept in a named cache, keyed on the Ty version, the Python version and
+            the resolve, so that it is shared by every Ty run on this machine.
+            """
+        ),
+    )
+
     _interpreter_constraints = StrListOption(
         advanced=True,
         default=["CPython>=3.8,<3.15"],
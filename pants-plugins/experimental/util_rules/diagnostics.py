@@ -0,0 +1,88 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Machine-readable diagnostics for the Python type checkers.
+
+Each checker parses its tool's JSON output into `Diagnostic`s, which are rendered to the console
+and written (in a common schema, regardless of the tool) as the `CheckResult.report`. Pants then
+writes the report of each partition to `dist/check/<checker>/...`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+
+from pants.core.goals.check import CheckResult
+from pants.engine.fs import CreateDigest, Digest, FileContent
+from pants.engine.intrinsics import create_digest
+from pants.engine.process import FallibleProcessResult
+from pants.util.strutil import pluralize
+
+logger = logging.getLogger(__name__)
+
+REPORT_FILENAME = "diagnostics.json"
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    path: str
+    line: int
+    column: int
+    code: str
+    severity: str
+    message: str
+
+    def render(self) -> str:
+        return f"{self.path}:{self.line}:{self.column}: {self.severity}[{self.code}] {self.message}"
+
+
+def _sorted(diagnostics: Iterable[Diagnostic]) -> list[Diagnostic]:
+    return sorted(diagnostics, key=lambda d: (d.path, d.line, d.column, d.code))
+
+
+def render_diagnostics(diagnostics: Iterable[Diagnostic], unparsed: Iterable[str] = ()) -> str:
+    diagnostics = _sorted(diagnostics)
+    return "\n".join(
+        (
+            *unparsed,
+            *(diagnostic.render() for diagnostic in diagnostics),
+            f"Found {pluralize(len(diagnostics), 'diagnostic')}.",
+        )
+    )
+
+
+async def create_report(diagnostics: Iterable[Diagnostic]) -> Digest:
+    content = json.dumps([asdict(d) for d in _sorted(diagnostics)], indent=2, sort_keys=True)
+    return await create_digest(CreateDigest([FileContent(REPORT_FILENAME, content.encode())]))
+
+
+async def check_result_with_report(
+    results: tuple[FallibleProcessResult, ...],
+    parse: Callable[[bytes], Iterable[Diagnostic]],
+    partition_description: str,
+) -> CheckResult:
+    """Merge the results of each batch, rendering their diagnostics and attaching a JSON report.
+
+    If a tool's output can't be parsed (e.g. it crashed before reporting anything), its raw output
+    is passed through instead.
+    """
+    diagnostics: list[Diagnostic] = []
+    unparsed: list[str] = []
+    for result in results:
+        try:
+            diagnostics.extend(parse(result.stdout))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Failed to parse diagnostics: {e}")
+            unparsed.append(result.stdout.decode())
+
+    report = await create_report(diagnostics)
+    return CheckResult(
+        exit_code=next((result.exit_code for result in results if result.exit_code != 0), 0),
+        stdout=render_diagnostics(diagnostics, unparsed),
+        stderr="\n".join(result.stderr.decode() for result in results if result.stderr),
+        partition_description=partition_description,
+        report=report,
+    )
@@ -0,0 +1,130 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Rules to keep append-only named caches bounded in size.
+
+Pants never evicts anything from its named caches, which is fine for a developer machine, but
+long-lived CI workers will slowly fill their disks. These rules trim a named cache back under a
+size cap, removing the least recently modified entries first.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from pants.core.util_rules.system_binaries import BashBinary
+from pants.engine.process import Process, ProcessCacheScope, execute_process_or_raise
+from pants.engine.rules import Rule, collect_rules, implicitly, rule
+from pants.engine.unions import UnionRule
+from pants.util.logging import LogLevel
+
+logger = logging.getLogger(__name__)
+
+# Where the named cache is mounted in the trimming sandbox
+_CACHE_PATH = ".cache/named"
+
+# Remove whole entries of the cache (the paths `entry_depth` levels down), least recently modified
+# first, until it fits under the cap (in KiB). Removing single files could leave a tool's entry half
+# there, so an entry either stays or goes. Sizes are all from `du`, so what's removed adds up to what
+# `du` reports. Concurrent trims of the same cache are serialized with a lock directory in the
+# cache: whichever trim gets there second has nothing left to do, so just exits. A lock left by a
+# killed trim expires after an hour. `stat` differs between GNU and BSD, so pick the right format
+# string for the host. Pants mounts the cache in the sandbox as a symlink, which `du` and `find`
+# don't follow, so the real path is used.
+#
+# The lock only serializes trims, not the tools using the cache: an entry removed while a tool is
+# reading it fails that tool's run. The least recently modified entries are the least likely to be
+# in use, and the callers trim before they run their tool, so this is rare rather than impossible.
+_TRIM_SCRIPT = r"""
+set -eu
+[ -d "$1" ] || exit 0
+cache_dir="$(cd "$1" && pwd -P)"
+max_kb="$2"
+entry_depth="$3"
+lock="$cache_dir/.pants-trim.lock"
+if ! mkdir "$lock" 2> /dev/null; then
+    [ -n "$(find "$lock" -maxdepth 0 -mmin +60)" ] || exit 0
+    rm -rf "$lock"
+    mkdir "$lock" 2> /dev/null || exit 0
+fi
+trap 'rmdir "$lock"' EXIT
+if stat -c '%Y' "$cache_dir" > /dev/null 2>&1; then
+    mtime=(stat -c '%Y')
+else
+    mtime=(stat -f '%m')
+fi
+used_kb=$(($(du -sk "$cache_dir" | cut -f1) - $(du -sk "$lock" | cut -f1)))
+[ "$used_kb" -le "$max_kb" ] && exit 0
+paths="$(find "$cache_dir" -mindepth "$entry_depth" -maxdepth "$entry_depth" ! -path "$lock")"
+entries=""
+while IFS= read -r entry; do
+    [ -n "$entry" ] || continue
+    entries+="$("${mtime[@]}" "$entry") $(du -sk "$entry" | cut -f1) $entry"$'\n'
+done <<< "$paths"
+sorted="$(printf '%s' "$entries" | sort -n)"
+while read -r _ kb entry; do
+    [ -n "$entry" ] || continue
+    [ "$used_kb" -le "$max_kb" ] && break
+    rm -rf "$entry"
+    used_kb=$((used_kb - kb))
+done <<< "$sorted"
+exit 0
+"""
+
+
+def named_cache_name(*parts: str) -> str:
+    """Join the parts into a valid named cache name.
+
+    Named caches may only contain lowercase alphanumeric characters and underscores.
+    """
+    return "_".join(re.sub(r"[^a-z0-9]+", "_", part.lower()).strip("_") for part in parts)
+
+
+@dataclass(frozen=True)
+class TrimNamedCacheRequest:
+    name: str
+    max_size_mb: int
+    # How many directories down the cache's entries are, for tools which group their entries into
+    # a few top-level directories
+    entry_depth: int = 1
+
+
+@dataclass(frozen=True)
+class TrimmedNamedCache:
+    name: str
+
+
+@rule(desc="Trim a named cache to its size cap", level=LogLevel.DEBUG)
+async def trim_named_cache(request: TrimNamedCacheRequest, bash: BashBinary) -> TrimmedNamedCache:
+    if request.max_size_mb <= 0:
+        return TrimmedNamedCache(request.name)
+
+    # Memoized per session, but rules in different sessions (or different caps) may trim the same
+    # cache at once, which the script's lock serializes
+    _ = await execute_process_or_raise(
+        **implicitly(
+            Process(
+                argv=(
+                    bash.path,
+                    "-c",
+                    _TRIM_SCRIPT,
+                    "trim_named_cache",
+                    _CACHE_PATH,
+                    str(request.max_size_mb * 1024),
+                    str(request.entry_depth),
+                ),
+                append_only_caches={request.name: _CACHE_PATH},
+                description=f"Trim the `{request.name}` named cache to {request.max_size_mb}MB",
+                level=LogLevel.DEBUG,
+                cache_scope=ProcessCacheScope.PER_SESSION,
+            )
+        )
+    )
+    return TrimmedNamedCache(request.name)
+
+
+def rules() -> Iterable[Rule | UnionRule]:
+    return (*collect_rules(),)
@@ -0,0 +1,171 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import os
+import subprocess
+from pathlib import Path
+
+from experimental.util_rules.named_caches import _TRIM_SCRIPT, named_cache_name
+
+
+def make_entry(cache: Path, name: str, *, files: int, kb: int, mtime: int) -> Path:
+    entry = cache / name
+    entry.mkdir(parents=True)
+    for i in range(files):
+        (entry / f"{i}.bin").write_bytes(b"x" * kb * 1024)
+    os.utime(entry, (mtime, mtime))
+    return entry
+
+
+def trim(cache: Path, max_kb: int, *, entry_depth: int = 1) -> None:
+    subprocess.run(
+        [
+            "bash",
+            "-c",
+            _TRIM_SCRIPT,
+            "trim_named_cache",
+            str(cache),
+            str(max_kb),
+            str(entry_depth),
+        ],
+        check=True,
+    )
+
+
+def du_kb(path: Path) -> int:
+    result = subprocess.run(["du", "-sk", str(path)], check=True, capture_output=True)
+    return int(result.stdout.split()[0])
+
+
+def test_named_cache_name() -> None:
+    assert named_cache_name("ty", "0.0.1a5", "py3.11", "python-default") == (
+        "ty_0_0_1a5_py3_11_python_default"
+    )
+
+
+def test_trim_removes_least_recently_modified_entries(tmp_path: Path) -> None:
+    oldest = make_entry(tmp_path, "oldest", files=4, kb=64, mtime=1_000)
+    older = make_entry(tmp_path, "older", files=4, kb=64, mtime=2_000)
+    newest = make_entry(tmp_path, "newest", files=4, kb=64, mtime=3_000)
+    max_kb = du_kb(tmp_path) - du_kb(oldest)
+
+    trim(tmp_path, max_kb)
+
+    # Only whole entries are removed, and no more than needed
+    assert not oldest.exists()
+    assert len(list(older.iterdir())) == 4
+    assert len(list(newest.iterdir())) == 4
+    assert du_kb(tmp_path) <= max_kb
+    assert not (tmp_path / ".pants-trim.lock").exists()
+
+
+def test_trim_symlinked_cache(tmp_path: Path) -> None:
+    # Pants mounts a named cache in the sandbox as a symlink to the real cache
+    cache = tmp_path / "named"
+    oldest = make_entry(cache, "oldest", files=4, kb=64, mtime=1_000)
+    newest = make_entry(cache, "newest", files=4, kb=64, mtime=2_000)
+    max_kb = du_kb(cache) - du_kb(oldest)
+    mount = tmp_path / "sandbox" / ".cache" / "named"
+    mount.parent.mkdir(parents=True)
+    mount.symlink_to(cache)
+
+    trim(mount, max_kb)
+
+    assert not oldest.exists()
+    assert newest.exists()
+    assert du_kb(cache) <= max_kb
+    assert mount.is_symlink()
+
+
+def test_trim_nested_entries(tmp_path: Path) -> None:
+    old = make_entry(tmp_path / "downloads", "old", files=4, kb=64, mtime=1_000)
+    new = make_entry(tmp_path / "downloads", "new", files=4, kb=64, mtime=2_000)
+    other = make_entry(tmp_path / "providers", "other", files=4, kb=64, mtime=3_000)
+    max_kb = du_kb(tmp_path) - du_kb(old)
+
+    trim(tmp_path, max_kb, entry_depth=2)
+
+    assert not old.exists()
+    assert new.exists()
+    assert other.exists()
+
+
+def test_trim_symlinked_nested_entries(tmp_path: Path) -> None:
+    # science's cache, as mounted for `scie_binary`: entries are grouped a level down, by kind
+    cache = tmp_path / "science"
+    old = make_entry(cache / "downloads", "old", files=4, kb=64, mtime=1_000)
+    new = make_entry(cache / "downloads", "new", files=4, kb=64, mtime=2_000)
+    interpreter = make_entry(cache / "providers", "cpython", files=4, kb=64, mtime=3_000)
+    max_kb = du_kb(cache) - du_kb(old)
+    mount = tmp_path / "sandbox" / ".cache" / "science"
+    mount.parent.mkdir(parents=True)
+    mount.symlink_to(cache)
+
+    trim(mount, max_kb, entry_depth=2)
+
+    assert not old.exists()
+    assert new.exists()
+    assert interpreter.exists()
+    assert du_kb(cache) <= max_kb
+
+
+def test_trim_symlinked_file_entries(tmp_path: Path) -> None:
+    # A scie base, as mounted when profiling imports: a directory per extracted file, and loose
+    # files (e.g. locks) alongside them, which are entries too
+    cache = tmp_path / "scie_base"
+    old = make_entry(cache, "0123abcd", files=4, kb=64, mtime=1_000)
+    new = make_entry(cache, "4567ef01", files=4, kb=64, mtime=3_000)
+    old_file = cache / "0123abcd.lck"
+    old_file.write_bytes(b"x" * 64 * 1024)
+    os.utime(old_file, (2_000, 2_000))
+    max_kb = du_kb(cache) - du_kb(old) - du_kb(old_file)
+    mount = tmp_path / "sandbox" / ".cache" / "scie_base"
+    mount.parent.mkdir(parents=True)
+    mount.symlink_to(cache)
+
+    trim(mount, max_kb)
+
+    assert not old.exists()
+    assert not old_file.exists()
+    assert new.exists()
+
+
+def test_trim_many_entries(tmp_path: Path) -> None:
+    # Stopping partway through a long list of entries mustn't fail the trim
+    for i in range(500):
+        make_entry(tmp_path, f"entry{i:04}", files=1, kb=1, mtime=1_000 + i)
+
+    trim(tmp_path, du_kb(tmp_path) // 2)
+
+    assert not (tmp_path / "entry0000").exists()
+    assert (tmp_path / "entry0499" / "0.bin").exists()
+
+
+def test_trim_under_cap(tmp_path: Path) -> None:
+    entry = make_entry(tmp_path, "entry", files=1, kb=4, mtime=1_000)
+    trim(tmp_path, du_kb(tmp_path))
+    assert entry.exists()
+
+
+def test_trim_skipped_while_locked(tmp_path: Path) -> None:
+    entry = make_entry(tmp_path, "entry", files=1, kb=64, mtime=1_000)
+    (tmp_path / ".pants-trim.lock").mkdir()
+    trim(tmp_path, 0)
+    assert entry.exists()
+    assert (tmp_path / ".pants-trim.lock").exists()
+
+
+def test_trim_stale_lock(tmp_path: Path) -> None:
+    entry = make_entry(tmp_path, "entry", files=1, kb=64, mtime=1_000)
+    lock = tmp_path / ".pants-trim.lock"
+    lock.mkdir()
+    os.utime(lock, (1_000, 1_000))
+    trim(tmp_path, 0)
+    assert not entry.exists()
+    assert not lock.exists()
+
+
+def test_trim_missing_cache(tmp_path: Path) -> None:
+    trim(tmp_path / "missing", 0)
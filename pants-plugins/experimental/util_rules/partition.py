@@ -0,0 +1,136 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Helpers to split type checker partitions into smaller, independently cacheable batches."""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Hashable, Iterable, Sequence
+from typing import TypeVar
+
+from pants.core.goals.check import CheckResult
+from pants.engine.process import FallibleProcessResult
+
+T = TypeVar("T")
+
+
+def dependency_ordered(roots: Sequence[T], dependencies: Callable[[T], Iterable[T]]) -> list[T]:
+    """Order the roots so that each root follows its dependencies, and related roots are adjacent.
+
+    The walk goes through non-root nodes too, so two roots connected via a dependency that wasn't
+    requested still end up next to each other.
+    """
+    root_set = set(roots)
+    ordered: list[T] = []
+    visited: set[T] = set()
+    for root in roots:
+        if root in visited:
+            continue
+        # Iterative post-order DFS, as dependency chains can be deeper than the recursion limit
+        visited.add(root)
+        stack = [(root, iter(dependencies(root)))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if node in root_set:
+                    ordered.append(node)
+            elif child not in visited:
+                visited.add(child)
+                stack.append((child, iter(dependencies(child))))
+    return ordered
+
+
+def overlapping_closures(
+    roots: Sequence[T], closure: Callable[[T], Iterable[Hashable]]
+) -> list[list[T]]:
+    """Group the roots whose transitive closures overlap, directly or through other roots.
+
+    Each group is a connected component of the roots, so the closures of different groups are
+    disjoint. Groups (and the roots within them) keep the order the roots were given in.
+    """
+    # Union-find over the roots, where each root points towards the first root of its group
+    parents = list(range(len(roots)))
+
+    def find(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    owners: dict[Hashable, int] = {}
+    for i, root in enumerate(roots):
+        for node in closure(root):
+            owner = owners.setdefault(node, i)
+            a, b = find(owner), find(i)
+            if a != b:
+                parents[max(a, b)] = min(a, b)
+
+    groups: dict[int, list[T]] = {}
+    for i, root in enumerate(roots):
+        groups.setdefault(find(i), []).append(root)
+    return list(groups.values())
+
+
+def coherent_batches(
+    roots: Sequence[T],
+    *,
+    dependencies: Callable[[T], Iterable[T]],
+    size: Callable[[T], int],
+    weight: Callable[[T], int],
+    batch_size: int,
+) -> list[list[T]]:
+    """Split the roots into dependency-coherent batches, balanced by weight.
+
+    Roots are indivisible (e.g. a `CoarsenedTarget` keeps a dependency cycle together), and are
+    walked in dependency order, so each batch is a run of related roots sharing most of their
+    transitive closure. The number of batches is chosen so that no batch needs more than
+    `batch_size` (by `size`), and batches are then cut at roughly equal `weight`.
+    """
+    ordered = dependency_ordered(roots, dependencies)
+    total_size = sum(size(root) for root in ordered)
+    if batch_size <= 0 or total_size <= batch_size:
+        return [ordered] if ordered else []
+
+    total_weight = sum(weight(root) for root in ordered)
+    batch_weight = total_weight / math.ceil(total_size / batch_size)
+
+    batches: list[list[T]] = []
+    current: list[T] = []
+    current_size = current_weight = 0
+    for root in ordered:
+        root_size, root_weight = size(root), weight(root)
+        if current and (
+            current_size + root_size > batch_size or current_weight + root_weight > batch_weight
+        ):
+            batches.append(current)
+            current, current_size, current_weight = [], 0, 0
+        current.append(root)
+        current_size += root_size
+        current_weight += root_weight
+    if current:
+        batches.append(current)
+    return batches
+
+
+def merge_process_results(
+    results: tuple[FallibleProcessResult, ...], partition_description: str
+) -> CheckResult:
+    """Collapse the results of each batch into a single result for the partition."""
+    if len(results) == 1:
+        return CheckResult.from_fallible_process_result(
+            results[0], partition_description=partition_description
+        )
+
+    # Only the failed batches are reported if any failed, otherwise every batch is (e.g. for their
+    # warnings or summaries), skipping those which printed nothing
+    failed = [result for result in results if result.exit_code != 0]
+    reported = failed or results
+    return CheckResult(
+        exit_code=next((result.exit_code for result in failed), 0),
+        stdout="\n".join(result.stdout.decode() for result in reported if result.stdout),
+        stderr="\n".join(result.stderr.decode() for result in reported if result.stderr),
+        partition_description=partition_description,
+    )
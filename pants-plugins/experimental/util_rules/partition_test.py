@@ -0,0 +1,94 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+from experimental.util_rules.partition import (
+    coherent_batches,
+    dependency_ordered,
+    overlapping_closures,
+)
+
+# A small graph of two disjoint "projects": a <- b <- c, and x <- y (with `lib` not requested)
+GRAPH: dict[str, tuple[str, ...]] = {
+    "a": (),
+    "b": ("a",),
+    "c": ("b", "lib"),
+    "lib": (),
+    "x": ("lib",),
+    "y": ("x",),
+}
+
+
+def dependencies(node: str) -> tuple[str, ...]:
+    return GRAPH[node]
+
+
+def test_dependency_ordered_puts_dependencies_first() -> None:
+    assert dependency_ordered(["c", "y", "a", "b", "x"], dependencies) == ["a", "b", "c", "x", "y"]
+
+
+def test_dependency_ordered_skips_unrequested_nodes() -> None:
+    assert dependency_ordered(["y", "c"], dependencies) == ["y", "c"]
+
+
+def test_coherent_batches_without_batch_size() -> None:
+    batches = coherent_batches(
+        ["c", "y", "b"],
+        dependencies=dependencies,
+        size=lambda _: 1,
+        weight=lambda _: 1,
+        batch_size=0,
+    )
+    assert batches == [["b", "c", "y"]]
+
+
+def test_coherent_batches_respects_batch_size() -> None:
+    batches = coherent_batches(
+        ["a", "b", "c", "x", "y"],
+        dependencies=dependencies,
+        size=lambda _: 1,
+        weight=lambda _: 1,
+        batch_size=2,
+    )
+    assert all(len(batch) <= 2 for batch in batches)
+    assert [node for batch in batches for node in batch] == ["a", "b", "c", "x", "y"]
+
+
+def test_coherent_batches_balances_by_weight() -> None:
+    weights = {"a": 100, "b": 1, "c": 1, "x": 1, "y": 1}
+    batches = coherent_batches(
+        ["a", "b", "c", "x", "y"],
+        dependencies=dependencies,
+        size=lambda _: 1,
+        weight=weights.__getitem__,
+        batch_size=4,
+    )
+    assert batches == [["a"], ["b", "c", "x", "y"]]
+
+
+def test_coherent_batches_keeps_oversized_roots_whole() -> None:
+    batches = coherent_batches(
+        ["a", "b"],
+        dependencies=dependencies,
+        size=lambda node: 10 if node == "a" else 1,
+        weight=lambda _: 1,
+        batch_size=4,
+    )
+    assert batches == [["a"], ["b"]]
+
+
+def closure(node: str) -> set[str]:
+    nodes = {node}
+    for dependency in GRAPH[node]:
+        nodes |= closure(dependency)
+    return nodes
+
+
+def test_overlapping_closures_splits_disjoint_projects() -> None:
+    groups = overlapping_closures(["c", "y", "a"], closure=lambda n: closure(n) - {"lib"})
+    assert groups == [["c", "a"], ["y"]]
+
+
+def test_overlapping_closures_joins_through_shared_dependencies() -> None:
+    assert overlapping_closures(["c", "y", "a"], closure=closure) == [["c", "y", "a"]]
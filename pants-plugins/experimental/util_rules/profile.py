@@ -0,0 +1,191 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Per-phase timings and input sizes for checking a partition.
+
+The checkers record how long each phase of a partition took (e.g. downloading the tool, building the
+requirements venv, preparing the sources, running the tool), and how long each of the awaitables
+which ran concurrently within a phase took. These are attached to the partition's workunit as
+metadata. If requested, the size of the partition's inputs is added too, and the profile is written
+next to the partition's check report as `profile.json`.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import time
+from collections.abc import Awaitable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from experimental.util_rules.requirements_venv import RequirementsVenv
+from pants.backend.python.util_rules.pex import VenvPexProcess
+from pants.core.goals.check import CheckResult
+from pants.engine.engine_aware import EngineAwareReturnType
+from pants.engine.fs import CreateDigest, Digest, FileContent, FileEntry, MergeDigests
+from pants.engine.intrinsics import create_digest, get_digest_entries, merge_digests
+from pants.engine.process import FallibleProcessResult, execute_process_or_raise
+from pants.engine.rules import concurrently, implicitly
+from pants.util.logging import LogLevel
+
+PROFILE_FILENAME = "profile.json"
+
+_T = TypeVar("_T")
+
+# Counts the distributions installed in the venv, run by the venv's own interpreter
+_COUNT_DISTRIBUTIONS = (
+    "import importlib.metadata as m; print(len({d.metadata['Name'] for d in m.distributions()}))"
+)
+
+
+@dataclass(frozen=True)
+class PartitionProfile:
+    checker: str
+    partition: str
+    # Wall time of each phase, in the order they ran
+    phases_ms: tuple[tuple[str, float], ...]
+    # Wall time of each awaitable which ran concurrently with others, so these overlap
+    awaitables_ms: tuple[tuple[str, float], ...]
+    # The size of the inputs is only measured when a profile is requested
+    files: int | None
+    bytes: int | None
+    requirements: int | None
+    # The time spent running the tool itself, as opposed to setting up its sandbox
+    process_ms: int | None
+
+    def to_json_dict(self) -> dict[str, Any]:
+        return {
+            "checker": self.checker,
+            "partition": self.partition,
+            "phases_ms": dict(self.phases_ms),
+            "total_ms": round(sum(ms for _, ms in self.phases_ms), 3),
+            "awaitables_ms": dict(self.awaitables_ms),
+            "process_ms": self.process_ms,
+            "inputs": {
+                "files": self.files,
+                "bytes": self.bytes,
+                "requirements": self.requirements,
+            },
+        }
+
+
+@dataclass(frozen=True)
+class ProfiledCheckResult(EngineAwareReturnType):
+    result: CheckResult
+    # Timings are excluded from equality, so they don't invalidate the rules depending on this
+    profile: PartitionProfile = field(compare=False)
+
+    def metadata(self) -> dict[str, Any]:
+        return self.profile.to_json_dict()
+
+
+class PartitionProfiler:
+    """Records the wall time between consecutive calls to `phase`, starting from creation.
+
+    The awaitables which run concurrently within a phase are timed individually with `timed`.
+    """
+
+    def __init__(self, checker: str, partition: str) -> None:
+        self.checker = checker
+        self.partition = partition
+        self._phases_ms: dict[str, float] = {}
+        self._awaitables_ms: dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def phase(self, name: str) -> None:
+        """Mark the end of the phase `name`."""
+        now = time.perf_counter()
+        self._phases_ms[name] = round(self._phases_ms.get(name, 0) + (now - self._last) * 1000, 3)
+        self._last = now
+
+    def phases_ms(self) -> tuple[tuple[str, float], ...]:
+        return tuple(self._phases_ms.items())
+
+    def record(self, name: str, ms: float) -> None:
+        self._awaitables_ms[name] = round(ms, 3)
+
+    def awaitables_ms(self) -> tuple[tuple[str, float], ...]:
+        return tuple(self._awaitables_ms.items())
+
+
+async def timed(profiler: PartitionProfiler, name: str, awaitable: Awaitable[_T]) -> _T:
+    """Await `awaitable`, recording how long it took as `name`.
+
+    Wrap each of the awaitables passed to `concurrently`, as a phase only measures them all.
+    """
+    start = time.perf_counter()
+    result = await awaitable
+    profiler.record(name, (time.perf_counter() - start) * 1000)
+    return result
+
+
+async def installed_distributions(requirements_venv: RequirementsVenv) -> int:
+    """Count the distributions installed in a venv, i.e. its 3rd-party requirements."""
+    result = await execute_process_or_raise(
+        **implicitly(
+            VenvPexProcess(
+                requirements_venv.pex,
+                argv=["-c", _COUNT_DISTRIBUTIONS],
+                description="Count the requirements in a venv",
+                level=LogLevel.DEBUG,
+            )
+        )
+    )
+    return int(result.stdout.decode())
+
+
+async def finish_profile(
+    profiler: PartitionProfiler,
+    *,
+    measure_inputs: bool,
+    sources: Iterable[Digest],
+    requirements_venv: RequirementsVenv,
+    results: Iterable[FallibleProcessResult] = (),
+) -> PartitionProfile:
+    """Complete a profile, with the size of the partition's inputs if `measure_inputs`.
+
+    Measuring the inputs walks every source digest and runs a process in the venv, so is skipped
+    unless a profile was requested.
+    """
+    files = bytes_ = requirements = None
+    if measure_inputs:
+        all_entries = await concurrently(get_digest_entries(digest) for digest in sources)
+        file_sizes = {
+            entry.path: entry.file_digest.serialized_bytes_length
+            for entries in all_entries
+            for entry in entries
+            if isinstance(entry, FileEntry)
+        }
+        files = len(file_sizes)
+        bytes_ = sum(file_sizes.values())
+        requirements = await installed_distributions(requirements_venv)
+    process_ms = [
+        result.metadata.total_elapsed_ms
+        for result in results
+        if result.metadata.total_elapsed_ms is not None
+    ]
+    return PartitionProfile(
+        checker=profiler.checker,
+        partition=profiler.partition,
+        phases_ms=profiler.phases_ms(),
+        awaitables_ms=profiler.awaitables_ms(),
+        files=files,
+        bytes=bytes_,
+        requirements=requirements,
+        process_ms=sum(process_ms) if process_ms else None,
+    )
+
+
+async def profiled_check_result(
+    result: CheckResult, profile: PartitionProfile, *, write_report: bool
+) -> ProfiledCheckResult:
+    """Attach a profile to a partition's result, and add it to the report if requested."""
+    if write_report:
+        content = json.dumps(profile.to_json_dict(), indent=2)
+        profile_digest = await create_digest(
+            CreateDigest([FileContent(PROFILE_FILENAME, content.encode())])
+        )
+        report = await merge_digests(MergeDigests((result.report, profile_digest)))
+        result = dataclasses.replace(result, report=report)
+    return ProfiledCheckResult(result, profile)
@@ -0,0 +1,209 @@
+# Copyright 2026 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""A materialized venv of 3rd-party requirements, shared between the Python type checkers.
+
+Type checkers like Ty and Pyrefly don't import the code they check, they only need a venv on disk
+to resolve 3rd-party imports against. Building that venv from the entire resolve (rather than from
+the requirements of each partition) means every checker, partition and batch using the same resolve
+and interpreter constraints share one venv, which is only installed and materialized once.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from pants.backend.python.subsystems.setup import PythonSetup
+from pants.backend.python.util_rules import pex_from_targets
+from pants.backend.python.util_rules.interpreter_constraints import InterpreterConstraints
+from pants.backend.python.util_rules.pex import (
+    PexRequest,
+    VenvPex,
+    VenvPexProcess,
+    VenvPexRequest,
+    create_pex,
+    create_venv_pex,
+)
+from pants.backend.python.util_rules.pex_environment import PexEnvironment
+from pants.backend.python.util_rules.pex_from_targets import RequirementsPexRequest
+from pants.backend.python.util_rules.pex_requirements import (
+    EntireLockfile,
+    Resolve,
+    get_lockfile_for_resolve,
+)
+from pants.core.util_rules.system_binaries import BashBinary
+from pants.engine.addresses import Addresses
+from pants.engine.engine_aware import EngineAwareReturnType
+from pants.engine.process import (
+    Process,
+    ProcessCacheScope,
+    execute_process,
+    execute_process_or_raise,
+)
+from pants.engine.rules import Rule, collect_rules, implicitly, rule
+from pants.engine.unions import UnionRule
+from pants.util.logging import LogLevel
+
+logger = logging.getLogger(__name__)
+
+# Records how long materializing a venv took, inside the venv, so it goes along with it
+_MATERIALIZE_MS_FILE = ".pants-materialize-ms"
+
+# Pex creates venvs atomically, so a `pyvenv.cfg` means the venv is complete, but its interpreter
+# may have since been removed. Prints how long the venv took to materialize, if it was recorded.
+_CHECK_VENV_SCRIPT = (
+    '[ -f "$1/pyvenv.cfg" ] && [ -e "$1/bin/python" ] && '
+    f'{{ cat "$1/{_MATERIALIZE_MS_FILE}" 2>/dev/null || true; }}'
+)
+_RECORD_MATERIALIZE_MS_SCRIPT = f'printf "%s" "$2" > "$1/{_MATERIALIZE_MS_FILE}"'
+
+
+@dataclass(frozen=True)
+class RequirementsVenvRequest:
+    resolve: str
+    interpreter_constraints: InterpreterConstraints
+    # Only used to subset the requirements when resolves are disabled, as there is no lockfile
+    addresses: Addresses
+
+
+@dataclass(frozen=True)
+class RequirementsVenv:
+    pex: VenvPex
+    # The absolute path to the materialized venv in the PEX root
+    path: str
+
+
+@dataclass(frozen=True)
+class VenvFingerprintRequest:
+    path: str
+
+
+@dataclass(frozen=True)
+class VenvFingerprint(EngineAwareReturnType):
+    path: str
+    materialized: bool
+    # Timings are excluded from equality, so they don't invalidate the rules depending on this
+    check_ms: int | None = field(default=None, compare=False)
+    # How long the venv last took to materialize, which is saved by not materializing it again
+    saved_ms: int | None = field(default=None, compare=False)
+
+    def metadata(self) -> dict[str, Any]:
+        return {
+            "venv": self.path,
+            "materialized": self.materialized,
+            "check_ms": self.check_ms,
+            "saved_ms": self.saved_ms,
+        }
+
+
+@rule(desc="Fingerprint a venv in the PEX root", level=LogLevel.DEBUG)
+async def fingerprint_venv(request: VenvFingerprintRequest, bash: BashBinary) -> VenvFingerprint:
+    """Check whether a venv is usable.
+
+    The check runs in every session (as the venv may be removed from the PEX root at any time), but
+    the rules depending on it only re-run when its result changes.
+    """
+    result = await execute_process(
+        Process(
+            argv=(bash.path, "-c", _CHECK_VENV_SCRIPT, "fingerprint_venv", request.path),
+            description=f"Check for a venv at {request.path}",
+            level=LogLevel.DEBUG,
+            cache_scope=ProcessCacheScope.PER_SESSION,
+        ),
+        **implicitly(),
+    )
+    materialized = result.exit_code == 0
+    saved_ms = result.stdout.decode().strip()
+    return VenvFingerprint(
+        request.path,
+        materialized,
+        check_ms=result.metadata.total_elapsed_ms,
+        saved_ms=int(saved_ms) if materialized and saved_ms.isdigit() else None,
+    )
+
+
+@rule(desc="Create a materialized venv of 3rd-party requirements", level=LogLevel.DEBUG)
+async def materialize_requirements_venv(
+    request: RequirementsVenvRequest,
+    python_setup: PythonSetup,
+    pex_environment: PexEnvironment,
+    bash: BashBinary,
+) -> RequirementsVenv:
+    complete_pex_env = pex_environment.in_workspace()
+    if python_setup.enable_resolves:
+        lockfile = await get_lockfile_for_resolve(
+            Resolve(request.resolve, use_entire_lockfile=True), **implicitly()
+        )
+        pex_request = PexRequest(
+            output_filename="requirements_venv.pex",
+            internal_only=True,
+            requirements=EntireLockfile(lockfile),
+            interpreter_constraints=request.interpreter_constraints,
+        )
+    else:
+        requirements_pex = await create_pex(
+            **implicitly(
+                RequirementsPexRequest(
+                    request.addresses,
+                    hardcoded_interpreter_constraints=request.interpreter_constraints,
+                )
+            )
+        )
+        pex_request = PexRequest(
+            output_filename="requirements_venv.pex",
+            internal_only=True,
+            pex_path=[requirements_pex],
+            interpreter_constraints=request.interpreter_constraints,
+        )
+
+    venv_pex = await create_venv_pex(VenvPexRequest(pex_request, complete_pex_env), **implicitly())
+    venv_path = os.path.join(complete_pex_env.pex_root, venv_pex.venv_rel_dir)
+
+    # The checkers read the venv straight out of the PEX root, so it must exist on disk before they
+    # run. Materialize it by running a no-op, but only if it is missing or stale.
+    fingerprint = await fingerprint_venv(VenvFingerprintRequest(venv_path))
+    if fingerprint.materialized:
+        logger.debug(f"Requirements venv already materialized at {venv_path}")
+    else:
+        result = await execute_process_or_raise(
+            **implicitly(
+                VenvPexProcess(
+                    venv_pex,
+                    description="Force venv to materialize",
+                    argv=["-c", "''"],
+                    cache_scope=ProcessCacheScope.PER_SESSION,
+                )
+            )
+        )
+        # Recorded for the fingerprints of later sessions, which report it as the time they saved
+        if result.metadata.total_elapsed_ms is not None:
+            _ = await execute_process_or_raise(
+                **implicitly(
+                    Process(
+                        argv=(
+                            bash.path,
+                            "-c",
+                            _RECORD_MATERIALIZE_MS_SCRIPT,
+                            "record_materialize_ms",
+                            venv_path,
+                            str(result.metadata.total_elapsed_ms),
+                        ),
+                        description=f"Record how long the venv at {venv_path} took to materialize",
+                        level=LogLevel.DEBUG,
+                        cache_scope=ProcessCacheScope.PER_SESSION,
+                    )
+                )
+            )
+
+    return RequirementsVenv(venv_pex, venv_path)
+
+
+def rules() -> Iterable[Rule | UnionRule]:
+    return (
+        *collect_rules(),
+        *pex_from_targets.rules(),
+    )